@@ -29,4 +29,26 @@ CREATE TABLE elementos (
   pizarra_id INTEGER REFERENCES pizarras(id) ON DELETE CASCADE,
   tipo TEXT NOT NULL,
   propiedades JSONB NOT NULL
-);
\ No newline at end of file
+);
+
+-- Historial de versiones de cada pizarra (board_snapshots.py): deltas JSON Patch
+-- y checkpoints periódicos; 'base' es el checkpoint del que parte cada delta.
+CREATE TABLE IF NOT EXISTS pizarra_versiones (
+  pizarra_id INTEGER REFERENCES pizarras(id) ON DELETE CASCADE,
+  version INTEGER NOT NULL,
+  tipo TEXT NOT NULL CHECK (tipo IN ('checkpoint', 'delta')),
+  contenido JSONB NOT NULL,
+  base INTEGER NOT NULL,
+  origen TEXT,
+  creado_en TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (pizarra_id, version)
+);
+
+-- Índices para cargar pizarras (board_queries.py). En una base ya creada: psql -f este
+-- archivo (con tablas grandes, CREATE INDEX CONCURRENTLY para no bloquear escrituras).
+CREATE INDEX IF NOT EXISTS idx_elementos_pizarra_id ON elementos (pizarra_id, id);
+CREATE INDEX IF NOT EXISTS idx_elementos_propiedades ON elementos USING GIN (propiedades jsonb_path_ops);
+
+-- Versión de cada pizarra: la sube cada escritura de elementos (server.js y model_gemini.py);
+-- las actualizaciones de la IA solo escriben si sigue siendo la que leyeron (board_updates.py).
+ALTER TABLE pizarras ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
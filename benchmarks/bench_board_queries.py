@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: carga de una pizarra grande desde PostgreSQL (board_queries.py).
+
+Necesita DATABASE_URL. Trabaja sobre una tabla temporal 'elementos' (tapa a la real dentro
+de la sesión, no toca datos): una pizarra de --elements elementos entre otras --noise filas
+de otras pizarras. Compara, sin y con los índices de 03-indices.sql:
+- la consulta actual (SELECT propiedades ... ORDER BY id),
+- la proyección de PROMPT_FIELDS con operadores JSONB,
+- la proyección en streaming con cursor de servidor,
+- el filtro de contención {"tipo": "Class"} (GIN jsonb_path_ops).
+
+Uso:
+    DATABASE_URL=postgresql://... python benchmarks/bench_board_queries.py [--elements 10000] [--runs 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import psycopg2  # noqa: E402
+from psycopg2.extras import Json, execute_values  # noqa: E402
+
+import board_queries  # noqa: E402
+from bench_codegen_service import build_diagram  # noqa: E402
+from bench_sql_ddl import with_relations  # noqa: E402
+
+BOARD_ID = 1
+
+
+def setup(conn, n_elements, n_noise):
+    elementos = with_relations(build_diagram(n_elements // 2))["elementos"][:n_elements]
+    noise = build_diagram(1000)["elementos"]
+    with conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE elementos (id SERIAL PRIMARY KEY, pizarra_id INTEGER, "
+                    "tipo TEXT NOT NULL, propiedades JSONB NOT NULL)")
+        # Filas de la pizarra intercaladas con las de otras pizarras, como en una tabla real
+        rows = []
+        for i in range(max(n_elements, n_noise)):
+            if i < n_elements:
+                rows.append((BOARD_ID, elementos[i].get("tipo", "Class"), Json(elementos[i])))
+            if i < n_noise:
+                rows.append((2 + i % 500, "Class", Json(noise[i % len(noise)])))
+        execute_values(cur, "INSERT INTO elementos (pizarra_id, tipo, propiedades) VALUES %s", rows, page_size=5000)
+        cur.execute("ANALYZE elementos")
+
+
+def timed(runs, fn):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga de pizarras: consulta completa frente a proyección JSONB")
+    parser.add_argument("--elements", type=int, default=10000)
+    parser.add_argument("--noise", type=int, default=200000, help="Filas de otras pizarras")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    try:
+        setup(conn, args.elements, args.noise)
+        queries = [
+            ("completa (actual)", lambda cur: board_queries.fetch_elements(cur, BOARD_ID)),
+            ("PROMPT_FIELDS", lambda cur: board_queries.fetch_elements(cur, BOARD_ID, board_queries.PROMPT_FIELDS)),
+            ("PROMPT_FIELDS cursor servidor",
+             lambda cur: list(board_queries.iter_elements(conn, BOARD_ID, board_queries.PROMPT_FIELDS))),
+            ("clases (@> GIN)", lambda cur: board_queries.fetch_elements(cur, BOARD_ID, board_queries.PROMPT_FIELDS,
+                                                                         match={"tipo": "Class"})),
+        ]
+        print(f"{'consulta':<32} {'índices':>8} {'ms':>8} {'elementos':>10}")
+        for indexed in (False, True):
+            if indexed:
+                with open(os.path.join(ROOT_DIR, "docker-entrypoint-initdb.d", "03-indices.sql"), encoding="utf-8") as f:
+                    script = "\n".join(line for line in f if not line.startswith("--"))
+                with conn.cursor() as cur:
+                    cur.execute(script)
+                    cur.execute("ANALYZE elementos")
+            for name, query in queries:
+                with conn.cursor() as cur:
+                    ms, result = timed(args.runs, lambda: query(cur))
+                print(f"{name:<32} {'sí' if indexed else 'no':>8} {ms:>8.1f} {len(result):>10}")
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: historial de versiones de una pizarra (board_snapshots.py), sin base de datos.
+
+Simula una pizarra editada miles de veces (cada edición cambia, añade o borra unos pocos
+elementos, como un merge de /generate_uml_diagram) y guarda las filas de plan_version en
+memoria. Compara el tamaño del historial con guardar una copia completa por versión y mide
+el tiempo de guardar una versión y de reconstruir la peor versión (la más lejana a su
+checkpoint), que está acotado por SNAPSHOT_CHECKPOINT_EVERY.
+
+Uso:
+    python benchmarks/bench_board_snapshots.py [--elements 200] [--edits 5000]
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import board_snapshots  # noqa: E402
+from bench_codegen_service import build_diagram  # noqa: E402
+
+
+def edit(elementos, rng, next_id):
+    """Una edición pequeña: renombrar o añadir atributos a unas clases, añadir o borrar una."""
+    elementos = copy.deepcopy(elementos)
+    for _ in range(rng.randint(1, 3)):
+        el = rng.choice(elementos)
+        if rng.random() < 0.5:
+            el["attributes"].append(f"+ campo{rng.randint(0, 999)}: String")
+        else:
+            el["name"] = f"{el['name'].rstrip('0123456789')}{rng.randint(0, 999)}"
+    if rng.random() < 0.2:
+        elementos.append({"tipo": "Class", "id": next_id, "name": f"Nueva{next_id}", "attributes": ["+ id: Long (PK)"]})
+    if rng.random() < 0.1 and len(elementos) > 1:
+        del elementos[rng.randrange(len(elementos))]
+    return elementos
+
+
+def size(value):
+    return len(json.dumps(value, separators=(",", ":")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tamaño y tiempos del historial de versiones")
+    parser.add_argument("--elements", type=int, default=200)
+    parser.add_argument("--edits", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    elementos = build_diagram(args.elements)["elementos"]
+    history = {}
+    latest = None
+    full_bytes = 0
+    record_s = 0.0
+    previous = []
+    for i in range(args.edits):
+        started = time.perf_counter()
+        for version, tipo, contenido, base in board_snapshots.plan_version(latest, previous if latest else None,
+                                                                           previous, elementos):
+            history[version] = (tipo, json.dumps(contenido), base)
+            latest = (version, base)
+        record_s += time.perf_counter() - started
+        full_bytes += size(elementos)
+        previous, elementos = elementos, edit(elementos, rng, 100000 + i)
+
+    stored_bytes = sum(len(contenido) for _, contenido, _ in history.values())
+    checkpoints = sum(1 for tipo, _, _ in history.values() if tipo == board_snapshots.CHECKPOINT)
+    worst = max(history, key=lambda v: v - history[v][2])
+    started = time.perf_counter()
+    state = None
+    for version in range(history[worst][2], worst + 1):
+        tipo, contenido, _ = history[version]
+        state = json.loads(contenido) if tipo == board_snapshots.CHECKPOINT else \
+            board_snapshots.apply_json_patch(state, json.loads(contenido))
+    rebuild_ms = (time.perf_counter() - started) * 1000
+
+    print(f"versiones: {len(history)} ({checkpoints} checkpoints, cada {board_snapshots.SNAPSHOT_CHECKPOINT_EVERY})")
+    print(f"historial: {stored_bytes / 1024:.0f} KB frente a {full_bytes / 1024:.0f} KB con copias completas "
+          f"({full_bytes / stored_bytes:.1f}x menos)")
+    print(f"guardar versión: {record_s * 1000 / args.edits:.2f} ms de media")
+    print(f"reconstruir la versión {worst} ({worst - history[worst][2]} deltas): {rebuild_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: actualizaciones concurrentes de la IA sobre una misma pizarra (board_updates.py).
+
+Simula --clients colaboradores que lanzan a la vez una edición cada uno (leer -> LLM de
+--llm-ms -> reescribir la pizarra) contra un almacén en memoria con la latencia de lectura y
+escritura de la BDD y control de versión como pizarras.version. Compara:
+- directo: cada petición reescribe lo que leyó antes del LLM (comportamiento anterior),
+- coordinador: BoardUpdateCoordinator (ediciones reaplicadas y agrupadas por pizarra).
+Cuenta escrituras completas de la pizarra y ediciones perdidas (atributos añadidos que no
+están en el estado final).
+
+Uso:
+    python benchmarks/bench_board_updates.py [--clients 2 8 32] [--elements 200]
+"""
+
+import argparse
+import copy
+import os
+import random
+import sys
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from board_updates import BoardUpdateCoordinator, BoardVersionConflict  # noqa: E402
+from bench_codegen_service import build_diagram  # noqa: E402
+
+
+class Store:
+    """Pizarra en memoria con la latencia de la BDD y versión de fila."""
+
+    def __init__(self, elementos, io_ms):
+        self.elementos = elementos
+        self.version = 0
+        self.writes = 0
+        self.io = io_ms / 1000
+        self.lock = threading.Lock()
+
+    def load(self, board_id):
+        with self.lock:
+            version, elementos = self.version, copy.deepcopy(self.elementos)
+        time.sleep(self.io)
+        return elementos, version
+
+    def write(self, board_id, elementos, version=None, origen=None):
+        time.sleep(self.io * 2)
+        with self.lock:
+            if version is not None and version != self.version:
+                raise BoardVersionConflict(board_id)
+            self.elementos = copy.deepcopy(elementos)
+            self.version += 1
+            self.writes += 1
+            return self.version
+
+
+def run(mode, n_clients, n_elements, llm_ms, io_ms, seed):
+    rng = random.Random(seed)
+    store = Store(build_diagram(n_elements)["elementos"], io_ms)
+    coordinator = BoardUpdateCoordinator(store.load, store.write, wait=llm_ms / 1000)
+    delays = [rng.uniform(0.5, 1.5) * llm_ms / 1000 for _ in range(n_clients)]
+    targets = [rng.randrange(n_elements) for _ in range(n_clients)]
+
+    def client(i):
+        base, _ = store.load(1)
+        call = coordinator.begin(1) if mode == "coordinador" else None
+        time.sleep(delays[i])
+        result = copy.deepcopy(base)
+        result[targets[i]]["attributes"] = result[targets[i]]["attributes"] + [f"+ edicion{i}: String"]
+        if call is not None:
+            call.submit(base, result, "update")
+        else:
+            store.write(1, result)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(n_clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    final = {attr for el in store.elementos for attr in el["attributes"]}
+    lost = sum(1 for i in range(n_clients) if f"+ edicion{i}: String" not in final)
+    return store.writes, lost, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escrituras y ediciones perdidas con actualizaciones concurrentes")
+    parser.add_argument("--clients", type=int, nargs="+", default=[2, 8, 32])
+    parser.add_argument("--elements", type=int, default=200)
+    parser.add_argument("--llm-ms", type=float, default=300)
+    parser.add_argument("--io-ms", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'clientes':>9} {'modo':>12} {'escrituras':>11} {'perdidas':>9} {'s':>6}")
+    for n_clients in args.clients:
+        for mode in ("directo", "coordinador"):
+            writes, lost, elapsed = run(mode, n_clients, args.elements, args.llm_ms, args.io_ms, args.seed)
+            print(f"{n_clients:>9} {mode:>12} {writes:>11} {lost:>9} {elapsed:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: OCR local de las clases detectadas (class_ocr.py).
+
+Dibuja --diagrams diagramas con --classes cajas de generate_class_box (uml_dataset_generator.py)
+con texto conocido y mide:
+- la división en compartimentos y líneas (siempre): ms por clase y clases con el número de
+  líneas correcto en cada compartimento,
+- el reconocimiento (si está instalado el backend de OCR_BACKEND): una sola llamada por imagen
+  con todas las líneas frente a una llamada por clase, y atributos/métodos leídos exactamente.
+
+Uso:
+    OCR_BACKEND=tesseract python benchmarks/bench_class_ocr.py [--diagrams 20] [--classes 6]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import numpy as np  # noqa: E402
+from PIL import Image, ImageDraw  # noqa: E402
+
+import class_ocr  # noqa: E402
+from uml_dataset_generator import UMLDatasetGenerator  # noqa: E402
+
+WIDTH, HEIGHT = 1000, 750
+
+
+def build_diagram(generator, rng, n_classes):
+    """Imagen en gris, detecciones 'Class' y texto esperado de cada clase."""
+    image = Image.new('RGB', (WIDTH, HEIGHT), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    detections, expected = [], []
+    for cell in rng.sample(range(12), n_classes):
+        attributes = [f"+ {rng.choice(['nombre', 'id', 'fecha', 'estado'])}: {rng.choice(generator.attribute_types)}"
+                      for _ in range(rng.randint(0, 4))]
+        methods = [f"+ {rng.choice(['get', 'set', 'calcular', 'validar'])}(): {rng.choice(generator.method_types)}"
+                   for _ in range(rng.randint(0, 3))]
+        w, h = 180, 30 + len(attributes) * 20 + len(methods) * 20 + 10
+        x, y = 30 + (cell % 4) * 240, 30 + (cell // 4) * 240
+        name = rng.choice(generator.class_names)
+        generator.generate_class_box(draw, x, y, w, h, name, attributes, methods)
+        detections.append({'tipo': 'Class', 'x': x, 'y': y, 'w': w + 1, 'h': h + 1, 'confidence': 1.0})
+        expected.append({'name': name, 'attributes': attributes, 'methods': methods})
+    return np.asarray(image.convert('L')), detections, expected
+
+
+def layout_ok(gray, det, text):
+    x, y, w, h = det['x'], det['y'], det['w'], det['h']
+    border = class_ocr._BORDER
+    layout = class_ocr.class_layout(class_ocr._binary(gray[y + border:y + h - border, x + border:x + w - border]))
+    counts = (len(layout['name']), len(layout['attributes']), len(layout['methods']))
+    n_attrs, n_methods = len(text['attributes']), len(text['methods'])
+    # Sin atributos las dos separadoras coinciden: los métodos quedan en 'attributes'
+    return counts == ((1, n_attrs, n_methods) if n_attrs else (1, n_methods, 0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="División en líneas y OCR de las clases")
+    parser.add_argument("--diagrams", type=int, default=20)
+    parser.add_argument("--classes", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    generator = UMLDatasetGenerator()
+    rng = random.Random(args.seed)
+    diagrams = [build_diagram(generator, rng, args.classes) for _ in range(args.diagrams)]
+
+    started = time.perf_counter()
+    ok = sum(layout_ok(gray, det, text) for gray, dets, texts in diagrams for det, text in zip(dets, texts))
+    total = args.diagrams * args.classes
+    print(f"compartimentos: {ok}/{total} clases correctas, "
+          f"{(time.perf_counter() - started) * 1000 / total:.2f} ms/clase")
+
+    try:
+        recognizer = class_ocr.get_recognizer()
+    except class_ocr.OCRUnavailable as e:
+        print(f"reconocimiento: omitido ({e})")
+        return
+
+    for mode in ("una llamada por imagen", "una llamada por clase"):
+        started = time.perf_counter()
+        exact = lines = 0
+        for gray, dets, texts in diagrams:
+            if mode.endswith("imagen"):
+                found = class_ocr.read_classes(gray, dets, recognizer)
+            else:
+                found = [class_ocr.read_classes(gray, [det], recognizer)[0] for det in dets]
+            for got, text in zip(found, texts):
+                for key in ("attributes", "methods"):
+                    lines += len(text[key])
+                    exact += sum(a == b for a, b in zip(got[key], text[key]))
+        elapsed = (time.perf_counter() - started) * 1000 / args.diagrams
+        print(f"{mode:<24} {elapsed:>8.1f} ms/imagen  líneas exactas {exact}/{lines}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: generación en frío (un proceso por petición, como antes) vs servicio residente
+(codegen_service.py con plantillas ya compiladas) sobre un diagrama de 50 entidades.
+
+Uso:
+    python benchmarks/bench_codegen_service.py [--entities 50] [--runs 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TIPOS = ["String", "Int", "Double", "Boolean", "Date"]
+
+
+def build_diagram(n_entities: int) -> dict:
+    """Diagrama sintético: cada clase tiene 6 atributos y una relación con la anterior."""
+    elementos = []
+    for i in range(n_entities):
+        attributes = ["+ id: Long (PK)", "+ nombre: String"]
+        attributes += [f"+ campo{j}: {TIPOS[j % len(TIPOS)]}" for j in range(4)]
+        if i > 0:
+            attributes.append(f"+ entidad{i - 1}: Entidad{i - 1}")
+        elementos.append({"tipo": "Class", "id": i + 1, "name": f"Entidad{i}", "x": 0, "y": 0,
+                          "w": 170, "h": 150, "attributes": attributes, "methods": []})
+    return {"elementos": elementos}
+
+
+def bench_cold(diagram_path: str, output_dir: str, runs: int) -> list:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(ROOT_DIR, "generate_springboot.py"),
+                        "--input", diagram_path, "--output-dir", output_dir, "--no-cache"],
+                       check=True, capture_output=True)
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+
+def bench_warm(diagram: dict, output_dir: str, runs: int) -> tuple:
+    service = subprocess.Popen([sys.executable, os.path.join(ROOT_DIR, "codegen_service.py")],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                               text=True, bufsize=1)
+    try:
+        times = []
+        for i in range(runs + 1):
+            started = time.perf_counter()
+            service.stdin.write(json.dumps({"id": i, "diagram": diagram, "output_dir": output_dir,
+                                            "no_cache": True}) + "\n")
+            service.stdin.flush()
+            response = json.loads(service.stdout.readline())
+            if not response["ok"]:
+                raise RuntimeError(response["error"])
+            times.append((time.perf_counter() - started) * 1000)
+        # la primera petición incluye el arranque del proceso y la compilación de plantillas
+        return times[0], times[1:]
+    finally:
+        service.stdin.close()
+        service.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generación en frío vs servicio residente")
+    parser.add_argument("--entities", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    diagram = build_diagram(args.entities)
+    with tempfile.TemporaryDirectory() as tmp:
+        diagram_path = os.path.join(tmp, "diagram.json")
+        with open(diagram_path, "w", encoding="utf-8") as f:
+            json.dump(diagram, f)
+
+        cold = bench_cold(diagram_path, os.path.join(tmp, "cold"), args.runs)
+        first, warm = bench_warm(diagram, os.path.join(tmp, "warm"), args.runs)
+
+    print(f"Diagrama: {args.entities} entidades, {args.runs} ejecuciones")
+    print(f"  En frío (proceso nuevo):      mediana {statistics.median(cold):8.1f} ms")
+    print(f"  Servicio, primera petición:   {first:8.1f} ms")
+    print(f"  Servicio, en caliente:        mediana {statistics.median(warm):8.1f} ms")
+    print(f"  Aceleración:                  x{statistics.median(cold) / statistics.median(warm):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tiempo de generación y tamaño de los artefactos según formato y compresión.
+
+Recorre zip (stored/fast/default/best) y, si está instalado 'zstandard', tar.zst
+(stored/fast/default/best), además del archivo único en streaming (stream_bundle).
+
+Uso:
+    python benchmarks/bench_compression.py [--entities 200] [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import generate_springboot  # noqa: E402
+from bench_codegen_service import build_diagram  # noqa: E402
+
+
+class CountingSink:
+    """Stream no seekable que solo cuenta bytes (como una respuesta HTTP)."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo y tamaño por formato y compresión")
+    parser.add_argument("--entities", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    diagram = build_diagram(args.entities)
+    template_dir = os.path.join(ROOT_DIR, "templates")
+    env = generate_springboot.create_environment(template_dir)
+    formats = ["zip"] + (["tar.zst"] if generate_springboot.zstandard is not None else [])
+    if "tar.zst" not in formats:
+        print("(zstandard no instalado: se omite tar.zst)")
+
+    print(f"Diagrama: {args.entities} entidades, {args.runs} ejecuciones por modo")
+    print(f"{'modo':<18} {'ms (mediana)':>13} {'spring KB':>10} {'flutter KB':>11} {'stream KB':>10}")
+    for fmt in formats:
+        for compression in generate_springboot.COMPRESSION_MODES:
+            times = []
+            with tempfile.TemporaryDirectory() as tmp:
+                zip_path = os.path.join(tmp, generate_springboot.artifact_names(fmt, compression)[0])
+                for _ in range(args.runs):
+                    started = time.perf_counter()
+                    result = json.loads(generate_springboot.generate_project(
+                        diagram, zip_path, template_dir, env=env, fmt=fmt, compression=compression))
+                    times.append((time.perf_counter() - started) * 1000)
+            sink = CountingSink()
+            generate_springboot.stream_bundle(diagram, sink, template_dir, env=env, fmt=fmt, compression=compression)
+            sizes = result["sizes"]
+            spring_kb = sizes[os.path.basename(result["zipPath"])] / 1024
+            flutter_kb = sizes[os.path.basename(result["flutterZipPath"])] / 1024
+            print(f"{fmt + '/' + compression:<18} {statistics.median(times):>13.1f} "
+                  f"{spring_kb:>10.1f} {flutter_kb:>11.1f} {sink.size / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
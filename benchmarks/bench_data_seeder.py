@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark: generación de datos sintéticos (data_seeder.py) según el nº de filas.
+
+Usa un diagrama pequeño con relaciones (composiciones en cadena y una *..*) y escribe los
+CSV de todas las tablas en un directorio temporal; opcionalmente también el data.sql. Mide
+filas por segundo: el tiempo por fila debe mantenerse constante y 1M de filas por tabla debe
+generarse en segundos.
+
+Uso:
+    python benchmarks/bench_data_seeder.py [--rows 100000 1000000] [--entities 3] [--data-sql]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import data_seeder  # noqa: E402
+import generate_springboot  # noqa: E402
+from bench_sql_ddl import build_diagram, with_relations  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de generación de datos sintéticos")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--entities", type=int, default=3, help="Clases del diagrama")
+    parser.add_argument("--data-sql", action="store_true", help="Medir también el data.sql (INSERT)")
+    args = parser.parse_args()
+
+    entities = generate_springboot.build_entities(with_relations(build_diagram(args.entities))["elementos"])
+    production = generate_springboot.PRODUCTION_SETTINGS
+    print(f"{'filas/tabla':>12} {'tablas':>7} {'CSV s':>7} {'filas/s':>11} {'MB':>7} {'data.sql s':>11}")
+    for rows in args.rows:
+        plan = data_seeder.SeedPlan(entities, rows, production, seed=1)
+        total_rows = rows * len(plan.tables)
+        with tempfile.TemporaryDirectory() as tmp:
+            started = time.perf_counter()
+            paths = data_seeder.write_csv_dir(plan, tmp)
+            csv_s = time.perf_counter() - started
+            size_mb = sum(os.path.getsize(path) for path in paths) / (1024 * 1024)
+            sql_s = float("nan")
+            if args.data_sql:
+                started = time.perf_counter()
+                with open(os.path.join(tmp, "data.sql"), "w", encoding="utf-8") as f:
+                    for statement in plan.iter_data_sql():
+                        f.write(statement)
+                sql_s = time.perf_counter() - started
+        print(f"{rows:>12} {len(plan.tables):>7} {csv_s:>7.2f} {total_rows / csv_s:>11.0f} {size_mb:>7.1f} {sql_s:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pizarra como dicts JSON vs IR compartida (diagram_ir.py).
+
+Para cada tamaño de pizarra (clases + relaciones en la forma 'board') mide:
+  - memoria retenida por json.loads (dicts/listas/strings) y por la IR cargada desde esos dicts
+  - tiempo de json.loads, de diagram_ir.load (caché de atributos fría y caliente) y de dump
+  - búsqueda de clases por id y por nombre: recorrido lineal de la lista vs índices de la IR
+Comprueba además que load + dump devuelve la pizarra original.
+
+Uso:
+    python benchmarks/bench_diagram_ir.py [--elements 1000 10000] [--runs 3] [--lookups 1000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import diagram_ir  # noqa: E402
+
+TIPOS = ["String", "Integer", "Long", "Double", "Boolean", "LocalDate"]
+
+
+def build_board(n_elements: int) -> dict:
+    """Pizarra sintética: 2/3 clases con 8 atributos y 2 métodos, 1/3 relaciones entre ellas."""
+    n_classes = max(2, n_elements * 2 // 3)
+    elementos = []
+    for i in range(n_classes):
+        attributes = ["+ id: Long (PK)", "+ nombre: String", "- creado: LocalDate"]
+        attributes += [f"+ campo{j}: {TIPOS[j % len(TIPOS)]}" for j in range(5)]
+        elementos.append({"tipo": "Class", "id": f"c{i}", "name": f"Entidad{i}",
+                          "x": (i % 50) * 200, "y": (i // 50) * 180, "w": 170, "h": 190,
+                          "attributes": attributes,
+                          "methods": ["+ validar(): Boolean", f"+ calcular{i % 7}(valor: Double): Double"]})
+    kinds = list(diagram_ir.RELATION_KINDS)
+    for i in range(n_elements - n_classes):
+        elementos.append({"tipo": kinds[i % 4], "id": f"r{i}", "from": f"c{i % n_classes}",
+                          "to": f"c{(i * 7 + 1) % n_classes}", "label": "", "multOrigen": "1", "multDestino": "*"})
+    return {"elementos": elementos}
+
+
+def retained_kb(factory):
+    """KB que siguen vivos tras construir el objeto (se mantiene referenciado hasta medir)."""
+    gc.collect()
+    tracemalloc.start()
+    obj = factory()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return current / 1024
+
+
+def best_ms(fn, runs):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return min(times)
+
+
+def linear_find(elementos, key, value):
+    for item in elementos:
+        if item.get(key) == value:
+            return item
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pizarra en dicts JSON vs IR con __slots__")
+    parser.add_argument("--elements", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'elementos':>9} {'dicts KB':>9} {'IR KB':>8} {'json ms':>8} {'load frío':>10} {'load cal.':>10} "
+          f"{'dump ms':>8} {'id lineal':>10} {'id índice':>10} {'nombre lin.':>12} {'nombre índ.':>12}  ida/vuelta")
+    for n_elements in args.elements:
+        board = build_board(n_elements)
+        raw = json.dumps(board)
+
+        dict_kb = retained_kb(lambda: json.loads(raw))
+        # Memoria de la IR sin contar los dicts de entrada (se cargan antes de medir)
+        data = json.loads(raw)
+        diagram_ir.parse_attribute_text.cache_clear()
+        diagram_ir.parse_method_text.cache_clear()
+        ir_kb = retained_kb(lambda: diagram_ir.load(data))
+
+        json_ms = best_ms(lambda: json.loads(raw), args.runs)
+        cold = []
+        for _ in range(args.runs):
+            diagram_ir.parse_attribute_text.cache_clear()
+            diagram_ir.parse_method_text.cache_clear()
+            cold.append(best_ms(lambda: diagram_ir.load(data), 1))
+        warm_ms = best_ms(lambda: diagram_ir.load(data), args.runs)
+        diagram = diagram_ir.load(data)
+        dump_ms = best_ms(lambda: diagram_ir.dump(diagram), args.runs)
+        round_trip = diagram_ir.dump(diagram) == board
+
+        rng = random.Random(n_elements)
+        ids = [c.id for c in rng.choices(diagram.classes, k=args.lookups)]
+        names = [c.name.lower() for c in rng.choices(diagram.classes, k=args.lookups)]
+        elementos = data["elementos"]
+        id_linear = best_ms(lambda: [linear_find(elementos, "id", i) for i in ids], args.runs)
+        id_index = best_ms(lambda: [diagram.get(i) for i in ids], args.runs)
+        name_linear = best_ms(lambda: [next((e for e in elementos if e.get("name", "").lower() == n), None)
+                                       for n in names], args.runs)
+        name_index = best_ms(lambda: [diagram.find_class(n) for n in names], args.runs)
+
+        print(f"{n_elements:>9} {dict_kb:>9.0f} {ir_kb:>8.0f} {json_ms:>8.1f} {min(cold):>10.1f} {warm_ms:>10.1f} "
+              f"{dump_ms:>8.1f} {id_linear:>10.1f} {id_index:>10.2f} {name_linear:>12.1f} {name_index:>12.2f}  "
+              f"{'sí' if round_trip else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: regeneración completa vs incremental tras editar una sola clase.
+
+Para cada tamaño de diagrama genera el proyecto, añade un atributo a una clase y vuelve a
+generar en modo completo y en modo incremental (reutilizando la generación anterior).
+Comprueba además que ambos resultados son idénticos byte a byte.
+
+Uso:
+    python benchmarks/bench_incremental.py [--entities 100 500 1000] [--runs 3]
+"""
+
+import argparse
+import copy
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import generate_springboot  # noqa: E402
+from bench_codegen_service import build_diagram  # noqa: E402
+
+
+def generate(diagram, project_dir, template_dir, env, base=None):
+    os.makedirs(project_dir, exist_ok=True)
+    started = time.perf_counter()
+    result = json.loads(generate_springboot.generate_project(
+        diagram, os.path.join(project_dir, "spring_boot_project.zip"), template_dir,
+        env=env, workers=1, incremental_from=base))
+    return (time.perf_counter() - started) * 1000, result
+
+
+def same_artifacts(dir_a, dir_b):
+    for name in generate_springboot.ARTIFACT_NAMES:
+        with open(os.path.join(dir_a, name), "rb") as a, open(os.path.join(dir_b, name), "rb") as b:
+            if a.read() != b.read():
+                return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regeneración completa vs incremental")
+    parser.add_argument("--entities", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    template_dir = os.path.join(ROOT_DIR, "templates")
+    env = generate_springboot.create_environment(template_dir)
+
+    print(f"{'entidades':>9} {'completa ms':>12} {'incremental ms':>15} {'renderizados':>13}  idénticos")
+    for n_entities in args.entities:
+        diagram = build_diagram(n_entities)
+        full_times, incremental_times = [], []
+        with tempfile.TemporaryDirectory() as tmp:
+            incremental_dir = os.path.join(tmp, "incremental")
+            full_dir = os.path.join(tmp, "full")
+            generate(diagram, incremental_dir, template_dir, env)
+            for run in range(args.runs):
+                # Editar una clase distinta en cada ejecución
+                diagram = copy.deepcopy(diagram)
+                diagram["elementos"][(run * 7) % n_entities]["attributes"].append(f"+ nuevo{run}: String")
+                elapsed, result = generate(diagram, incremental_dir, template_dir, env, base=incremental_dir)
+                incremental_times.append(elapsed)
+                elapsed, _ = generate(diagram, full_dir, template_dir, env)
+                full_times.append(elapsed)
+            identical = same_artifacts(incremental_dir, full_dir)
+        rendered = result["incremental"]["rendered"]
+        total = rendered + result["incremental"]["reused"]
+        print(f"{n_entities:>9} {statistics.median(full_times):>12.1f} {statistics.median(incremental_times):>15.1f} "
+              f"{f'{rendered}/{total}':>13}  {'sí' if identical else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: conversiones de nombres (camel/pascal/snake) con y sin memorización
+sobre un diagrama de 500 entidades.
+
+Mide build_plan (parseo de atributos, tabla de nombres) y generate_project completo
+usando las funciones memorizadas y las originales sin caché (`__wrapped__`).
+
+Uso:
+    python benchmarks/bench_naming.py [--entities 500] [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import generate_springboot  # noqa: E402
+from bench_codegen_service import build_diagram  # noqa: E402
+
+CACHED_FUNCTIONS = {name: getattr(generate_springboot, name)
+                    for name in ("to_camel_case", "to_pascal_case", "to_snake_case", "_naming")}
+
+
+@contextmanager
+def uncached():
+    """Sustituye temporalmente las conversiones memorizadas por las funciones sin caché."""
+    try:
+        for name, fn in CACHED_FUNCTIONS.items():
+            setattr(generate_springboot, name, fn.__wrapped__)
+        yield
+    finally:
+        for name, fn in CACHED_FUNCTIONS.items():
+            setattr(generate_springboot, name, fn)
+
+
+def clear_caches():
+    for fn in CACHED_FUNCTIONS.values():
+        fn.cache_clear()
+
+
+def median_ms(fn, runs):
+    times = []
+    for _ in range(runs):
+        clear_caches()  # cada ejecución parte de cero, como un proceso nuevo
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversiones de nombres con y sin caché")
+    parser.add_argument("--entities", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    diagram = build_diagram(args.entities)
+    template_dir = os.path.join(ROOT_DIR, "templates")
+    env = generate_springboot.create_environment(template_dir)
+    names = [el["name"] for el in diagram["elementos"]] * 20
+
+    def conversions():
+        for name in names:
+            generate_springboot.to_pascal_case(name)
+            generate_springboot.to_camel_case(name)
+            generate_springboot.to_snake_case(name)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "spring_boot_project.zip")
+        cases = {
+            f"{len(names) * 3} conversiones": conversions,
+            "build_plan": lambda: generate_springboot.build_plan(diagram),
+            "generate_project": lambda: generate_springboot.generate_project(diagram, zip_path, template_dir,
+                                                                             env=env, workers=1),
+        }
+        print(f"Diagrama: {args.entities} entidades, {args.runs} ejecuciones")
+        print(f"{'caso':<22} {'sin caché ms':>13} {'con caché ms':>13}")
+        for label, fn in cases.items():
+            with uncached():
+                raw = median_ms(fn, args.runs)
+            cached = median_ms(fn, args.runs)
+            print(f"{label:<22} {raw:>13.1f} {cached:>13.1f}")
+    info = generate_springboot.to_snake_case.cache_info()
+    print(f"to_snake_case: {info.hits} aciertos / {info.misses} fallos en la última ejecución")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark: preprocesado de fotos de diagramas (photo_preprocess.py).
+
+Simula --photos fotos de móvil: una hoja con clases de generate_class_box (uml_dataset_generator.py)
+colocada en perspectiva aleatoria sobre un fondo más oscuro, con luz desigual, ruido y JPEG.
+Mide:
+- error de las esquinas detectadas (px de la foto, máximo de las 4) y fotos sin hoja detectada,
+- ms por etapa (mediana) y total,
+- tamaño enviado: JPEG de la foto frente al PNG preprocesado, y píxeles de inferencia.
+
+Con --images se procesan además imágenes reales (p. ej. uploads/*.jpg).
+
+Uso:
+    python benchmarks/bench_photo_preprocess.py [--photos 30] [--size 4000] [--images uploads/*.jpg]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+from PIL import Image, ImageDraw  # noqa: E402
+
+import photo_preprocess  # noqa: E402
+from uml_dataset_generator import UMLDatasetGenerator  # noqa: E402
+
+PAGE_WIDTH, PAGE_HEIGHT = 1000, 1400
+
+
+def build_page(generator, rng):
+    """Hoja en blanco con 6 clases, en BGR."""
+    image = Image.new('RGB', (PAGE_WIDTH, PAGE_HEIGHT), (250, 250, 245))
+    draw = ImageDraw.Draw(image)
+    for cell in rng.sample(range(12), 6):
+        attributes = [f"+ {rng.choice(['nombre', 'id', 'fecha'])}: {rng.choice(generator.attribute_types)}"
+                      for _ in range(rng.randint(1, 4))]
+        methods = [f"+ {rng.choice(['get', 'set', 'calcular'])}(): {rng.choice(generator.method_types)}"
+                   for _ in range(rng.randint(1, 3))]
+        w, h = 200, 30 + len(attributes) * 20 + len(methods) * 20 + 10
+        x = 80 + (cell % 3) * 300 + rng.randint(0, 40)
+        y = 80 + (cell // 3) * 320 + rng.randint(0, 40)
+        generator.generate_class_box(draw, x, y, w, h, rng.choice(generator.class_names), attributes, methods)
+    return cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR)
+
+
+def build_photo(page, rng, size):
+    """Foto (JPEG decodificado y bytes) de `page` en perspectiva, y sus esquinas verdaderas."""
+    height, width = size, size * 3 // 4
+    cx, cy = width / 2, height / 2
+    half_w, half_h = width * 0.33, height * 0.33
+    corners = np.float32([[cx - half_w, cy - half_h], [cx + half_w, cy - half_h],
+                          [cx + half_w, cy + half_h], [cx - half_w, cy + half_h]])
+    corners += np.float32([[rng.uniform(-0.1, 0.1) * width, rng.uniform(-0.08, 0.08) * height] for _ in range(4)])
+    source = np.float32([[0, 0], [PAGE_WIDTH, 0], [PAGE_WIDTH, PAGE_HEIGHT], [0, PAGE_HEIGHT]])
+    matrix = cv2.getPerspectiveTransform(source, corners)
+    background = np.full((height, width, 3), [rng.randint(40, 120) for _ in range(3)], np.uint8)
+    photo = cv2.warpPerspective(page, matrix, (width, height), dst=background, borderMode=cv2.BORDER_TRANSPARENT)
+    light = np.linspace(rng.uniform(0.55, 0.8), rng.uniform(0.95, 1.1), width, dtype=np.float32)
+    if rng.random() < 0.5:
+        light = light[::-1]
+    noise = np.random.default_rng(rng.randint(0, 1 << 30)).normal(0, 5, photo.shape).astype(np.float32)
+    photo = np.clip(photo * light[None, :, None] + noise, 0, 255).astype(np.uint8)
+    data = cv2.imencode('.jpg', photo, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR), data, corners
+
+
+def run(image, source_bytes, stats):
+    started = time.perf_counter()
+    result, info = photo_preprocess.preprocess_photo(image)
+    payload = photo_preprocess.encode_png(result)
+    stats['total'].append((time.perf_counter() - started) * 1000)
+    for stage, ms in info['timings'].items():
+        stats.setdefault(stage, []).append(ms)
+    stats['kb_in'].append(source_bytes / 1024)
+    stats['kb_out'].append(len(payload) / 1024)
+    stats['pixels'].append(result.shape[0] * result.shape[1] / (image.shape[0] * image.shape[1]))
+    return info
+
+
+def report(title, stats):
+    print(title)
+    stages = [key for key in stats if key not in ('total', 'kb_in', 'kb_out', 'pixels')]
+    print("  " + ", ".join(f"{stage} {statistics.median(stats[stage]):.1f} ms" for stage in stages)
+          + f" | total {statistics.median(stats['total']):.1f} ms")
+    print(f"  envío {statistics.median(stats['kb_in']):.0f} KB -> {statistics.median(stats['kb_out']):.0f} KB, "
+          f"píxeles {statistics.median(stats['pixels']) * 100:.0f}% del original")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Corrección de perspectiva y binarizado de fotos")
+    parser.add_argument("--photos", type=int, default=30)
+    parser.add_argument("--size", type=int, default=4000, help="lado mayor de la foto simulada")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--images", nargs="*", default=[])
+    args = parser.parse_args()
+
+    generator = UMLDatasetGenerator()
+    rng = random.Random(args.seed)
+    stats = {'total': [], 'kb_in': [], 'kb_out': [], 'pixels': []}
+    errors, missed = [], 0
+    for _ in range(args.photos):
+        image, data, corners = build_photo(build_page(generator, rng), rng, args.size)
+        info = run(image, len(data), stats)
+        if info['quad'] is None:
+            missed += 1
+        else:
+            errors.append(float(np.abs(np.float32(info['quad']) - corners).max()))
+    report(f"fotos simuladas ({args.photos}, lado {args.size} px):", stats)
+    if errors:
+        print(f"  esquinas: error máximo mediana {statistics.median(errors):.1f} px, "
+              f"peor {max(errors):.1f} px; sin hoja {missed}/{args.photos}")
+
+    if args.images:
+        stats = {'total': [], 'kb_in': [], 'kb_out': [], 'pixels': []}
+        pages = 0
+        for path in args.images:
+            image = cv2.imread(path)
+            if image is None:
+                continue
+            pages += run(image, os.path.getsize(path), stats)['page']
+        if stats['total']:
+            report(f"imágenes reales ({len(stats['total'])}, {pages} con hoja corregida):", stats)
+
+
+if __name__ == "__main__":
+    main()
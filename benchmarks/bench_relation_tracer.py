@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: relaciones a partir de las cajas del detector (uml_relation_tracer.py).
+
+Dibuja --diagrams diagramas con las funciones de uml_dataset_generator.py (cajas de clase y
+flechas de cada tipo, con los extremos en el borde de las clases como en un diagrama real) y
+usa como detecciones las anotaciones YOLO del propio generador (caja de la línea ±10 px).
+Mide el tiempo por diagrama y compara con la verdad del generador:
+- par: la relación une las dos clases correctas,
+- sentido: desde/hacia correctos (solo tipos con punta: Association, Aggregation, Generalization),
+- tipo: el tipo canónico coincide (Dependency cuenta como Association).
+
+Uso:
+    python benchmarks/bench_relation_tracer.py [--diagrams 200] [--classes 6] [--relations 5]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import numpy as np  # noqa: E402
+from PIL import Image, ImageDraw  # noqa: E402
+
+import uml_relation_tracer  # noqa: E402
+from uml_dataset_generator import UMLDatasetGenerator  # noqa: E402
+
+WIDTH, HEIGHT = 1000, 750
+RELATION_TYPES = ['Association', 'Dependency', 'Aggregation', 'Generalization']
+HEADED = {'Association', 'Aggregation', 'Generalization'}
+
+
+def _border_point(cls, towards):
+    """Punto del borde de `cls` en la recta de su centro hacia `towards`."""
+    cx, cy = cls['x'] + cls['w'] / 2, cls['y'] + cls['h'] / 2
+    dx, dy = towards[0] - cx, towards[1] - cy
+    scale = min(cls['w'] / 2 / abs(dx) if dx else float('inf'), cls['h'] / 2 / abs(dy) if dy else float('inf'))
+    return int(round(cx + dx * scale)), int(round(cy + dy * scale))
+
+
+def build_diagram(generator, rng, n_classes, n_relations):
+    """Imagen, detecciones (anotaciones del generador) y relaciones esperadas (índices de clase)."""
+    image = Image.new('RGB', (WIDTH, HEIGHT), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    cols = 3
+    cells = rng.sample(range(cols * 3), n_classes)
+    classes = []
+    for cell in cells:
+        attributes = [f"+ {rng.choice(['nombre', 'id', 'fecha', 'estado'])}: {rng.choice(generator.attribute_types)}"
+                      for _ in range(rng.randint(1, 3))]
+        methods = [f"+ {rng.choice(['get', 'set', 'calcular'])}(): {rng.choice(generator.method_types)}"
+                   for _ in range(rng.randint(1, 2))]
+        w, h = 150, 30 + len(attributes) * 20 + len(methods) * 20 + 10
+        x = 40 + (cell % cols) * (WIDTH // cols) + rng.randint(0, WIDTH // cols - w - 80)
+        y = 40 + (cell // cols) * (HEIGHT // 3) + rng.randint(0, HEIGHT // 3 - h - 80)
+        classes.append({'name': rng.choice(generator.class_names), 'x': x, 'y': y, 'w': w, 'h': h})
+        generator.generate_class_box(draw, x, y, w, h, classes[-1]['name'], attributes, methods)
+
+    pairs = [(a, b) for a in range(n_classes) for b in range(a + 1, n_classes)]
+    relations, expected = [], []
+    for a, b in rng.sample(pairs, min(n_relations, len(pairs))):
+        if rng.random() < 0.5:
+            a, b = b, a
+        relation_type = rng.choice(RELATION_TYPES)
+        centre_b = (classes[b]['x'] + classes[b]['w'] / 2, classes[b]['y'] + classes[b]['h'] / 2)
+        centre_a = (classes[a]['x'] + classes[a]['w'] / 2, classes[a]['y'] + classes[a]['h'] / 2)
+        x1, y1 = _border_point(classes[a], centre_b)
+        x2, y2 = _border_point(classes[b], centre_a)
+        generator.generate_arrow(draw, x1, y1, x2, y2, relation_type)
+        relations.append({'type': relation_type, 'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2})
+        expected.append((relation_type, a, b))
+
+    names = {class_id: name for name, class_id in generator.classes.items()}
+    detections = []
+    for ann in generator.create_yolo_annotations(classes, relations, WIDTH, HEIGHT):
+        w, h = ann['width'] * WIDTH, ann['height'] * HEIGHT
+        detections.append({'tipo': names[ann['class_id']], 'x': round(ann['x_center'] * WIDTH - w / 2),
+                           'y': round(ann['y_center'] * HEIGHT - h / 2), 'w': round(w), 'h': round(h),
+                           'confidence': 1.0})
+    # cv2 trabaja en BGR
+    return np.ascontiguousarray(np.asarray(image)[:, :, ::-1]), detections, expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo y acierto del trazado de relaciones")
+    parser.add_argument("--diagrams", type=int, default=200)
+    parser.add_argument("--classes", type=int, default=6)
+    parser.add_argument("--relations", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    generator = UMLDatasetGenerator()
+    rng = random.Random(args.seed)
+    diagrams = [build_diagram(generator, rng, args.classes, args.relations) for _ in range(args.diagrams)]
+
+    times, total, pair_ok, headed, direction_ok, kind_ok = [], 0, 0, 0, 0, 0
+    for image, detections, expected in diagrams:
+        started = time.perf_counter()
+        found = uml_relation_tracer.trace_relations(image, detections)
+        times.append((time.perf_counter() - started) * 1000)
+        remaining = list(found)
+        for relation_type, a, b in expected:
+            total += 1
+            rel = next((r for r in remaining if {r['desde'], r['hacia']} == {a, b}), None)
+            if rel is None:
+                continue
+            remaining.remove(rel)
+            pair_ok += 1
+            kind_ok += rel['tipo'] == uml_relation_tracer.DETECTION_KINDS[relation_type]
+            if relation_type in HEADED:
+                headed += 1
+                direction_ok += (rel['desde'], rel['hacia']) == (a, b)
+
+    times.sort()
+    print(f"diagramas: {args.diagrams}  clases: {args.classes}  relaciones: {total}")
+    print(f"ms/diagrama  mediana {statistics.median(times):.2f}  p95 {times[int(len(times) * 0.95)]:.2f}  "
+          f"máx {times[-1]:.2f}")
+    print(f"par {pair_ok / total:.1%}  sentido {direction_ok / max(1, headed):.1%}  tipo {kind_ok / total:.1%}")
+
+
+if __name__ == "__main__":
+    main()
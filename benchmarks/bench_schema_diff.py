@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: migración entre dos versiones de un diagrama grande (schema_diff.py).
+
+Para cada tamaño genera un diagrama con relaciones y una segunda versión en la que se
+renombra el 5% de las clases, se añade un atributo al 10% y se elimina el 2%. Mide la
+construcción de los modelos de esquema y el diff, por separado de build_entities (común a
+toda la generación). El tiempo por clase debe mantenerse constante (diff lineal).
+
+Uso:
+    python benchmarks/bench_schema_diff.py [--entities 1000 5000 10000] [--runs 3]
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import generate_springboot  # noqa: E402
+import schema_diff  # noqa: E402
+from bench_sql_ddl import build_diagram, with_relations  # noqa: E402
+
+
+def edit_board(diagram):
+    """Segunda versión del diagrama: renombrados, atributos nuevos y clases eliminadas."""
+    new = copy.deepcopy(diagram)
+    classes = [el for el in new["elementos"] if el["tipo"] == "Class"]
+    removed = {el["id"] for i, el in enumerate(classes) if i % 50 == 49}
+    for i, el in enumerate(classes):
+        if i % 20 == 0:
+            el["name"] = f"Renombrada{i}"
+        if i % 10 == 5:
+            el["attributes"].append("+ observaciones: String")
+    new["elementos"] = [el for el in new["elementos"]
+                        if el.get("id") not in removed and el.get("from") not in removed and el.get("to") not in removed]
+    return new
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo del diff de esquema entre dos versiones")
+    parser.add_argument("--entities", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    production = generate_springboot.PRODUCTION_SETTINGS
+    print(f"{'clases':>7} {'entidades ms':>13} {'diff ms':>8} {'µs/clase':>9} {'sentencias':>11}")
+    for n_entities in args.entities:
+        old_board = with_relations(build_diagram(n_entities))
+        new_board = edit_board(old_board)
+        started = time.perf_counter()
+        old_entities = generate_springboot.build_entities(old_board["elementos"])
+        new_entities = generate_springboot.build_entities(new_board["elementos"])
+        entities_ms = (time.perf_counter() - started) * 1000
+        times = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            statements = schema_diff.diff_entities(old_entities, new_entities, production)
+            times.append((time.perf_counter() - started) * 1000)
+        diff_ms = min(times)
+        print(f"{n_entities:>7} {entities_ms:>13.1f} {diff_ms:>8.1f} {diff_ms * 1000 / n_entities:>9.1f} {len(statements):>11}")
+
+
+if __name__ == "__main__":
+    main()
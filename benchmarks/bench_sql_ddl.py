@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: generación del DDL (sql_ddl.py) según el tamaño del diagrama.
+
+Para cada tamaño prepara las entidades (build_entities, incluye el grafo de relaciones) y
+escribe el esquema en un archivo temporal sentencia a sentencia. El tiempo por clase debe
+mantenerse constante (generación lineal en clases + relaciones).
+
+Uso:
+    python benchmarks/bench_sql_ddl.py [--entities 1000 5000 10000] [--runs 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import generate_springboot  # noqa: E402
+import sql_ddl  # noqa: E402
+from bench_codegen_service import build_diagram  # noqa: E402
+
+
+def with_relations(diagram):
+    """Añade relaciones del diagrama: 1..* con la clase anterior y *..* cada 10 clases."""
+    elementos = diagram["elementos"]
+    classes = [el for el in elementos if el["tipo"] == "Class"]
+    for i in range(1, len(classes)):
+        elementos.append({"tipo": "Composition", "id": f"r{i}", "from": classes[i - 1]["id"], "to": classes[i]["id"],
+                          "multOrigen": "1", "multDestino": "1..*"})
+        if i % 10 == 0:
+            elementos.append({"tipo": "Association", "id": f"m{i}", "from": classes[i]["id"],
+                              "to": classes[i // 2]["id"], "multOrigen": "*", "multDestino": "*"})
+    return diagram
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de generación del DDL")
+    parser.add_argument("--entities", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    production = generate_springboot.PRODUCTION_SETTINGS
+    print(f"{'clases':>7} {'relaciones':>11} {'entidades ms':>13} {'DDL ms':>8} {'µs/clase':>9} {'sentencias':>11} {'KB':>7}")
+    for n_entities in args.entities:
+        elementos = with_relations(build_diagram(n_entities))["elementos"]
+        n_relations = sum(1 for el in elementos if el["tipo"] != "Class")
+        plan_times, ddl_times = [], []
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "schema.sql")
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                entities = generate_springboot.build_entities(elementos)
+                plan_times.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                with open(path, "w", encoding="utf-8") as f:
+                    count = sql_ddl.write_schema(entities, f, production)
+                ddl_times.append((time.perf_counter() - started) * 1000)
+            size_kb = os.path.getsize(path) / 1024
+        ddl_ms = min(ddl_times)
+        print(f"{n_entities:>7} {n_relations:>11} {min(plan_times):>13.1f} {ddl_ms:>8.1f} "
+              f"{ddl_ms * 1000 / n_entities:>9.1f} {count:>11} {size_kb:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
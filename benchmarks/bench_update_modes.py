@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: modo "update" (pizarra completa) vs modo "patch" (operaciones) de model_gemini.
+
+Ejecuta una batería de prompts de edición sobre la misma pizarra base y compara tokens de
+salida y latencia de cada modo. Requiere acceso al modelo configurado en model_gemini.py.
+
+Uso:
+    python benchmarks/bench_update_modes.py [--repeat 1]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_gemini  # noqa: E402
+
+CLASES_BASE = {
+    "Biblioteca": ["+ nombre: String", "+ direccion: String"],
+    "Libro": ["+ titulo: String", "+ isbn: String", "+ anio: Int"],
+    "Autor": ["+ nombre: String", "+ nacionalidad: String"],
+    "Editorial": ["+ nombre: String", "+ pais: String"],
+    "Socio": ["+ nombre: String", "+ email: String", "+ telefono: String"],
+    "Prestamo": ["+ fechaInicio: Date", "+ fechaFin: Date"],
+    "Ejemplar": ["+ codigo: String", "+ estado: String"],
+    "Categoria": ["+ nombre: String", "+ descripcion: String"],
+    "Multa": ["+ monto: Double", "+ pagada: Boolean"],
+    "Empleado": ["+ nombre: String", "+ cargo: String"],
+}
+
+RELACIONES_BASE = [
+    ("Composition", "Biblioteca", "Ejemplar"),
+    ("Association", "Ejemplar", "Libro"),
+    ("Association", "Libro", "Autor"),
+    ("Association", "Libro", "Editorial"),
+    ("Association", "Libro", "Categoria"),
+    ("Association", "Socio", "Prestamo"),
+    ("Association", "Prestamo", "Ejemplar"),
+    ("Composition", "Prestamo", "Multa"),
+    ("Aggregation", "Biblioteca", "Empleado"),
+]
+
+PROMPTS_EDICION = [
+    "Agrega el atributo + genero: String a la clase Libro",
+    "Renombra la clase Socio a Lector",
+    "Elimina la clase Multa",
+    "Agrega el método + renovar(): void a Prestamo",
+    "Crea una clase Reserva con fecha: Date y relaciónala con Socio",
+    "Quita el atributo + telefono: String de Socio",
+    "Cambia la multiplicidad de la relación Libro-Autor a muchos a muchos",
+]
+
+
+def build_base_board() -> dict:
+    elementos = []
+    ids = {}
+    for i, (name, attrs) in enumerate(CLASES_BASE.items(), start=1):
+        ids[name] = i
+        elementos.append({
+            "tipo": "Class", "id": i, "name": name,
+            "x": 100 + (i % 5) * 220, "y": 100 + (i // 5) * 220, "w": 170, "h": 150,
+            "attributes": attrs, "methods": [],
+        })
+    for j, (tipo, origen, destino) in enumerate(RELACIONES_BASE, start=100):
+        elementos.append({
+            "tipo": tipo, "id": j, "from": ids[origen], "to": ids[destino],
+            "label": "", "multOrigen": "1", "multDestino": "*",
+        })
+    return {"elementos": elementos}
+
+
+def run_mode(mode: str, prompt: str, board: dict) -> dict:
+    stats = {}
+    started = time.perf_counter()
+    if mode == "patch":
+        output = model_gemini.generate_uml_patch_json(prompt, board, stats=stats)
+    else:
+        output = model_gemini.generate_uml_class_diagram_json(prompt, board, mode="update", stats=stats)
+    # Latencia total (incluye el fallback a regeneración completa si ocurrió)
+    stats["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    parsed = json.loads(output)
+    stats["ok"] = "error" not in parsed
+    stats["fallback"] = bool(parsed.get("patch", {}).get("fallback"))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los modos update y patch")
+    parser.add_argument("--repeat", type=int, default=1, help="Repeticiones por prompt")
+    args = parser.parse_args()
+
+    board = build_base_board()
+    resultados = {"update": [], "patch": []}
+
+    print(f"{'prompt':<55} {'modo':<7} {'tok_out':>8} {'lat_ms':>9}  estado")
+    for prompt in PROMPTS_EDICION:
+        for _ in range(args.repeat):
+            for mode in ("update", "patch"):
+                stats = run_mode(mode, prompt, board)
+                resultados[mode].append(stats)
+                estado = "ok" if stats["ok"] else "error"
+                if stats["fallback"]:
+                    estado += " (fallback)"
+                print(f"{prompt[:55]:<55} {mode:<7} {str(stats.get('output_tokens')):>8} "
+                      f"{stats.get('latency_ms', 0):>9.1f}  {estado}")
+
+    print("\nResumen:")
+    for mode, rows in resultados.items():
+        tokens = [r["output_tokens"] for r in rows if r.get("output_tokens") is not None]
+        latencias = [r["latency_ms"] for r in rows if r.get("latency_ms") is not None]
+        fallbacks = sum(1 for r in rows if r["fallback"])
+        print(f"  {mode:<7} tokens_salida mediana={statistics.median(tokens) if tokens else 'n/d'}  "
+              f"latencia mediana={statistics.median(latencias) if latencias else 'n/d'} ms  "
+              f"fallbacks={fallbacks}/{len(rows)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# board_queries.py
+"""
+Lecturas de la tabla 'elementos' con proyección de claves JSONB.
+
+`SELECT propiedades ...` trae y decodifica el JSON completo de cada elemento (coordenadas,
+tamaño, métodos...). Cuando el llamador solo necesita unas claves (el prompt de creación, el
+esquema para schema_diff.py), fetch_elements pide solo esas con `propiedades -> 'clave'`,
+así PostgreSQL envía menos bytes y psycopg2 decodifica valores pequeños. Las claves que un
+elemento no tiene (o que valen null) no aparecen en el diccionario resultante.
+
+Índices (docker-entrypoint-initdb.d/03-indices.sql):
+- (pizarra_id, id): el filtro por pizarra con ORDER BY id se resuelve sin ordenar.
+- GIN jsonb_path_ops sobre propiedades: filtros de contención (`match`, operador @>).
+
+Para pizarras muy grandes iter_elements usa un cursor de servidor y trae las filas por
+bloques de BOARD_CURSOR_ITERSIZE, sin cargar todo el resultado en memoria.
+"""
+import os
+
+BOARD_CURSOR_ITERSIZE = int(os.getenv("BOARD_CURSOR_ITERSIZE", "2000"))
+
+# Claves que usa el prompt de creación (sin coordenadas ni tamaño)
+PROMPT_FIELDS = ("id", "tipo", "name", "attributes", "methods", "from", "to", "label", "multOrigen", "multDestino")
+# Claves que usa generate_springboot.build_entities (esquema de base de datos)
+SCHEMA_FIELDS = ("id", "tipo", "name", "attributes", "from", "to", "label", "multOrigen", "multDestino")
+
+
+def _select(fields, match) -> tuple[str, list]:
+    """Consulta y parámetros (sin pizarra_id) para las claves `fields` (None = propiedades completas)."""
+    params = []
+    if fields:
+        columns = ", ".join("propiedades -> %s" for _ in fields)
+        params.extend(fields)
+    else:
+        columns = "propiedades"
+    sql = f"SELECT {columns} FROM elementos WHERE pizarra_id = %s"
+    if match:
+        sql += " AND propiedades @> %s"
+    return sql + " ORDER BY id", params
+
+
+def _params(params: list, pizarra_id: int, match) -> tuple:
+    from psycopg2.extras import Json
+
+    return tuple(params) + (pizarra_id,) + ((Json(match),) if match else ())
+
+
+def _rows_to_elements(rows, fields) -> list:
+    if not fields:
+        return [row[0] for row in rows]
+    return [{key: value for key, value in zip(fields, row) if value is not None} for row in rows]
+
+
+def fetch_elements(cur, pizarra_id: int, fields: tuple | None = None, match: dict | None = None) -> list:
+    """
+    Elementos de la pizarra en orden de inserción. Con `fields` solo esas claves; con `match`
+    solo los elementos cuyo JSON contiene ese objeto (p. ej. {"tipo": "Class"}, usa el GIN).
+    """
+    sql, params = _select(fields, match)
+    cur.execute(sql, _params(params, pizarra_id, match))
+    return _rows_to_elements(cur.fetchall(), fields)
+
+
+def iter_elements(conn, pizarra_id: int, fields: tuple | None = None, match: dict | None = None,
+                  itersize: int = BOARD_CURSOR_ITERSIZE):
+    """Como fetch_elements pero en streaming con un cursor de servidor (dentro de la transacción de `conn`)."""
+    sql, params = _select(fields, match)
+    with conn.cursor(name=f"elementos_{pizarra_id}") as cur:
+        cur.itersize = itersize
+        cur.execute(sql, _params(params, pizarra_id, match))
+        while True:
+            rows = cur.fetchmany(itersize)
+            if not rows:
+                break
+            yield from _rows_to_elements(rows, fields)
@@ -0,0 +1,199 @@
+# board_snapshots.py
+"""
+Historial de versiones de cada pizarra (tabla pizarra_versiones).
+
+El estado vigente sigue en la tabla 'elementos' (cargar la última versión es el mismo SELECT
+de siempre); aquí solo se añade, en la misma transacción que cada sincronización, una fila
+por versión:
+- 'delta': operaciones JSON Patch (RFC 6902: add/remove/replace) desde la versión anterior.
+- 'checkpoint': la lista completa de elementos, cada SNAPSHOT_CHECKPOINT_EVERY versiones o
+  cuando el delta ocupa más que el estado completo.
+
+Cada fila guarda `base`, la versión del checkpoint del que parte su cadena de deltas, así que
+reconstruir cualquier versión lee un checkpoint y como mucho SNAPSHOT_CHECKPOINT_EVERY - 1
+deltas, en una sola consulta por la clave primaria.
+"""
+import json
+import os
+from difflib import SequenceMatcher
+
+# Configuración (se puede sobreescribir con variables de entorno)
+SNAPSHOT_CHECKPOINT_EVERY = max(1, int(os.getenv("SNAPSHOT_CHECKPOINT_EVERY", "50")))
+SNAPSHOT_LIST_LIMIT = int(os.getenv("SNAPSHOT_LIST_LIMIT", "100"))
+
+CHECKPOINT = "checkpoint"
+DELTA = "delta"
+
+
+def _escape(key) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _item_key(item):
+    """Clave para alinear elementos de una lista: el id de los elementos de la pizarra o el valor."""
+    if isinstance(item, dict):
+        return ("id", item["id"]) if "id" in item else json.dumps(item, sort_keys=True)
+    if isinstance(item, list):
+        return json.dumps(item, sort_keys=True)
+    return (type(item).__name__, item)
+
+
+def json_diff(old, new, path: str = "") -> list:
+    """
+    Operaciones JSON Patch que transforman `old` en `new`. Los objetos se comparan clave a
+    clave y las listas recortando el prefijo y el sufijo comunes, así que insertar, borrar o
+    editar un elemento de la pizarra produce solo las operaciones de ese elemento (el tramo
+    que difiere se alinea con difflib por id de elemento).
+    """
+    if type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+    if old == new:
+        return []
+    if isinstance(old, dict):
+        ops = [{"op": "remove", "path": f"{path}/{_escape(key)}"} for key in old if key not in new]
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(json_diff(old[key], value, child))
+        return ops
+    if isinstance(old, list):
+        start = 0
+        limit = min(len(old), len(new))
+        while start < limit and old[start] == new[start]:
+            start += 1
+        end_old, end_new = len(old), len(new)
+        while end_old > start and end_new > start and old[end_old - 1] == new[end_new - 1]:
+            end_old -= 1
+            end_new -= 1
+        # Tramo central: alinear por id (o por valor) para que borrar o insertar en medio no
+        # desplace las comparaciones del resto; se recorre de izquierda a derecha, así que la
+        # posición en el documento es la del elemento en `new`
+        ops = []
+        matcher = SequenceMatcher(None, [_item_key(item) for item in old[start:end_old]],
+                                  [_item_key(item) for item in new[start:end_new]], autojunk=False)
+        for _, i1, i2, j1, j2 in matcher.get_opcodes():
+            common = min(i2 - i1, j2 - j1)
+            for k in range(common):
+                ops.extend(json_diff(old[start + i1 + k], new[start + j1 + k], f"{path}/{start + j1 + k}"))
+            ops.extend({"op": "remove", "path": f"{path}/{start + j1 + common}"} for _ in range(i2 - i1 - common))
+            ops.extend({"op": "add", "path": f"{path}/{start + j}", "value": new[start + j]}
+                       for j in range(j1 + common, j2))
+        return ops
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def apply_json_patch(doc, ops: list):
+    """Aplica operaciones add/remove/replace sobre `doc` (lo modifica) y devuelve el resultado."""
+    for op in ops:
+        path = op["path"]
+        if path == "":
+            doc = op.get("value")
+            continue
+        *parents, last = [_unescape(token) for token in path[1:].split("/")]
+        target = doc
+        for token in parents:
+            target = target[int(token)] if isinstance(target, list) else target[token]
+        kind = op["op"]
+        if isinstance(target, list):
+            index = len(target) if last == "-" else int(last)
+            if kind == "add":
+                target.insert(index, op["value"])
+            elif kind == "remove":
+                del target[index]
+            elif kind == "replace":
+                target[index] = op["value"]
+            else:
+                raise ValueError(f"Operación JSON Patch no soportada: {kind}")
+        elif kind in ("add", "replace"):
+            target[last] = op["value"]
+        elif kind == "remove":
+            del target[last]
+        else:
+            raise ValueError(f"Operación JSON Patch no soportada: {kind}")
+    return doc
+
+
+def _next_row(version: int, base: int, old: list, new: list) -> tuple:
+    """Fila de la versión `version` (`new`): delta contra `old`, o checkpoint si toca o es más corto."""
+    ops = json_diff(old, new)
+    if version - base >= SNAPSHOT_CHECKPOINT_EVERY or \
+            len(json.dumps(ops, separators=(",", ":"))) >= len(json.dumps(new, separators=(",", ":"))):
+        return version, CHECKPOINT, new, version
+    return version, DELTA, ops, base
+
+
+def plan_version(latest: tuple | None, recorded: list | None, previous: list, elementos: list) -> list:
+    """
+    Filas (version, tipo, contenido, base) que hay que añadir para guardar `elementos`.
+    `latest` es (version, base) de la última fila y `recorded` sus elementos reconstruidos, o
+    None si la pizarra no tiene historial; en ese caso el estado anterior, si no está vacío, se
+    guarda antes como checkpoint 1. Si `previous` (lo que había en 'elementos') no coincide con
+    `recorded` (ediciones guardadas sin pasar por aquí, p. ej. el socket de server.js), se
+    guarda antes como versión propia: cada delta se aplica sobre el estado del que se calculó.
+    """
+    rows = []
+    if latest is None:
+        if not previous:
+            return [(1, CHECKPOINT, elementos, 1)]
+        rows.append((1, CHECKPOINT, previous, 1))
+    elif recorded != previous:
+        rows.append(_next_row(latest[0] + 1, latest[1], recorded, previous))
+    else:
+        return [_next_row(latest[0] + 1, latest[1], previous, elementos)]
+    version, _, _, base = rows[-1]
+    rows.append(_next_row(version + 1, base, previous, elementos))
+    return rows
+
+
+def record_version(cur, pizarra_id: int, previous: list, elementos: list, origen: str | None = None) -> int:
+    """
+    Añade la versión de `elementos` (el estado anterior es `previous`) con el cursor de la
+    transacción que sincroniza la pizarra. Devuelve el número de versión nuevo. Las filas
+    previas que haga falta añadir llevan origen 'inicial' (primer historial) o 'externo'.
+    """
+    from psycopg2.extras import Json
+
+    cur.execute("SELECT version, base FROM pizarra_versiones WHERE pizarra_id = %s "
+                "ORDER BY version DESC LIMIT 1", (pizarra_id,))
+    latest = cur.fetchone()
+    recorded = load_version(cur, pizarra_id, latest[0]) if latest else None
+    rows = plan_version(tuple(latest) if latest else None, recorded, previous, elementos)
+    earlier = "externo" if latest else "inicial"
+    cur.executemany(
+        "INSERT INTO pizarra_versiones (pizarra_id, version, tipo, contenido, base, origen) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        [(pizarra_id, version, tipo, Json(contenido), base, origen if version == rows[-1][0] else earlier)
+         for version, tipo, contenido, base in rows])
+    return rows[-1][0]
+
+
+def load_version(cur, pizarra_id: int, version: int) -> list | None:
+    """Reconstruye los elementos de una versión (checkpoint + sus deltas), o None si no existe."""
+    cur.execute("SELECT base FROM pizarra_versiones WHERE pizarra_id = %s AND version = %s",
+                (pizarra_id, version))
+    row = cur.fetchone()
+    if row is None:
+        return None
+    cur.execute("SELECT tipo, contenido FROM pizarra_versiones "
+                "WHERE pizarra_id = %s AND version BETWEEN %s AND %s ORDER BY version",
+                (pizarra_id, row[0], version))
+    elementos = None
+    for tipo, contenido in cur.fetchall():
+        elementos = contenido if tipo == CHECKPOINT else apply_json_patch(elementos, contenido)
+    return elementos
+
+
+def list_versions(cur, pizarra_id: int, limit: int = SNAPSHOT_LIST_LIMIT) -> list:
+    """Últimas versiones de la pizarra (más reciente primero) sin su contenido."""
+    cur.execute("SELECT version, tipo, base, origen, creado_en, pg_column_size(contenido) "
+                "FROM pizarra_versiones WHERE pizarra_id = %s ORDER BY version DESC LIMIT %s",
+                (pizarra_id, limit))
+    return [{"version": version, "tipo": tipo, "base": base, "origen": origen,
+             "creado_en": creado_en.isoformat() if creado_en else None, "bytes": size}
+            for version, tipo, base, origen, creado_en, size in cur.fetchall()]
@@ -0,0 +1,231 @@
+# board_updates.py
+"""
+Coordinador de escrituras por pizarra para las actualizaciones de la IA.
+
+Cada petición de /generate_uml_diagram en modo update/patch lee la pizarra, llama al LLM
+(segundos) y reescribe la pizarra entera. Con dos colaboradores a la vez, la última escritura
+pisaba a la primera. Aquí:
+- Cada edición se guarda como cambios por elemento (id) entre el estado que vio el LLM y el
+  resultado (element_changes), y se reaplica sobre el estado más reciente de la BDD
+  (apply_element_changes): las ediciones concurrentes se combinan en vez de pisarse.
+- Las ediciones de una misma pizarra que terminan mientras hay otras llamadas al LLM en curso
+  esperan (como mucho BOARD_COALESCE_WAIT segundos) y se escriben juntas: una sola lectura y
+  una sola escritura para todo el lote.
+- La escritura comprueba la versión de la fila (pizarras.version) leída justo antes; si otro
+  proceso escribió entretanto, se vuelve a leer y a aplicar el lote (BOARD_WRITE_RETRIES).
+
+Las funciones de lectura y escritura se inyectan (model_gemini.py usa la BDD), así que el
+coordinador no depende de psycopg2.
+"""
+import os
+import threading
+import time
+
+BOARD_COALESCE_WAIT = float(os.getenv("BOARD_COALESCE_WAIT", "5"))
+BOARD_WRITE_RETRIES = int(os.getenv("BOARD_WRITE_RETRIES", "5"))
+
+_MISSING = object()
+
+
+class BoardVersionConflict(Exception):
+    """La pizarra cambió desde que se leyó (control optimista con pizarras.version)."""
+
+
+def _list_delta(old: list, new: list) -> tuple:
+    """(añadidos, quitados) de una lista (attributes, methods...) respecto a la base."""
+    return [v for v in new if v not in old], [v for v in old if v not in new]
+
+
+def element_changes(base: list, result: list) -> dict:
+    """
+    Cambios por id de elemento de `base` a `result`: claves nuevas o modificadas, claves
+    borradas y, para las listas (attributes, methods), los valores añadidos y quitados, así
+    dos ediciones que añaden atributos a la misma clase conservan ambos. También los elementos
+    añadidos (en orden) y los ids eliminados. Los elementos sin id en `base` se ignoran.
+    """
+    base_by_id = {el["id"]: el for el in base if isinstance(el, dict) and el.get("id") is not None}
+    updated, added, seen = {}, [], set()
+    for el in result:
+        el_id = el.get("id") if isinstance(el, dict) else None
+        old = base_by_id.get(el_id) if el_id is not None else None
+        if old is None:
+            added.append(el)
+            continue
+        seen.add(el_id)
+        if el == old:
+            continue
+        values, lists = {}, {}
+        for key, value in el.items():
+            previous = old.get(key, _MISSING)
+            if previous == value:
+                continue
+            if isinstance(previous, list) and isinstance(value, list):
+                lists[key] = _list_delta(previous, value) + (value,)
+            else:
+                values[key] = value
+        updated[el_id] = (values, [key for key in old if key not in el], lists)
+    removed = {el_id for el_id in base_by_id if el_id not in seen}
+    return {"updated": updated, "added": added, "removed": removed}
+
+
+def apply_element_changes(elementos: list, changes: dict) -> list:
+    """
+    Aplica los cambios de element_changes sobre `elementos` (otra versión de la pizarra) y
+    devuelve una lista nueva. Si dos ediciones cambian la misma clave gana la última aplicada
+    (salvo en las listas, que combinan añadidos y quitados); un elemento añadido que ya existe
+    (mismo id) se trata como actualización.
+    """
+    updated, removed = changes["updated"], changes["removed"]
+    result = []
+    present = set()
+    for el in elementos:
+        el_id = el.get("id") if isinstance(el, dict) else None
+        if el_id in removed:
+            continue
+        if el_id in updated:
+            values, deleted, lists = updated[el_id]
+            el = {key: value for key, value in el.items() if key not in deleted}
+            el.update(values)
+            for key, (add, remove, full) in lists.items():
+                current = el.get(key)
+                if isinstance(current, list):
+                    kept = [v for v in current if v not in remove]
+                    el[key] = kept + [v for v in add if v not in kept]
+                else:
+                    el[key] = full
+        present.add(el_id)
+        result.append(el)
+    for el in changes["added"]:
+        el_id = el.get("id")
+        if el_id is not None and el_id in present:
+            result = [dict(old, **el) if old.get("id") == el_id else old for old in result]
+        else:
+            result.append(el)
+            present.add(el_id)
+    return result
+
+
+class _Edit:
+    """Una edición pendiente (cambios de una petición) y su resultado cuando se escribe."""
+
+    def __init__(self, changes: dict, origen: str | None):
+        self.changes = changes
+        self.origen = origen
+        self.done = False
+        self.result = None
+        self.error = None
+
+
+class _BoardState:
+    def __init__(self):
+        self.inflight = 0      # llamadas al LLM en curso sobre esta pizarra
+        self.pending = []      # ediciones esperando a escribirse
+        self.writing = False   # hay un hilo escribiendo un lote
+
+
+class BoardCall:
+    """Una llamada al LLM en curso sobre una pizarra (ver BoardUpdateCoordinator.begin)."""
+
+    def __init__(self, coordinator, board_id):
+        self.coordinator = coordinator
+        self.board_id = board_id
+        self.open = True
+
+    def submit(self, base: list, result: list, origen: str | None = None) -> dict:
+        """
+        Entrega la edición (estado que vio el LLM -> resultado) y espera a que se escriba.
+        Devuelve {"elementos", "version", "batch"} con el estado final de la pizarra.
+        """
+        self.open = False
+        return self.coordinator._submit(self.board_id, element_changes(base, result), origen)
+
+    def cancel(self):
+        """La llamada terminó sin edición (error del modelo, modo create...). Idempotente."""
+        if self.open:
+            self.open = False
+            self.coordinator._cancel(self.board_id)
+
+
+class BoardUpdateCoordinator:
+    """
+    Serializa y agrupa las escrituras de cada pizarra dentro del proceso.
+    `load(board_id)` -> (elementos, version) y `write(board_id, elementos, version, origen)`
+    -> versión nueva, o BoardVersionConflict si la versión ya no es la leída.
+    """
+
+    def __init__(self, load, write, wait: float = BOARD_COALESCE_WAIT, retries: int = BOARD_WRITE_RETRIES):
+        self.load = load
+        self.write = write
+        self.wait = wait
+        self.retries = retries
+        self._cond = threading.Condition()
+        self._boards = {}
+
+    def begin(self, board_id) -> BoardCall:
+        """Marca el inicio de una llamada al LLM que terminará en una edición de la pizarra."""
+        with self._cond:
+            self._boards.setdefault(board_id, _BoardState()).inflight += 1
+        return BoardCall(self, board_id)
+
+    def _cancel(self, board_id):
+        with self._cond:
+            state = self._boards[board_id]
+            state.inflight -= 1
+            self._release(board_id, state)
+            self._cond.notify_all()
+
+    def _release(self, board_id, state):
+        if not state.inflight and not state.pending and not state.writing:
+            del self._boards[board_id]
+
+    def _submit(self, board_id, changes: dict, origen: str | None) -> dict:
+        edit = _Edit(changes, origen)
+        deadline = time.monotonic() + self.wait
+        with self._cond:
+            state = self._boards[board_id]
+            state.inflight -= 1
+            state.pending.append(edit)
+            self._cond.notify_all()
+            # Esperar a las otras llamadas en curso (para escribirlas juntas) y al lote anterior
+            while not edit.done:
+                remaining = deadline - time.monotonic()
+                if not state.writing and (state.inflight == 0 or remaining <= 0):
+                    break
+                self._cond.wait(timeout=remaining if remaining > 0 and not state.writing else None)
+            if not edit.done:
+                batch, state.pending = state.pending, []
+                state.writing = True
+        if not edit.done:
+            self._flush(board_id, batch)
+            with self._cond:
+                state.writing = False
+                self._release(board_id, state)
+                self._cond.notify_all()
+        if edit.error is not None:
+            raise edit.error
+        return edit.result
+
+    def _flush(self, board_id, batch: list):
+        """Lee el estado actual, aplica el lote en orden de llegada y lo escribe una vez."""
+        origen = ",".join(sorted({edit.origen for edit in batch if edit.origen})) or None
+        try:
+            for attempt in range(1, self.retries + 1):
+                elementos, version = self.load(board_id)
+                for edit in batch:
+                    elementos = apply_element_changes(elementos, edit.changes)
+                try:
+                    new_version = self.write(board_id, elementos, version, origen)
+                    break
+                except BoardVersionConflict:
+                    print(f"🔁 Pizarra {board_id}: versión {version} obsoleta, reintento {attempt}/{self.retries}")
+            else:
+                raise BoardVersionConflict(f"La pizarra {board_id} cambió {self.retries} veces seguidas")
+            result = {"elementos": elementos, "version": new_version, "batch": len(batch)}
+            for edit in batch:
+                edit.result = result
+        except Exception as e:
+            for edit in batch:
+                edit.error = e
+        finally:
+            for edit in batch:
+                edit.done = True
@@ -0,0 +1,275 @@
+# class_ocr.py
+"""
+OCR local del texto de las clases detectadas (nombre, atributos y métodos), sin LLM.
+
+Solo se lee dentro de las cajas 'Class' del detector. Cada caja se divide en compartimentos
+por las líneas separadoras horizontales (como las dibuja generate_class_box en
+uml_dataset_generator.py: nombre | atributos | métodos) y cada compartimento en líneas de
+texto por la proyección horizontal de la tinta. Todas las líneas de todas las clases de la
+imagen se reconocen en una sola llamada:
+
+- 'tesseract' (pytesseract + binario tesseract): las líneas se apilan en un único lienzo, a la
+  misma altura, y las palabras de image_to_data se reparten por su posición vertical.
+- 'onnx' (onnxruntime): un reconocedor de líneas CTC (tipo CRNN / PaddleOCR rec) con todas
+  las líneas en un solo lote; OCR_ONNX_MODEL y OCR_ONNX_CHARSET (un carácter por línea).
+
+El texto se limpia de las confusiones habituales del OCR en la notación UML y se valida con
+las mismas reglas que generate_springboot.parse_attribute (diagram_ir.parse_attribute_text):
+las líneas sin nombre se descartan.
+"""
+import os
+import re
+import threading
+
+import cv2
+import numpy as np
+
+from diagram_ir import parse_attribute_text, parse_method_text
+
+try:
+    import pytesseract  # opcional: OCR con Tesseract
+except ImportError:
+    pytesseract = None
+
+try:
+    import onnxruntime  # opcional: OCR con un modelo ONNX
+except ImportError:
+    onnxruntime = None
+
+# Configuración (se puede sobreescribir con variables de entorno)
+OCR_BACKEND = os.getenv("OCR_BACKEND", "tesseract")
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+OCR_LINE_HEIGHT = int(os.getenv("OCR_LINE_HEIGHT", "32"))
+OCR_ONNX_MODEL = os.getenv("OCR_ONNX_MODEL", "")
+OCR_ONNX_CHARSET = os.getenv("OCR_ONNX_CHARSET", "")
+OCR_ONNX_HEIGHT = int(os.getenv("OCR_ONNX_HEIGHT", "48"))
+OCR_ONNX_MAX_WIDTH = int(os.getenv("OCR_ONNX_MAX_WIDTH", "960"))
+
+_BORDER = 3             # px del borde de la caja que no se leen
+_SEPARATOR_FILL = 0.85  # fracción del ancho con tinta para que una fila sea separadora
+_MIN_LINE_HEIGHT = 4    # bandas más bajas son ruido
+_STACK_GAP = 16         # px entre líneas en el lienzo de Tesseract
+
+_STEREOTYPE_RE = re.compile(r'^\s*(«|<<)\s*(\w+)\s*(»|>>)\s*$')
+_SPACE_RE = re.compile(r'\s+')
+_COLON_RE = re.compile(r'\s*[:;]\s*')
+
+
+class OCRUnavailable(RuntimeError):
+    """No está instalado el backend de OCR pedido (o falta su modelo)."""
+
+
+# --- Compartimentos y líneas ---
+
+def _binary(gray):
+    """Tinta a 255 (Otsu: funciona igual con texto negro o de color sobre fondo claro)."""
+    return cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+
+
+def _runs(flags):
+    """[(inicio, fin)] de los tramos consecutivos a True."""
+    padded = np.concatenate(([False], flags, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def class_layout(binary) -> dict:
+    """
+    Bandas de texto (y0, y1) de cada compartimento de una caja de clase binarizada (sin el
+    borde): {"name": [...], "attributes": [...], "methods": [...]}. Con una sola separadora
+    (clase sin métodos o sin atributos, como generate_class_box con 0 atributos) todo lo que
+    hay debajo va a 'attributes' y read_classes lo reparte por la forma de cada línea.
+    """
+    height, width = binary.shape
+    inner = binary[:, _BORDER:max(_BORDER + 1, width - _BORDER)]
+    fill = np.count_nonzero(inner, axis=1) / max(1, inner.shape[1])
+    separator = fill >= _SEPARATOR_FILL
+    cuts = [(y0 + y1) // 2 for y0, y1 in _runs(separator) if y0 > _BORDER and y1 < height - _BORDER]
+    bounds = [0] + cuts + [height]
+    inked = (np.count_nonzero(inner, axis=1) > 0) & ~separator
+    compartments = []
+    for top, bottom in zip(bounds, bounds[1:]):
+        compartments.append([(top + y0, top + y1) for y0, y1 in _runs(inked[top:bottom])
+                             if y1 - y0 >= _MIN_LINE_HEIGHT])
+    layout = {"name": compartments[0], "attributes": [], "methods": []}
+    if len(compartments) > 1:
+        layout["attributes"] = compartments[1]
+    if len(compartments) > 2:
+        layout["methods"] = [band for part in compartments[2:] for band in part]
+    return layout
+
+
+def _line_crop(binary, band):
+    """Recorte de una línea ajustado a su tinta (texto negro sobre blanco), o None si está vacía."""
+    y0, y1 = band
+    rows = binary[y0:y1, _BORDER:binary.shape[1] - _BORDER]
+    columns = np.flatnonzero(rows.any(axis=0))
+    if not len(columns):
+        return None
+    x0, x1 = max(0, columns[0] - 2), min(rows.shape[1], columns[-1] + 3)
+    return cv2.copyMakeBorder(255 - rows[:, x0:x1], 2, 2, 2, 2, cv2.BORDER_CONSTANT, value=255)
+
+
+# --- Reconocedores ---
+
+class TesseractRecognizer:
+    """Todas las líneas en un único lienzo y una sola llamada a image_to_data."""
+
+    def __init__(self, lang: str = OCR_LANG, line_height: int = OCR_LINE_HEIGHT):
+        if pytesseract is None:
+            raise OCRUnavailable("pytesseract no está instalado (pip install pytesseract y el binario tesseract)")
+        self.lang = lang
+        self.line_height = line_height
+
+    def recognize(self, crops: list) -> list:
+        if not crops:
+            return []
+        scaled = [cv2.resize(crop, (max(1, round(crop.shape[1] * self.line_height / crop.shape[0])), self.line_height),
+                             interpolation=cv2.INTER_CUBIC) for crop in crops]
+        slot = self.line_height + _STACK_GAP
+        canvas = np.full((slot * len(scaled) + _STACK_GAP, max(c.shape[1] for c in scaled) + 2 * _STACK_GAP),
+                         255, dtype=np.uint8)
+        for index, crop in enumerate(scaled):
+            top = _STACK_GAP + index * slot
+            canvas[top:top + self.line_height, _STACK_GAP:_STACK_GAP + crop.shape[1]] = crop
+        data = pytesseract.image_to_data(canvas, lang=self.lang, config="--psm 6",
+                                         output_type=pytesseract.Output.DICT)
+        words = [[] for _ in scaled]
+        for text, left, top, height in zip(data["text"], data["left"], data["top"], data["height"]):
+            if not text.strip():
+                continue
+            index = (top + height // 2 - _STACK_GAP // 2) // slot
+            if 0 <= index < len(words):
+                words[index].append((left, text))
+        return [" ".join(text for _, text in sorted(line)) for line in words]
+
+
+class OnnxRecognizer:
+    """Reconocedor de líneas CTC: un lote con todas las líneas y decodificación voraz."""
+
+    def __init__(self, model: str = OCR_ONNX_MODEL, charset: str = OCR_ONNX_CHARSET,
+                 height: int = OCR_ONNX_HEIGHT, max_width: int = OCR_ONNX_MAX_WIDTH):
+        if onnxruntime is None:
+            raise OCRUnavailable("onnxruntime no está instalado (pip install onnxruntime)")
+        if not model or not os.path.exists(model) or not charset or not os.path.exists(charset):
+            raise OCRUnavailable("Faltan OCR_ONNX_MODEL y OCR_ONNX_CHARSET (modelo y caracteres)")
+        self.session = onnxruntime.InferenceSession(model, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        with open(charset, encoding="utf-8") as f:
+            # Índice 0: blanco de CTC; los modelos tipo PaddleOCR añaden el espacio al final
+            self.chars = [""] + [line.rstrip("\n") for line in f] + [" "]
+        self.height = height
+        self.max_width = max_width
+
+    def batch(self, crops: list) -> np.ndarray:
+        """N x 3 x alto x ancho normalizado a [-1, 1], relleno a la derecha hasta la línea más ancha."""
+        widths = [min(self.max_width, max(1, round(c.shape[1] * self.height / c.shape[0]))) for c in crops]
+        batch = np.zeros((len(crops), 3, self.height, max(widths)), dtype=np.float32)
+        for index, (crop, width) in enumerate(zip(crops, widths)):
+            line = cv2.resize(crop, (width, self.height)).astype(np.float32) / 127.5 - 1.0
+            batch[index, :, :, :width] = line
+        return batch
+
+    def decode(self, scores: np.ndarray) -> list:
+        """Decodificación CTC voraz de N x T x C."""
+        texts = []
+        for best in scores.argmax(axis=2):
+            keep = np.concatenate(([True], best[1:] != best[:-1])) & (best != 0)
+            texts.append("".join(self.chars[i] for i in best[keep] if i < len(self.chars)))
+        return texts
+
+    def recognize(self, crops: list) -> list:
+        if not crops:
+            return []
+        return self.decode(self.session.run(None, {self.input_name: self.batch(crops)})[0])
+
+
+_RECOGNIZERS = {"tesseract": TesseractRecognizer, "onnx": OnnxRecognizer}
+_recognizer_lock = threading.Lock()
+_recognizers = {}
+
+
+def get_recognizer(backend: str = OCR_BACKEND):
+    """Reconocedor del backend (uno por proceso: el modelo ONNX se carga una vez)."""
+    if backend not in _RECOGNIZERS:
+        raise ValueError(f"Backend de OCR desconocido: {backend} (opciones: {', '.join(_RECOGNIZERS)})")
+    with _recognizer_lock:
+        if backend not in _recognizers:
+            _recognizers[backend] = _RECOGNIZERS[backend]()
+        return _recognizers[backend]
+
+
+# --- Texto ---
+
+def clean_line(text: str) -> str:
+    """Normaliza una línea de OCR a la notación de la pizarra ('+ nombre: Tipo')."""
+    text = _SPACE_RE.sub(" ", text.replace("|", " ")).strip()
+    if not text:
+        return ""
+    # ';' por ':' y espacios alrededor de los dos puntos, fuera de los paréntesis también
+    text = _COLON_RE.sub(": ", text)
+    if text[0] in "+-#~" and len(text) > 1 and text[1] != " ":
+        text = f"{text[0]} {text[1:]}"
+    return text
+
+
+def _is_method(text: str) -> bool:
+    return "(" in text
+
+
+def _class_texts(lines: dict) -> dict:
+    """Nombre, atributos y métodos de una clase a partir de sus líneas reconocidas."""
+    tipo = "Class"
+    names = []
+    for text in lines["name"]:
+        stereotype = _STEREOTYPE_RE.match(text)
+        if stereotype:
+            if stereotype.group(2).lower() == "interface":
+                tipo = "Interface"
+        elif text:
+            names.append(text)
+    attributes, methods = [], []
+    # Sin compartimento de métodos, las líneas con paréntesis son métodos
+    below = [(text, "methods" if not lines["methods"] and _is_method(text) else "attributes")
+             for text in lines["attributes"]]
+    below += [(text, "methods") for text in lines["methods"]]
+    for text, part in below:
+        if part == "methods":
+            if parse_method_text(text).name:
+                methods.append(text)
+        elif parse_attribute_text(text).name:
+            attributes.append(text)
+    return {"tipo": tipo, "name": "".join(names).replace(" ", ""), "attributes": attributes, "methods": methods}
+
+
+def read_classes(image, detections: list, recognizer=None) -> list:
+    """
+    Texto de cada detección 'Class' (en su orden): lista de {tipo, name, attributes, methods}.
+    `image` en BGR o escala de grises, en las mismas coordenadas que las detecciones. Todas
+    las líneas se reconocen en una sola llamada al reconocedor (por defecto el de OCR_BACKEND).
+    """
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    height, width = gray.shape
+    crops, owners = [], []
+    classes = [det for det in detections if det.get("tipo") == "Class"]
+    for index, det in enumerate(classes):
+        x0, y0 = max(0, int(det["x"]) + _BORDER), max(0, int(det["y"]) + _BORDER)
+        x1 = min(width, int(det["x"]) + int(det["w"]) - _BORDER)
+        y1 = min(height, int(det["y"]) + int(det["h"]) - _BORDER)
+        if x1 - x0 < 2 * _BORDER or y1 - y0 < 2 * _BORDER:
+            continue
+        binary = _binary(gray[y0:y1, x0:x1])
+        for part, bands in class_layout(binary).items():
+            for band in bands:
+                crop = _line_crop(binary, band)
+                if crop is not None:
+                    crops.append(crop)
+                    owners.append((index, part))
+
+    texts = (recognizer or get_recognizer()).recognize(crops)
+    lines = [{"name": [], "attributes": [], "methods": []} for _ in classes]
+    for (index, part), text in zip(owners, texts):
+        text = clean_line(text)
+        if text:
+            lines[index][part].append(text)
+    return [_class_texts(class_lines) for class_lines in lines]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Servicio residente de generación de código (protocolo JSON-lines por stdin/stdout).
+
+server.js lo arranca una sola vez: las plantillas de templates/ se compilan al iniciar,
+el bytecode compilado se guarda en cache/jinja/ (arranques posteriores no re-parsean) y
+Jinja2 las recompila automáticamente si cambian en disco (auto_reload). Con más de un
+CPU (CODEGEN_WORKERS) se mantiene además un pool de procesos para el render de diagramas grandes.
+Las peticiones se atienden en un pool de hilos (CODEGEN_REQUEST_WORKERS): una generación lenta
+no bloquea a las demás, y las respuestas pueden llegar en otro orden (se emparejan por "id").
+
+Cada línea de entrada es una petición:
+    {"id": 1, "diagram": {"elementos": [...]}, "output_dir": "...", "no_cache": false,
+     "format": "zip", "compression": "default", "profile": "default",
+     "previous": {"elementos": [...]}}   (opcional: versión anterior -> migraciones Flyway)
+y cada línea de salida la respuesta correspondiente:
+    {"id": 1, "ok": true, "result": {"zipPath": ..., "postmanPath": ..., "flutterZipPath": ..., "cached": false,
+                                     "sizes": {...}, "elapsed_ms": ...}}
+    {"id": 1, "ok": false, "error": "..."}
+
+Uso:
+    python codegen_service.py
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import generate_springboot
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(SCRIPT_DIR, 'templates')
+BYTECODE_CACHE_DIR = os.path.join(SCRIPT_DIR, 'cache', 'jinja')
+DEFAULT_OUTPUT_DIR = os.path.join(SCRIPT_DIR, 'generated')
+REQUEST_WORKERS = int(os.getenv('CODEGEN_REQUEST_WORKERS', '4'))
+
+_stdout_lock = threading.Lock()
+
+
+def build_environment():
+    """Crea el entorno Jinja2 y compila todas las plantillas una sola vez."""
+    os.makedirs(BYTECODE_CACHE_DIR, exist_ok=True)
+    env = generate_springboot.create_environment(TEMPLATE_DIR, bytecode_cache_dir=BYTECODE_CACHE_DIR)
+    started = time.perf_counter()
+    for name in env.list_templates():
+        env.get_template(name)
+    print(f"Plantillas compiladas en {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    return env
+
+
+def handle_request(env, request, executor=None):
+    output_dir = request.get('output_dir') or DEFAULT_OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    diagram = request['diagram']
+    options = {'env': env, 'executor': executor,
+               'fmt': request.get('format') or generate_springboot.CODEGEN_FORMAT,
+               'compression': request.get('compression') or generate_springboot.CODEGEN_COMPRESSION,
+               'profile': request.get('profile') or generate_springboot.CODEGEN_PROFILE,
+               'previous': request.get('previous')}
+    if request.get('no_cache'):
+        zip_name = generate_springboot.artifact_names(options['fmt'], options['compression'])[0]
+        result = generate_springboot.generate_project(diagram, os.path.join(output_dir, zip_name), TEMPLATE_DIR, **options)
+    else:
+        result = generate_springboot.generate_cached(diagram, output_dir, TEMPLATE_DIR, **options)
+    return json.loads(result)
+
+
+def use_executor(request, executor):
+    """El pool solo compensa en diagramas grandes; los pequeños se renderizan en este proceso."""
+    elementos = request.get('diagram', {}).get('elementos', [])
+    return executor if len(elementos) >= generate_springboot.PARALLEL_MIN_ENTITIES else None
+
+
+def serve_line(env, line, executor):
+    """Atiende una línea de stdin y escribe su respuesta (una línea completa, sin intercalar)."""
+    request_id = None
+    try:
+        request = json.loads(line)
+        request_id = request.get('id')
+        started = time.perf_counter()
+        result = handle_request(env, request, use_executor(request, executor))
+        response = {"id": request_id, "ok": True, "result": result,
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+    except Exception as e:
+        print(f"Error en codegen_service.py: {str(e)}", file=sys.stderr)
+        response = {"id": request_id, "ok": False, "error": str(e)}
+    with _stdout_lock:
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+
+def main():
+    env = build_environment()
+    workers = generate_springboot.CODEGEN_WORKERS
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    with ThreadPoolExecutor(max_workers=max(1, REQUEST_WORKERS)) as requests_pool:
+        for line in sys.stdin:
+            if line.strip():
+                requests_pool.submit(serve_line, env, line, executor)
+    if executor is not None:
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,15 @@
 # detect_uml.py
 import os
-import base64
-import requests
 import argparse
 from dotenv import load_dotenv
 import json
 import sys
 
+from diagram_ir import dump as dump_diagram, load as load_diagram
+from llm_providers import LLMError, load_image, router_from_env
+from photo_preprocess import PHOTO_PREPROCESS, prepare_upload
+from uml_output import OutputError, load_json_tolerant
+
 # Configurar la codificación de salida para Windows
 if sys.platform == "win32":
     import io
@@ -16,46 +19,38 @@ if sys.platform == "win32":
 # Cargar variables de entorno
 load_dotenv()
 
-# Configuración de Groq
-GROQ_API_KEY = os.getenv('GROQ_API_KEY')
-if not GROQ_API_KEY:
-    print("ERROR: No se encontró GROQ_API_KEY en las variables de entorno", file=sys.stderr)
-    sys.exit(1)
+# Proveedores de visión: Groq (por defecto) y Gemini como respaldo si hay GOOGLE_API_KEY.
+# Se configura con LLM_PROVIDERS; las estadísticas de latencia se guardan entre ejecuciones
+# porque este script se lanza una vez por imagen desde server.js.
+GROQ_VISION_MODEL = os.getenv('GROQ_VISION_MODEL', 'meta-llama/llama-4-scout-17b-16e-instruct')
+GEMINI_VISION_MODEL = os.getenv('GEMINI_VISION_MODEL', 'models/gemini-1.5-flash')
+ROUTER_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'llm_router_detect_uml.json')
 
-def encode_image_to_base64(image_path):
-    """Codifica una imagen a base64."""
-    try:
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
-    except Exception as e:
-        print(f"ERROR al leer la imagen: {str(e)}", file=sys.stderr)
-        sys.exit(1)
+try:
+    router = router_from_env(GEMINI_VISION_MODEL, GROQ_VISION_MODEL, default="groq,gemini",
+                             state_path=ROUTER_STATE_PATH)
+except ValueError:
+    print("ERROR: No hay proveedores LLM configurados (falta GROQ_API_KEY o GOOGLE_API_KEY)", file=sys.stderr)
+    sys.exit(1)
 
 def analyze_uml_with_groq(image_path):
-    """Analiza una imagen de diagrama UML usando la API de Groq y devuelve los elementos en formato para el frontend."""
+    """Analiza una imagen de diagrama UML con el router de proveedores LLM y devuelve los elementos en formato para el frontend."""
     print(f"Analizando imagen: {image_path}", file=sys.stderr)
     
-    # Codificar la imagen
+    # Leer la imagen (las fotos se enderezan, binarizan y recortan antes de enviarlas)
     try:
-        base64_image = encode_image_to_base64(image_path)
-        file_ext = os.path.splitext(image_path)[1].lower()
-        mime_type = "image/jpeg"
-        if file_ext == '.png':
-            mime_type = "image/png"
-        elif file_ext == '.gif':
-            mime_type = "image/gif"
-        elif file_ext == '.webp':
-            mime_type = "image/webp"
+        image = None
+        if PHOTO_PREPROCESS:
+            try:
+                image = prepare_upload(image_path)
+            except Exception as e:
+                print(f"⚠️ Preprocesado omitido: {e}", file=sys.stderr)
+        if image is None:
+            image = load_image(image_path)
     except Exception as e:
-        print(f"ERROR al procesar la imagen: {str(e)}", file=sys.stderr)
+        print(f"ERROR al leer la imagen: {str(e)}", file=sys.stderr)
         sys.exit(1)
 
-    # Configurar la solicitud
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
     # Crear el prompt para Groq
     prompt = """
     Analiza el diagrama UML en la imagen proporcionada y devuelve un JSON con los siguientes campos:
@@ -80,164 +75,35 @@ def analyze_uml_with_groq(image_path):
     Devuelve SOLO el JSON, sin texto adicional, sin marcas de código (```json o ```).
     """
 
-    # Crear el payload para Groq
-    payload = {
-        "model": "meta-llama/llama-4-scout-17b-16e-instruct",
-        "messages": [
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:{mime_type};base64,{base64_image}"
-                        }
-                    }
-                ]
-            }
-        ],
-        "temperature": 0.3,
-        "max_tokens": 4096,
-        "response_format": {"type": "json_object"}
-    }
-
     try:
-        print("Enviando solicitud a Groq API...", file=sys.stderr)
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=120  # Aumentar tiempo de espera
-        )
-        response.raise_for_status()
-        
-        # Extraer el contenido de la respuesta
-        content = response.json()['choices'][0]['message']['content']
-        print("Respuesta recibida de Groq API", file=sys.stderr)
-        
-        # Limpiar la respuesta (eliminar markdown si existe)
-        content = content.strip()
-        if content.startswith('```json'):
-            content = content[7:]
-        if content.endswith('```'):
-            content = content[:-3]
-        content = content.strip()
+        print("Enviando solicitud al proveedor LLM...", file=sys.stderr)
+        result = router.generate(prompt, images=[image], json_mode=True)
+        content = result.text
+        print(f"Respuesta recibida de {result.provider}", file=sys.stderr)
         
-        # Intentar cargar el JSON
+        # Intentar cargar el JSON (con reparación local: markdown, comas finales, truncado...)
         try:
-            result = json.loads(content)
+            result, repaired = load_json_tolerant(content)
+            if repaired:
+                print("JSON reparado localmente", file=sys.stderr)
             
             # Transformar el resultado al formato esperado por el frontend
             transformed = transform_to_frontend_format(result)
             return transformed
             
-        except json.JSONDecodeError as e:
+        except OutputError as e:
             print(f"ERROR al decodificar JSON: {str(e)}", file=sys.stderr)
             print(f"Respuesta recibida: {content}", file=sys.stderr)
             sys.exit(1)
             
-    except requests.exceptions.RequestException as e:
-        error_msg = f"Error en la solicitud a Groq API: {str(e)}"
-        if hasattr(e, 'response') and e.response is not None:
-            error_msg += f"\nCódigo de estado: {e.response.status_code}"
-            error_msg += f"\nRespuesta: {e.response.text}"
-        print(error_msg, file=sys.stderr)
+    except LLMError as e:
+        print(f"Error en la solicitud a los proveedores LLM: {str(e)}", file=sys.stderr)
         sys.exit(1)
 
 def transform_to_frontend_format(data):
     """Transforma el JSON de Groq al formato esperado por el frontend."""
-    from datetime import datetime
-    import uuid
-    
-    # Inicializar estructuras de datos
-    elementos = []
-    relaciones = []
-    
-    # Mapeo de tipos de relación (esto está bien como está)
-    relacion_map = {
-        'Association': 'Asociacion',
-        'Inheritance': 'Generalizacion',
-        'Composition': 'Composicion',
-        'Aggregation': 'Agregacion',
-        'Asociacion': 'Asociacion',
-        'Generalizacion': 'Generalizacion',
-        'Composicion': 'Composicion',
-        'Agregacion': 'Agregacion'
-    }
-    
-    # Procesar elementos
-    if 'elements' in data:
-        for element in data['elements']:
-            # Generar ID único
-            element_id = str(uuid.uuid4())
-            
-            # Calcular altura basada en atributos y métodos
-            attr_count = len(element.get('attributes', []))
-            methods_count = len(element.get('methods', []))
-            height = max(100, 30 + (attr_count + methods_count) * 20)
-            
-            # --- INICIO DE LA CORRECCIÓN ---
-            # Crear elemento en formato del frontend (usando claves en Inglés)
-            elemento = {
-                'id': element_id,
-                'tipo': element.get('type', 'Class'),
-                
-                # Usar claves en inglés para coincidir con la BD y el cliente
-                'name': element.get('name', 'SinNombre'),
-                'attributes': element.get('attributes', []),
-                'methods': element.get('methods', []),
-                
-                'x': element.get('x', 100 + len(elementos) * 200),
-                'y': element.get('y', 100),
-                'width': 150,  # Ancho fijo
-                'height': height,
-                'seleccionado': False,
-                'arrastrando': False,
-                'ultimoX': 0,
-                'ultimoY': 0
-            }
-            
-            # Asegurar que los atributos y métodos sean listas de strings (usando las claves corregidas)
-            if not isinstance(elemento['attributes'], list):
-                elemento['attributes'] = []
-            if not isinstance(elemento['methods'], list):
-                elemento['methods'] = []
-            # --- FIN DE LA CORRECCIÓN ---
-                
-            elementos.append(elemento)
-    
-    # Procesar relaciones
-    if 'relationships' in data:
-        for rel in data['relationships']:
-            # Mapear tipo de relación (esto está bien)
-            rel_type = rel.get('type', 'Asociacion')
-            rel_type = relacion_map.get(rel_type, 'Asociacion')
-            
-            # Obtener nombres de elementos de origen y destino
-            from_name = rel.get('desde', '')
-            to_name = rel.get('hacia', '')
-            
-            # --- INICIO DE LA CORRECCIÓN ---
-            # Buscar los elementos correspondientes usando la clave 'name' (Inglés)
-            from_elem = next((e for e in elementos if e['name'] == from_name), None)
-            to_elem = next((e for e in elementos if e['name'] == to_name), None)
-            # --- FIN DE LA CORRECCIÓN ---
-            
-            if from_elem and to_elem:
-                relacion = {
-                    'id': str(uuid.uuid4()),
-                    'tipo': rel_type,
-                    'desde': from_elem['id'],
-                    'hacia': to_elem['id'],
-                    'etiqueta': rel.get('label', '')
-                }
-                relaciones.append(relacion)
-    
-    return {
-        'elementos': elementos,
-        'relaciones': relaciones
-    }
+    # La IR compartida resuelve las relaciones por nombre y calcula la disposición de las clases
+    return dump_diagram(load_diagram(data, shape='vision'), 'detector')
 
 def main():
     # Configurar el parser de argumentos
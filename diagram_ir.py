@@ -0,0 +1,347 @@
+# diagram_ir.py
+"""
+Representación intermedia (IR) compartida de las pizarras UML.
+
+Cada módulo recibía la pizarra en una forma JSON distinta; aquí se cargan todas en las mismas
+clases (dataclasses con __slots__) y se vuelcan de nuevo a cualquiera de ellas:
+
+- 'board':    {"elementos": [...]} del cliente, la BD, model_gemini.py y generate_springboot.py.
+              Clases {tipo, id, name, x, y, w, h, attributes, methods} y relaciones
+              {tipo, id, from, to, label, multOrigen, multDestino} en la misma lista.
+- 'detector': salida de detect_uml.py: {"elementos": [clases con width/height],
+              "relaciones": [{id, tipo (Asociacion, ...), desde, hacia, etiqueta}]}.
+- 'vision':   respuesta del modelo de visión: {"elements": [{type, name, ...}],
+              "relationships": [{type, desde, hacia, label | etiqueta}]}, relaciones por nombre.
+
+Los atributos y métodos se parsean una sola vez por texto (caché compartida: el mismo
+'+ nombre: String' en mil clases es un único objeto) y la pizarra mantiene índices por id y
+por nombre, así buscar una clase no recorre la lista.
+"""
+import re
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+
+SHAPES = ('board', 'detector', 'vision')
+
+# Tipo canónico (el del cliente) de cada nombre de relación que aparece en las distintas formas
+RELATION_KINDS = {
+    'Association': 'Association', 'Asociacion': 'Association',
+    'Composition': 'Composition', 'Composicion': 'Composition',
+    'Aggregation': 'Aggregation', 'Agregacion': 'Aggregation',
+    'Generalization': 'Generalization', 'Generalizacion': 'Generalization', 'Inheritance': 'Generalization',
+}
+# detect_uml.py emite los tipos en español
+_DETECTOR_KINDS = {'Association': 'Asociacion', 'Composition': 'Composicion',
+                   'Aggregation': 'Agregacion', 'Generalization': 'Generalizacion'}
+
+# Claves conocidas de cada elemento en la forma 'board' (el resto se conserva en `extra`)
+_BOARD_CLASS_KEYS = {'tipo', 'id', 'name', 'x', 'y', 'w', 'h', 'width', 'height', 'attributes', 'methods'}
+_BOARD_RELATION_KEYS = {'tipo', 'type', 'id', 'from', 'to', 'desde', 'hacia', 'label', 'etiqueta', 'multOrigen', 'multDestino'}
+# Estado del canvas que añade detect_uml.py a cada clase
+_DETECTOR_CANVAS = {'seleccionado': False, 'arrastrando': False, 'ultimoX': 0, 'ultimoY': 0}
+
+_PK_MARK_RE = re.compile(r'\s*\((pk|PK)\)\s*', flags=re.IGNORECASE)
+_VISIBILITY_RE = re.compile(r'^[+\-#~]\s*')
+
+
+# --- Atributos y métodos (inmutables y compartidos) ---
+
+@dataclass(frozen=True, slots=True)
+class Attribute:
+    raw: str           # texto original, p. ej. '+ id: Long (PK)'
+    name: str
+    type: str | None   # None si el texto no tiene ':'
+    visibility: str    # '+', '-', '#', '~' o ''
+    is_pk: bool
+
+
+@dataclass(frozen=True, slots=True)
+class Method:
+    raw: str
+    name: str
+    params: str        # texto entre paréntesis, sin parsear
+    return_type: str | None
+    visibility: str
+
+
+@lru_cache(maxsize=16384)
+def parse_attribute_text(text):
+    """'+ categoria: Categoria' -> Attribute. Mismas reglas que generate_springboot.parse_attribute."""
+    is_pk = '(pk)' in text.lower()
+    clean = _PK_MARK_RE.sub('', text) if is_pk else text
+    visibility = _VISIBILITY_RE.match(clean)
+    clean = _VISIBILITY_RE.sub('', clean).strip()
+    parts = clean.split(':')
+    name = parts[0].strip().split('(')[0].strip()
+    type_ = parts[1].strip() if len(parts) > 1 else None
+    return Attribute(text, name, type_, visibility.group(0).strip() if visibility else '', is_pk)
+
+
+@lru_cache(maxsize=16384)
+def parse_method_text(text):
+    """'+ deposit(amount: float): void' -> Method."""
+    visibility = _VISIBILITY_RE.match(text)
+    clean = _VISIBILITY_RE.sub('', text).strip()
+    if '(' in clean:
+        name, _, rest = clean.partition('(')
+        params, closed, tail = rest.rpartition(')')
+        if not closed:
+            params, tail = rest, ''
+    else:
+        name, params, tail = clean, '', ''
+        if ':' in clean:
+            name, _, tail = clean.partition(':')
+            tail = ':' + tail
+    tail = tail.strip()
+    return_type = tail[1:].strip() if tail.startswith(':') else None
+    return Method(text, name.strip(), params.strip(), return_type or None,
+                  visibility.group(0).strip() if visibility else '')
+
+
+# --- Elementos ---
+
+@dataclass(slots=True, eq=False)
+class UmlClass:
+    id: object
+    name: str
+    attributes: list          # list[Attribute]
+    methods: list             # list[Method]
+    tipo: str = 'Class'       # 'Class', 'Interface', ...
+    x: float | None = None
+    y: float | None = None
+    width: float | None = None
+    height: float | None = None
+    extra: dict | None = None  # claves desconocidas (estado del canvas, etc.), solo si las hay
+
+    @property
+    def is_class(self):
+        return self.tipo == 'Class'
+
+
+@dataclass(slots=True, eq=False)
+class Relation:
+    id: object
+    tipo: str                 # tal como venía ('Association', 'Asociacion', ...)
+    source: object            # id de la clase origen
+    target: object            # id de la clase destino
+    label: str | None = None
+    mult_source: str | None = None
+    mult_target: str | None = None
+    extra: dict | None = None
+
+    @property
+    def kind(self):
+        """Tipo canónico: Association, Composition, Aggregation o Generalization."""
+        return RELATION_KINDS.get(self.tipo, 'Association')
+
+
+def _key(element_id):
+    # El cliente usa ids numéricos y el detector strings: '1' y 1 son la misma clase
+    return str(element_id)
+
+
+class Diagram:
+    """
+    Pizarra cargada: `elements` conserva el orden original (clases y relaciones mezcladas),
+    `classes` y `relations` son vistas en ese mismo orden. get() y find_class() son O(1).
+    """
+    __slots__ = ('elements', 'classes', 'relations', '_by_id', '_by_name')
+
+    def __init__(self):
+        self.elements = []
+        self.classes = []
+        self.relations = []
+        self._by_id = {}
+        self._by_name = {}
+
+    def add(self, element):
+        self.elements.append(element)
+        if isinstance(element, Relation):
+            self.relations.append(element)
+        else:
+            self.classes.append(element)
+            # Con nombres repetidos gana el primero (como las búsquedas lineales de antes)
+            self._by_name.setdefault(element.name.lower(), element)
+        if element.id is not None:
+            self._by_id[_key(element.id)] = element
+        return element
+
+    def get(self, element_id):
+        return self._by_id.get(_key(element_id))
+
+    def find_class(self, name):
+        """Clase por nombre, sin distinguir mayúsculas."""
+        return self._by_name.get(str(name).lower())
+
+    def resolve(self, ref):
+        """Clase por id o, si no existe ese id, por nombre (como los 'target' de model_gemini)."""
+        element = self.get(ref)
+        return element if isinstance(element, UmlClass) else self.find_class(ref)
+
+    def __len__(self):
+        return len(self.elements)
+
+
+# --- Carga ---
+
+def detect_shape(data):
+    if isinstance(data, dict):
+        if 'elements' in data or 'relationships' in data:
+            return 'vision'
+        if 'relaciones' in data:
+            return 'detector'
+    return 'board'
+
+
+def _extra(item, known):
+    extra = {k: v for k, v in item.items() if k not in known}
+    return extra or None
+
+
+def _load_class(item, id_factory, known=_BOARD_CLASS_KEYS):
+    attributes = item.get('attributes')
+    methods = item.get('methods')
+    return UmlClass(
+        id=item['id'] if item.get('id') is not None else id_factory(),
+        name=item.get('name', ''),
+        attributes=[parse_attribute_text(a) for a in attributes if isinstance(a, str)] if isinstance(attributes, list) else [],
+        methods=[parse_method_text(m) for m in methods if isinstance(m, str)] if isinstance(methods, list) else [],
+        tipo=item.get('tipo') or item.get('type') or 'Class',
+        x=item.get('x'), y=item.get('y'),
+        width=item.get('w', item.get('width')), height=item.get('h', item.get('height')),
+        extra=_extra(item, known),
+    )
+
+
+def _load_relation(item, source, target, id_factory):
+    return Relation(
+        id=item['id'] if item.get('id') is not None else id_factory(),
+        tipo=item.get('tipo') or item.get('type') or 'Association',
+        source=source, target=target,
+        label=item.get('label', item.get('etiqueta')),
+        mult_source=item.get('multOrigen'), mult_target=item.get('multDestino'),
+        extra=_extra(item, _BOARD_RELATION_KEYS),
+    )
+
+
+def _is_relation(item):
+    return item.get('tipo') in RELATION_KINDS or 'from' in item or 'desde' in item
+
+
+def load(data, shape=None, id_factory=None):
+    """
+    Carga una pizarra en cualquiera de las formas de SHAPES (se detecta si no se indica).
+    Acepta también la lista de elementos suelta. `id_factory` genera los ids que falten
+    (por defecto uuid4, como detect_uml.py). Las relaciones entre nombres que no existen se omiten.
+    """
+    id_factory = id_factory or (lambda: str(uuid.uuid4()))
+    shape = shape or detect_shape(data)
+    if shape not in SHAPES:
+        raise ValueError(f"Forma desconocida: {shape} (opciones: {', '.join(SHAPES)})")
+    diagram = Diagram()
+
+    if shape == 'vision':
+        for item in data.get('elements') or []:
+            diagram.add(_load_class(item, id_factory, known=_BOARD_CLASS_KEYS | {'type'}))
+        for item in data.get('relationships') or []:
+            source = diagram.find_class(item.get('desde', item.get('from', '')))
+            target = diagram.find_class(item.get('hacia', item.get('to', '')))
+            if source is not None and target is not None:
+                diagram.add(_load_relation(item, source.id, target.id, id_factory))
+        return diagram
+
+    elementos = data if isinstance(data, list) else (data.get('elementos') or [])
+    relaciones = [] if isinstance(data, list) else (data.get('relaciones') or [])
+    for item in list(elementos) + list(relaciones):
+        if not isinstance(item, dict):
+            continue
+        if _is_relation(item):
+            diagram.add(_load_relation(item, item.get('from', item.get('desde')),
+                                       item.get('to', item.get('hacia')), id_factory))
+        else:
+            known = _BOARD_CLASS_KEYS | (_DETECTOR_CANVAS.keys() if shape == 'detector' else set())
+            diagram.add(_load_class(item, id_factory, known=known))
+    return diagram
+
+
+# --- Volcado ---
+
+def _set(out, key, value):
+    if value is not None:
+        out[key] = value
+
+
+def _dump_board_class(cls, keep_extra):
+    out = {'tipo': cls.tipo, 'id': cls.id, 'name': cls.name}
+    _set(out, 'x', cls.x)
+    _set(out, 'y', cls.y)
+    _set(out, 'w', cls.width)
+    _set(out, 'h', cls.height)
+    out['attributes'] = [a.raw for a in cls.attributes]
+    out['methods'] = [m.raw for m in cls.methods]
+    if keep_extra and cls.extra:
+        out.update(cls.extra)
+    return out
+
+
+def _dump_board_relation(rel, keep_extra):
+    out = {'tipo': rel.tipo, 'id': rel.id, 'from': rel.source, 'to': rel.target}
+    _set(out, 'label', rel.label)
+    _set(out, 'multOrigen', rel.mult_source)
+    _set(out, 'multDestino', rel.mult_target)
+    if keep_extra and rel.extra:
+        out.update(rel.extra)
+    return out
+
+
+def _dump_detector(diagram):
+    # Misma disposición que calculaba detect_uml.py: ancho fijo, alto según el contenido
+    elementos = []
+    for cls in diagram.classes:
+        elementos.append({
+            'id': cls.id,
+            'tipo': cls.tipo,
+            'name': cls.name or 'SinNombre',
+            'attributes': [a.raw for a in cls.attributes],
+            'methods': [m.raw for m in cls.methods],
+            'x': cls.x if cls.x is not None else 100 + len(elementos) * 200,
+            'y': cls.y if cls.y is not None else 100,
+            'width': 150,
+            'height': max(100, 30 + (len(cls.attributes) + len(cls.methods)) * 20),
+            **_DETECTOR_CANVAS,
+        })
+    relaciones = [{'id': rel.id, 'tipo': _DETECTOR_KINDS[rel.kind], 'desde': rel.source,
+                   'hacia': rel.target, 'etiqueta': rel.label or ''} for rel in diagram.relations]
+    return {'elementos': elementos, 'relaciones': relaciones}
+
+
+def _dump_vision(diagram):
+    elements = [{'type': cls.tipo, 'name': cls.name, 'attributes': [a.raw for a in cls.attributes],
+                 'methods': [m.raw for m in cls.methods]} for cls in diagram.classes]
+    relationships = []
+    for rel in diagram.relations:
+        source, target = diagram.get(rel.source), diagram.get(rel.target)
+        if source is not None and target is not None:
+            relationships.append({'type': _DETECTOR_KINDS[rel.kind], 'desde': source.name,
+                                  'hacia': target.name, 'label': rel.label or ''})
+    return {'elements': elements, 'relationships': relationships}
+
+
+def dump(diagram, shape='board', keep_extra=True):
+    """Vuelca la pizarra a la forma indicada. Con keep_extra se conservan las claves desconocidas."""
+    if shape == 'board':
+        return {'elementos': [_dump_board_relation(el, keep_extra) if isinstance(el, Relation)
+                              else _dump_board_class(el, keep_extra) for el in diagram.elements]}
+    if shape == 'detector':
+        return _dump_detector(diagram)
+    if shape == 'vision':
+        return _dump_vision(diagram)
+    raise ValueError(f"Forma desconocida: {shape} (opciones: {', '.join(SHAPES)})")
+
+
+def as_board(data):
+    """La pizarra en forma 'board' (sin copiar si ya lo está)."""
+    if detect_shape(data) == 'board':
+        return data if isinstance(data, dict) else {'elementos': data}
+    return dump(load(data))
@@ -0,0 +1,12 @@
+-- Historial de versiones de cada pizarra (board_snapshots.py): deltas JSON Patch
+-- y checkpoints periódicos; 'base' es el checkpoint del que parte cada delta.
+CREATE TABLE IF NOT EXISTS pizarra_versiones (
+  pizarra_id INTEGER REFERENCES pizarras(id) ON DELETE CASCADE,
+  version INTEGER NOT NULL,
+  tipo TEXT NOT NULL CHECK (tipo IN ('checkpoint', 'delta')),
+  contenido JSONB NOT NULL,
+  base INTEGER NOT NULL,
+  origen TEXT,
+  creado_en TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (pizarra_id, version)
+);
@@ -0,0 +1,4 @@
+-- Índices para cargar pizarras (board_queries.py). En una base ya creada: psql -f este
+-- archivo (con tablas grandes, CREATE INDEX CONCURRENTLY para no bloquear escrituras).
+CREATE INDEX IF NOT EXISTS idx_elementos_pizarra_id ON elementos (pizarra_id, id);
+CREATE INDEX IF NOT EXISTS idx_elementos_propiedades ON elementos USING GIN (propiedades jsonb_path_ops);
@@ -0,0 +1,3 @@
+-- Versión de cada pizarra: la sube cada escritura de elementos (server.js y model_gemini.py);
+-- las actualizaciones de la IA solo escriben si sigue siendo la que leyeron (board_updates.py).
+ALTER TABLE pizarras ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
@@ -1,26 +1,65 @@
 # generate_springboot.py
 import os
 import sys
+import io
+import copy
 import json
+import struct
+import tarfile
 import zipfile
 import re
-from jinja2 import Environment, FileSystemLoader
+import time
+import shutil
+import hashlib
+import tempfile
+import argparse
+import threading
+from collections import Counter, namedtuple
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, meta
 
+from diagram_ir import as_board, parse_attribute_text
+from sql_ddl import foreign_key_name, schema_sql, unique_name
+from schema_diff import MIGRATION_DIR, migration_filename, migration_sql
+from uml_relations import build_relation_graph
+
+try:
+    import ijson  # opcional: parseo incremental de diagramas muy grandes
+except ImportError:
+    ijson = None
+
+try:
+    import zstandard  # opcional: formato tar.zst
+except ImportError:
+    zstandard = None
+
+try:
+    import resource  # no existe en Windows
+except ImportError:
+    resource = None
+
+# --- Conversión de nombres ---
+# Las mismas pocas decenas de nombres se convierten miles de veces por proyecto (clases,
+# tipos de atributo, filtros de plantilla): las conversiones se memorizan con lru_cache.
+
+_SEPARATORS_RE = re.compile(r'[_\-]')
+_ACRONYM_BOUNDARY_RE = re.compile(r'([A-Z]+)([A-Z][a-z])')
+_CAMEL_BOUNDARY_RE = re.compile(r'([a-z\d])([A-Z])')
+
+@lru_cache(maxsize=4096)
 def to_pascal_case(s):
 
-    s = s.replace('_', ' ').replace('-', ' ')
-    parts = s.split()
-    if not parts:
+    camel_case = to_camel_case(s)
+    if not camel_case:
         return ""
-    
-    camel_case = to_camel_case(s) 
 
     return camel_case[0].upper() + camel_case[1:]
 
+@lru_cache(maxsize=4096)
 def to_camel_case(s):
 
-    s = s.replace('_', ' ').replace('-', ' ')
-    parts = s.split()
+    parts = _SEPARATORS_RE.sub(' ', s).split()
     if not parts:
         return ""
 
@@ -29,14 +68,24 @@ def to_camel_case(s):
     
     return first_word + rest_words
 
+@lru_cache(maxsize=4096)
 def to_snake_case(s):
     """Convierte 'PascalCase' o 'camelCase' a 'snake_case'"""
     if not s:
         return ""
-    s = re.sub(r'([A-Z]+)([A-Z][a-z])', r'\1_\2', s)
-    s = re.sub(r'([a-z\d])([A-Z])', r'\1_\2', s)
+    s = _ACRONYM_BOUNDARY_RE.sub(r'\1_\2', s)
+    s = _CAMEL_BOUNDARY_RE.sub(r'\1_\2', s)
     return s.replace('-', '_').replace(' ', '_').lower()
 
+@lru_cache(maxsize=4096)
+def _naming(name):
+    return to_camel_case(name), to_pascal_case(name), to_snake_case(name)
+
+def naming_fields(name):
+    """Tabla de nombres de un identificador, para exponerla a las plantillas como campos."""
+    camel, pascal, snake = _naming(name)
+    return {'camel_case_name': camel, 'pascal_name': pascal, 'snake_case_name': snake}
+
 def find_display_attribute(entity):
     """
     Intenta adivinar el mejor atributo para mostrar en un dropdown o lista.
@@ -98,29 +147,25 @@ def get_java_type(uml_type, all_class_names):
     return (java_type, None, java_type, False, is_array) # Asume tipo custom no-relación
 
 def parse_attribute(attr_str, all_class_names):
-    is_pk = False
-    if '(pk)' in attr_str.lower():
-        is_pk = True
-        # Limpia el (PK) del string para que no interfiera con el parseo del tipo
-        attr_str = re.sub(r'\s*\((pk|PK)\)\s*', '', attr_str, flags=re.IGNORECASE)
     """Parsea un string como '+ name: String' o '+ categoria: Categoria' a un dict"""
-    attr_str = re.sub(r'^[+\-#~]\s*', '', attr_str).strip()
-    parts = attr_str.split(':')
-    name_str = parts[0].strip().split('(')[0].strip()
+    # Nombre, tipo y (PK) salen de la IR compartida, que parsea cada texto una sola vez
+    parsed = parse_attribute_text(attr_str)
+    name_str, is_pk = parsed.name, parsed.is_pk
     
-    java_name = to_camel_case(name_str)
-    pascal_name = to_pascal_case(name_str)
+    java_name, pascal_name, snake_name = _naming(name_str)
     
-    if len(parts) > 1:
-        type_str = parts[1].strip()
-        java_type, import_needed, dart_type, is_rel, is_array = get_java_type(type_str, all_class_names)
+    if parsed.type is not None:
+        java_type, import_needed, dart_type, is_rel, is_array = get_java_type(parsed.type, all_class_names)
     else:
         java_type, import_needed, dart_type, is_rel, is_array = 'String', None, 'String', False, False
         
     return {
         'name': java_name,
         'pascal_name': pascal_name,
+        'snake_case_name': snake_name,
+        'column_name': java_name.lower(),
         'type': java_type,
+        'type_snake_case': to_snake_case(java_type),  # nombre de archivo del servicio relacionado
         'dart_type': dart_type,
         'import': import_needed,
         'is_relationship': is_rel,  # <-- La clave para el Dropdown
@@ -147,155 +192,875 @@ def get_postman_body(entity):
     return json.dumps(body, indent=4)
 
 
-def generate_project(diagram_json_str, output_zip_path, template_dir):
+def load_diagram(source):
+    """
+    Lee el diagrama desde un archivo o desde stdin ('-').
+    Con ijson instalado, el documento se parsea de forma incremental (sin cargar el texto
+    completo en memoria); si no, se usa json.load sobre el stream. En ambos casos se devuelve
+    el documento entero, sea cual sea su forma (board, detector, visión o lista suelta).
+    """
+    stream = sys.stdin.buffer if source == '-' else open(source, 'rb')
     try:
-        data = json.loads(diagram_json_str)
-        elements = data.get('elementos', [])
-        
-        env = Environment(loader=FileSystemLoader(template_dir))
-        env.filters['capitalize'] = lambda x: x.capitalize()
-        env.filters['camel_case'] = to_camel_case
-        env.filters['pascal_case'] = to_pascal_case
-        env.filters['snake_case'] = to_snake_case
-
-        project_name = "GeneratedProject"
-        if elements:
-            project_name = to_pascal_case(elements[0].get('name', 'GeneratedProject'))
-        
-        base_package = "com.example." + to_camel_case(project_name)
-        base_package_path = base_package.replace('.', '/')
+        if ijson is not None:
+            return next(ijson.items(stream, '', use_float=True))
+        return json.load(stream)
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
 
-        all_class_names = [to_pascal_case(el.get('name')) for el in elements if el.get('tipo', 'Class') == 'Class']
-        
-        entities = []
-        for el in elements:
-            if el.get('tipo', 'Class') == 'Class':
-                class_name = to_pascal_case(el.get('name', 'UnnamedClass'))
-                attributes = [parse_attribute(attr, all_class_names) for attr in el.get('attributes', [])]
-                imports = set()
-                for attr in attributes:
-                    if attr['import']:
-                        imports.add(attr['import'])
-                
-                entities.append({
-                    'name': class_name,
-                    'camel_case_name': to_camel_case(class_name),
-                    'snake_case_name': to_snake_case(class_name), # <-- Nuevo, para nombres de archivo
-                    'table_name': el.get('name', 'unnamed_class').lower().replace(' ', '_'),
-                    'attributes': attributes,
-                    'imports': sorted(list(imports))
-                })
-        
-        if not entities:
-            raise Exception("No se encontraron clases en el diagrama.")
-
-        display_attr_map = {}
-        for entity in entities:
-            # Asigna el display_attr para su *propia* pantalla (ej. en el ListTile)
-            entity_display_attr = find_display_attribute(entity)
-            entity['display_attribute'] = entity_display_attr
-            display_attr_map[entity['name']] = entity_display_attr
-
-        # 2. VOLVER a iterar y enriquecer los atributos de *relación*
-        #    (Esto le dice a 'Producto' qué campo usar de 'Categoria')
-        for entity in entities:
-            for attr in entity['attributes']:
-                if attr['is_relationship']:
-                    related_entity_name = attr['type'] # ej. "Categoria"
-                    # Asignar el display_attr de la entidad relacionada
-                    attr['related_display_attribute'] = display_attr_map.get(related_entity_name, 'id')
-        
-        postman_collection = {
-            "info": {"name": f"{project_name} API", "schema": "https://schema.getpostman.com/json/collection/v2.1.0/collection.json"},
-            "item": [], "variable": [{"key": "host", "value": "http://localhost:8080"}]
-        }
-
-        with zipfile.ZipFile(output_zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            zipf.writestr('pom.xml', env.get_template('pom.xml.j2').render(project_name=to_camel_case(project_name)))
-            zipf.writestr(f'src/main/resources/application.properties', env.get_template('application.properties.j2').render())
-            zipf.writestr(f'src/main/java/{base_package_path}/{project_name}Application.java', env.get_template('MainApplication.java.j2').render(base_package=base_package, project_name=project_name))
-            
-            for entity in entities:
-                class_name = entity["name"]
-                camel_case_name = entity["camel_case_name"]
-                api_path = f"api/{camel_case_name}" 
-
-                zipf.writestr(f'src/main/java/{base_package_path}/model/{class_name}.java', env.get_template('Entity.java.j2').render(base_package=base_package, entity=entity))
-                zipf.writestr(f'src/main/java/{base_package_path}/repository/{class_name}Repository.java', env.get_template('Repository.java.j2').render(base_package=base_package, entity=entity))
-                zipf.writestr(f'src/main/java/{base_package_path}/controller/{class_name}Controller.java', env.get_template('Controller.java.j2').render(base_package=base_package, entity=entity, camel_case_name=camel_case_name))
-
-                postman_collection["item"].append({"name": f"Get All {class_name}", "request": {"method": "GET", "header": [], "url": {"raw": f"{{{{host}}}}/{api_path}", "host": ["{{host}}"], "path": [api_path]}}})
-                postman_collection["item"].append({"name": f"Create New {class_name}", "request": {"method": "POST", "header": [{"key": "Content-Type", "value": "application/json"}], "body": {"mode": "raw", "raw": get_postman_body(entity)}, "url": {"raw": f"{{{{host}}}}/{api_path}", "host": ["{{host}}"], "path": [api_path]}}})
-                postman_collection["item"].append({"name": f"Get {class_name} By ID", "request": {"method": "GET", "header": [], "url": {"raw": f"{{{{host}}}}/{api_path}/1", "host": ["{{host}}"], "path": [api_path, "1"]}}})
-        
-        postman_path = output_zip_path.replace('.zip', '_postman.json')
-        with open(postman_path, 'w', encoding='utf-8') as f:
-            json.dump(postman_collection, f, indent=4)
-        
-        flutter_zip_path = output_zip_path.replace('spring_boot_project.zip', 'flutter_project.zip')
-        
-        main_entity = entities[0] 
-        project_name_snake = to_snake_case(project_name)
-
-        with zipfile.ZipFile(flutter_zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            zipf.writestr(
-                'pubspec.yaml',
-                env.get_template('flutter_pubspec.yaml.j2').render(project_name_snake=project_name_snake)
-            )
-            # 2. main.dart (Nuevo - solo rutas)
-            zipf.writestr(
-                'lib/main.dart',
-                env.get_template('flutter_main.dart.j2').render(entities=entities, project_name=project_name)
-            )
+def peak_memory_kb():
+    """Pico de memoria residente del proceso en KB (None si la plataforma no lo permite)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # macOS lo informa en bytes
+
+def create_environment(template_dir, bytecode_cache_dir=None, auto_reload=True):
+    """
+    Entorno Jinja2 con los filtros de nombres. Con `bytecode_cache_dir` las plantillas
+    compiladas se guardan en disco; con auto_reload se recompilan si cambian en disco.
+    """
+    bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir) if bytecode_cache_dir else None
+    env = Environment(loader=FileSystemLoader(template_dir), bytecode_cache=bytecode_cache, auto_reload=auto_reload)
+    env.filters['capitalize'] = lambda x: x.capitalize()
+    env.filters['camel_case'] = to_camel_case
+    env.filters['pascal_case'] = to_pascal_case
+    env.filters['snake_case'] = to_snake_case
+    env.filters['schema_sql'] = schema_sql
+    return env
+
+# --- Render en paralelo ---
+
+# `artifact` indica a qué archivo va cada fichero renderizado ('spring' o 'flutter')
+RenderTask = namedtuple('RenderTask', ['artifact', 'path', 'template', 'params', 'entity_index', 'with_entities'], defaults=(None, False))
+
+CODEGEN_WORKERS = int(os.getenv('CODEGEN_WORKERS', '0')) or (os.cpu_count() or 1)
+# Por debajo de este nº de entidades el arranque del pool cuesta más que el render
+PARALLEL_MIN_ENTITIES = int(os.getenv('CODEGEN_PARALLEL_MIN_ENTITIES', '100'))
+
+_worker_envs = {}
+
+def render_task(env, task, entities):
+    context = dict(task.params)
+    if task.entity_index is not None:
+        context['entity'] = entities[task.entity_index]
+    if task.with_entities:
+        context['entities'] = entities
+    return env.get_template(task.template).render(**context)
+
+def _render_chunk(args):
+    """Ejecutado en los procesos del pool: cada worker compila las plantillas una sola vez."""
+    template_dir, entities, tasks = args
+    env = _worker_envs.get(template_dir)
+    if env is None:
+        env = _worker_envs[template_dir] = create_environment(template_dir)
+    return [render_task(env, task, entities) for task in tasks]
+
+def iter_rendered(tasks, entities, template_dir, env=None, workers=None, executor=None):
+    """
+    Renderiza las tareas y las va entregando como (tarea, contenido) en el mismo orden que
+    `tasks`, sin esperar a tenerlas todas. Con más de un worker (o un `executor` ya creado,
+    p. ej. el del servicio residente) y un diagrama grande, reparte bloques contiguos de
+    tareas entre procesos.
+    """
+    workers = workers or CODEGEN_WORKERS
+    if executor is None and (workers <= 1 or len(entities) < PARALLEL_MIN_ENTITIES):
+        env = env or create_environment(template_dir)
+        for task in tasks:
+            yield task, render_task(env, task, entities)
+        return
+
+    # Varios bloques por worker para repartir bien la carga (las pantallas pesan más)
+    chunk_size = max(1, -(-len(tasks) // (workers * 4)))
+    chunks = [(template_dir, entities, tasks[i:i + chunk_size]) for i in range(0, len(tasks), chunk_size)]
+    pool = None
+    if executor is None:
+        executor = pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for (_, _, chunk_tasks), contents in zip(chunks, executor.map(_render_chunk, chunks)):
+            yield from zip(chunk_tasks, contents)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+# --- Formatos de salida y compresión ---
+
+ARCHIVE_FORMATS = ('zip', 'tar.zst')
+COMPRESSION_MODES = ('stored', 'fast', 'default', 'best')
+CODEGEN_FORMAT = os.getenv('CODEGEN_FORMAT', 'zip')
+CODEGEN_COMPRESSION = os.getenv('CODEGEN_COMPRESSION', 'default')
+
+ZIP_LEVELS = {'stored': (zipfile.ZIP_STORED, None), 'fast': (zipfile.ZIP_DEFLATED, 1),
+              'default': (zipfile.ZIP_DEFLATED, 6), 'best': (zipfile.ZIP_DEFLATED, 9)}
+ZSTD_LEVELS = {'fast': 1, 'default': 3, 'best': 12}  # 'stored' => .tar sin comprimir
+
+# Fecha fija en las entradas: mismo diagrama => mismos bytes
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+def archive_extension(fmt, compression):
+    if fmt == 'zip':
+        return '.zip'
+    return '.tar' if compression == 'stored' else '.tar.zst'
+
+def check_output_options(fmt, compression):
+    if fmt not in ARCHIVE_FORMATS:
+        raise ValueError(f"Formato desconocido: {fmt} (opciones: {', '.join(ARCHIVE_FORMATS)})")
+    if compression not in COMPRESSION_MODES:
+        raise ValueError(f"Compresión desconocida: {compression} (opciones: {', '.join(COMPRESSION_MODES)})")
+    if fmt == 'tar.zst' and compression != 'stored' and zstandard is None:
+        raise ValueError("El formato tar.zst requiere el paquete 'zstandard' (pip install zstandard)")
+
+def write_zip_entry(zipf, path, content, compression='default'):
+    compress_type, level = ZIP_LEVELS[compression]
+    info = zipfile.ZipInfo(path, date_time=ZIP_DATE_TIME)
+    info.compress_type = compress_type
+    info.create_system = 3  # Unix, igual en cualquier plataforma
+    info.external_attr = 0o644 << 16
+    zipf.writestr(info, content, compresslevel=level)
+
+class ZipArchiveWriter:
+    """Escribe entradas en un zip sobre cualquier stream (también no seekable, p. ej. stdout)."""
+
+    def __init__(self, fileobj, compression):
+        self.compression = compression
+        self.zipf = zipfile.ZipFile(fileobj, 'w')
+
+    def add(self, path, content):
+        write_zip_entry(self.zipf, path, content, self.compression)
+
+    def copy_raw(self, source_zip, info):
+        """
+        Copia una entrada de otro zip tal cual, con los bytes ya comprimidos (sin descomprimir
+        ni volver a comprimir). La entrada resultante es idéntica a la que escribiría `add`.
+        """
+        source_zip.fp.seek(info.header_offset)
+        local_header = source_zip.fp.read(zipfile.sizeFileHeader)
+        name_length, extra_length = struct.unpack('<HH', local_header[26:30])
+        source_zip.fp.seek(info.header_offset + zipfile.sizeFileHeader + name_length + extra_length)
+        data = source_zip.fp.read(info.compress_size)
+
+        zipf = self.zipf
+        entry = copy.copy(info)
+        # Sin data descriptor: CRC y tamaños ya se conocen y van en la cabecera local
+        entry.flag_bits &= ~0x08
+        zipf.fp.seek(zipf.start_dir)
+        entry.header_offset = zipf.fp.tell()
+        zipf._writecheck(entry)
+        zipf._didModify = True
+        zipf.fp.write(entry.FileHeader(False))
+        zipf.fp.write(data)
+        zipf.filelist.append(entry)
+        zipf.NameToInfo[entry.filename] = entry
+        zipf.start_dir = zipf.fp.tell()
+
+    def close(self):
+        self.zipf.close()
+
+class TarArchiveWriter:
+    """Tar en modo stream ('w|'), comprimido con zstd salvo en modo 'stored'."""
+
+    def __init__(self, fileobj, compression):
+        self.zstd_writer = None
+        if compression != 'stored':
+            compressor = zstandard.ZstdCompressor(level=ZSTD_LEVELS[compression])
+            fileobj = self.zstd_writer = compressor.stream_writer(fileobj, closefd=False)
+        self.tarf = tarfile.open(fileobj=fileobj, mode='w|', format=tarfile.PAX_FORMAT)
+
+    def add(self, path, content):
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        info = tarfile.TarInfo(path)
+        info.size = len(data)
+        info.mode = 0o644
+        info.mtime = 0
+        self.tarf.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.tarf.close()
+        if self.zstd_writer is not None:
+            self.zstd_writer.close()
+
+def open_archive(fileobj, fmt, compression):
+    return ZipArchiveWriter(fileobj, compression) if fmt == 'zip' else TarArchiveWriter(fileobj, compression)
+
+
+# --- Generación incremental ---
+# Cada fichero del plan tiene un hash de sus entradas: el código fuente de su plantilla y
+# solo las variables de contexto que esa plantilla usa (la entidad con sus atributos y los
+# display_attribute de sus relaciones, la lista de entidades, base_package...). Si el hash
+# coincide con el del manifiesto de la generación anterior, la entrada se copia del zip
+# anterior con sus bytes comprimidos en lugar de renderizarse otra vez.
+
+MANIFEST_NAME = 'generation_manifest.json'
+MANIFEST_VERSION = 1
+CODEGEN_INCREMENTAL = os.getenv('CODEGEN_INCREMENTAL', '1') == '1'
+
+_template_inputs_cache = {}
+
+def _sha(payload):
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _stable_json(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+
+def generator_sources():
+    """Este script y los módulos de los que depende la generación (IR, relaciones, DDL y migraciones)."""
+    import diagram_ir
+    import schema_diff
+    import sql_ddl
+    import uml_relations
+    return [os.path.abspath(path) for path in (__file__, diagram_ir.__file__, uml_relations.__file__, sql_ddl.__file__,
+                                               schema_diff.__file__)]
+
+def generator_version():
+    """Hash de los fuentes del generador: si cambia la lógica de generación, no se reutiliza nada."""
+    digest = hashlib.sha256()
+    for path in generator_sources():
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def template_inputs(env, template_name):
+    """(hash del código de la plantilla, variables de contexto que usa), memorizado por archivo."""
+    source, filename, _ = env.loader.get_source(env, template_name)
+    key = (filename, _sha(source))
+    if key not in _template_inputs_cache:
+        _template_inputs_cache[key] = (key[1], frozenset(meta.find_undeclared_variables(env.parse(source))))
+    return _template_inputs_cache[key]
+
+def task_hashes(tasks, entities, env):
+    """Hash de entradas de cada tarea del plan (mismo orden que `tasks`)."""
+    entity_hashes = [_sha(_stable_json(entity)) for entity in entities]
+    entities_hash = _sha(''.join(entity_hashes))
+    inputs = {name: template_inputs(env, name) for name in {task.template for task in tasks}}
+    hashes = []
+    for task in tasks:
+        source_hash, used = inputs[task.template]
+        parts = [task.template, source_hash, _stable_json({k: v for k, v in task.params.items() if k in used})]
+        if task.entity_index is not None and 'entity' in used:
+            parts.append(entity_hashes[task.entity_index])
+        if task.with_entities and 'entities' in used:
+            parts.append(entities_hash)
+        hashes.append(_sha('|'.join(parts)))
+    return hashes
+
+def build_manifest(tasks, hashes, fmt, compression):
+    files = {}
+    for task, digest in zip(tasks, hashes):
+        files.setdefault(task.artifact, {})[task.path] = digest
+    return {'version': MANIFEST_VERSION, 'generator': generator_version(),
+            'format': fmt, 'compression': compression, 'files': files}
+
+def load_previous_generation(project_dir, manifest):
+    """
+    Devuelve (hashes por fichero, {artefacto: ZipFile abierto}) de una generación anterior
+    compatible (mismo formato, compresión y versión del generador) o None. Los zips los
+    cierra quien llama.
+    """
+    if not project_dir:
+        return None
+    try:
+        with open(os.path.join(project_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if any(previous.get(k) != manifest[k] for k in ('version', 'generator', 'format', 'compression')):
+        return None
+    spring, _, flutter = artifact_names(manifest['format'], manifest['compression'])
+    archives = {}
+    try:
+        for artifact, name in (('spring', spring), ('flutter', flutter)):
+            archives[artifact] = zipfile.ZipFile(os.path.join(project_dir, name))
+    except (OSError, zipfile.BadZipFile):
+        # Borrada por la limpieza o incompleta: se genera todo desde cero
+        for archive in archives.values():
+            archive.close()
+        return None
+    return previous['files'], archives
+
+def latest_generation(output_dir, exclude=None):
+    """Proyecto generado más recientemente en output_dir (base para la generación incremental)."""
+    candidates = []
+    for name in os.listdir(output_dir):
+        path = os.path.join(output_dir, name)
+        if name == exclude or '.tmp-' in name or not os.path.isfile(os.path.join(path, MANIFEST_NAME)):
+            continue
+        candidates.append((os.path.getmtime(path), path))
+    return max(candidates)[1] if candidates else None
+
+
+# --- Generación ---
+
+# Perfil 'production' (opcional): listados paginados, pool Hikari dimensionado, inserciones en
+# lote con IDs por secuencia, índices en las FK y peticiones de prueba de carga en Postman.
+# En la app Flutter: scroll infinito, cliente HTTP keep-alive con caché por ETag y selectores
+# de relaciones que cargan por páginas
+PROFILES = ('default', 'production')
+CODEGEN_PROFILE = os.getenv('CODEGEN_PROFILE', 'default')
+PRODUCTION_SETTINGS = {
+    'jdbc_batch_size': 50,   # = allocationSize de las secuencias: un nextval por lote
+    'page_size': 20,
+    'max_page_size': 200,
+    'pool_size': int(os.getenv('CODEGEN_DB_POOL_SIZE', '10')),
+    'pool_min_idle': 2,
+}
+LOAD_TEST_ITERATIONS = 100
+
+def check_profile(profile):
+    if profile not in PROFILES:
+        raise ValueError(f"Perfil desconocido: {profile} (opciones: {', '.join(PROFILES)})")
+
+def load_test_items(class_name, api_path, entity, settings):
+    """Carpeta de Postman con peticiones para el Collection Runner (iteraciones) sobre los endpoints paginados."""
+    max_ms = "pm.expect(pm.response.responseTime).to.be.below(Number(pm.collectionVariables.get('maxResponseMs')));"
+    def request(name, method, query, tests, body=None):
+        query = [{"key": k, "value": v} for k, v in query]
+        raw = f"{{{{host}}}}/{api_path}" + ('?' + '&'.join(f"{q['key']}={q['value']}" for q in query) if query else '')
+        req = {"method": method, "header": [], "url": {"raw": raw, "host": ["{{host}}"], "path": [api_path]}}
+        if query:
+            req["url"]["query"] = query
+        if body is not None:
+            req["header"] = [{"key": "Content-Type", "value": "application/json"}]
+            req["body"] = {"mode": "raw", "raw": body}
+        return {"name": name, "request": req,
+                "event": [{"listen": "test", "script": {"type": "text/javascript", "exec": tests}}]}
+    page_tests = [f"pm.test('{class_name}: página en tiempo', function () {{",
+                  "    pm.response.to.have.status(200);",
+                  f"    {max_ms}",
+                  "    pm.expect(pm.response.json().content.length).to.be.at.most(Number(pm.collectionVariables.get('pageSize')));",
+                  "});"]
+    return {
+        "name": f"Load Test {class_name}",
+        "description": f"Ejecutar con el Collection Runner ({LOAD_TEST_ITERATIONS} iteraciones o más). "
+                       "Inserta filas y recorre páginas con el tamaño de página 'pageSize'.",
+        "item": [
+            request(f"Bulk Create {class_name}", "POST", [],
+                    ["pm.test('creado', function () {", "    pm.response.to.have.status(200);", f"    {max_ms}", "});"],
+                    body=get_postman_body(entity)),
+            request(f"Get {class_name} First Page", "GET", [("page", "0"), ("size", "{{pageSize}}")], page_tests),
+            request(f"Get {class_name} Random Page", "GET",
+                    [("page", "{{$randomInt}}"), ("size", "{{pageSize}}")]
+                    + [("sort", f"{attr['name']},desc") for attr in entity['attributes'] if attr['is_id']][:1], page_tests),
+            request(f"Get {class_name} Max Page Size", "GET", [("page", "0"), ("size", str(settings['max_page_size']))], page_tests[:3] + ["});"]),
+        ],
+    }
+
+def build_entities(elements):
+    """
+    Entidades del diagrama ('board') con sus atributos parseados, el atributo a mostrar y los
+    campos de relación del grafo (FKs, tablas intermedias). Lanza una excepción si no hay clases.
+    """
+    all_class_names = {to_pascal_case(el.get('name')) for el in elements if el.get('tipo', 'Class') == 'Class'}
+    
+    entities = []
+    for el in elements:
+        if el.get('tipo', 'Class') == 'Class':
+            class_name = to_pascal_case(el.get('name', 'UnnamedClass'))
+            attributes = [parse_attribute(attr, all_class_names) for attr in el.get('attributes', [])]
+            imports = set()
+            for attr in attributes:
+                if attr['import']:
+                    imports.add(attr['import'])
             
-            # 3. Pantalla de inicio (Nuevo - un menú)
-            zipf.writestr(
-                'lib/home_screen.dart',
-                env.get_template('flutter_home_screen.dart.j2').render(entities=entities)
-            )
-
-            # 4. Genera los archivos PARA CADA ENTIDAD
-            for entity in entities:
-                entity_name_snake = entity['snake_case_name'] # ej: 'producto'
-                
-                # 4a. Modelo (producto.dart)
-                zipf.writestr(
-                    f'lib/models/{entity_name_snake}.dart',
-                    env.get_template('flutter_model.dart.j2').render(entity=entity)
-                )
-                
-                # 4b. Servicio (producto_service.dart)
-                zipf.writestr(
-                    f'lib/services/{entity_name_snake}_service.dart',
-                    env.get_template('flutter_service.dart.j2').render(entity=entity)
-                )
-                
-                # 4c. Pantalla (producto_screen.dart)
-                zipf.writestr(
-                    f'lib/screens/{entity_name_snake}_screen.dart',
-                    env.get_template('flutter_screen.dart.j2').render(entity=entity, 
-                        entities=entities)
-                )
-
-        return json.dumps({
-            "zipPath": output_zip_path,
-            "postmanPath": postman_path,
-            "flutterZipPath": flutter_zip_path 
-        })
+            entities.append({
+                'name': class_name,
+                'element_id': el.get('id'),  # identifica la clase entre versiones del diagrama (schema_diff.py)
+                **naming_fields(class_name),  # camel_case_name, pascal_name, snake_case_name (archivos)
+                'table_name': el.get('name', 'unnamed_class').lower().replace(' ', '_'),
+                'attributes': attributes,
+                'imports': sorted(list(imports))
+            })
+    
+    if not entities:
+        raise Exception("No se encontraron clases en el diagrama.")
 
-    except Exception as e:
-        print(f"Error en generate_springboot.py: {str(e)}", file=sys.stderr)
-        sys.exit(1)
+    display_attr_map = {}
+    for entity in entities:
+        # Asigna el display_attr para su *propia* pantalla (ej. en el ListTile)
+        entity_display_attr = find_display_attribute(entity)
+        entity['display_attribute'] = entity_display_attr
+        display_attr_map[entity['name']] = entity_display_attr
+
+    # 2. VOLVER a iterar y enriquecer los atributos de *relación*
+    #    (Esto le dice a 'Producto' qué campo usar de 'Categoria')
+    for entity in entities:
+        for attr in entity['attributes']:
+            if attr['is_relationship']:
+                related_entity_name = attr['type'] # ej. "Categoria"
+                # Asignar el display_attr de la entidad relacionada
+                attr['related_display_attribute'] = display_attr_map.get(related_entity_name, 'id')
+
+    # 3. Grafo de relaciones (elementos Association/Composition/Aggregation + atributos con
+    #    tipo de otra clase): campos JPA de cada lado, tablas intermedias y ciclos
+    relation_graph = build_relation_graph(elements, entities)
+    for entity in entities:
+        name = entity['name']
+        entity['relations'] = relation_graph.relations[name]
+        entity['entity_graph_paths'] = relation_graph.entity_graph_paths(name)
+        entity['imports'] = sorted(set(entity['imports']) | relation_graph.imports(name))
+        # Columnas FK de esta tabla (se indexan en el perfil production)
+        entity['fk_indexes'] = [{'name': f"idx_{entity['table_name']}_{rel['join_column']}"[:63], 'column': rel['join_column']}
+                                for rel in entity['relations'] if rel['join_column']]
+        # Nombres de FKs y UNIQUE fijados en las anotaciones: los mismos que sql_ddl.py
+        entity['unique_constraints'] = []
+        for rel in entity['relations']:
+            if rel['join_column']:
+                rel['foreign_key'] = foreign_key_name(entity['table_name'], rel['join_column'])
+                if rel['kind'] == 'OneToOne':
+                    entity['unique_constraints'].append({'name': unique_name(entity['table_name'], rel['join_column']),
+                                                         'column': rel['join_column']})
+            elif rel['join_table'] and rel['owner']:
+                join = rel['join_table']
+                join['foreign_key'] = foreign_key_name(join['name'], join['join_column'])
+                join['inverse_foreign_key'] = foreign_key_name(join['name'], join['inverse_join_column'])
+        for attr in entity['attributes']:
+            # El atributo se emite como campo de relación, no como columna
+            attr['relation_field'] = attr['name'] in relation_graph.claimed[name]
+    return entities
+
+def build_plan(data, profile='default', previous=None):
+    """
+    Una sola pasada sobre las entidades: lista ordenada de ficheros a renderizar (Spring y
+    Flutter) y colección de Postman. Devuelve (entities, tasks, postman_collection).
+    Con `profile='production'` las plantillas de Spring reciben PRODUCTION_SETTINGS.
+    Con `previous` (versión anterior del diagrama, ya desplegada) el esquema pasa a Flyway:
+    V1 crea el esquema anterior y V2 lo migra al actual (schema_diff.py), sin recrear la BD.
+    """
+    check_profile(profile)
+    production = PRODUCTION_SETTINGS if profile == 'production' else None
+    # Acepta también la salida de detect_uml.py o del modelo de visión (ver diagram_ir.SHAPES)
+    elements = as_board(data).get('elementos', [])
+
+    project_name = "GeneratedProject"
+    if elements:
+        project_name = to_pascal_case(elements[0].get('name', 'GeneratedProject'))
+    
+    base_package = "com.example." + to_camel_case(project_name)
+    base_package_path = base_package.replace('.', '/')
+
+    entities = build_entities(elements)
+    previous_entities = None
+    if previous is not None:
+        previous_entities = build_entities(as_board(previous).get('elementos', []))
+    flyway = previous_entities is not None
+
+    postman_collection = {
+        "info": {"name": f"{project_name} API", "schema": "https://schema.getpostman.com/json/collection/v2.1.0/collection.json"},
+        "item": [], "variable": [{"key": "host", "value": "http://localhost:8080"}]
+    }
+    load_tests = []
+    if production:
+        postman_collection["variable"] += [{"key": "pageSize", "value": str(production['page_size'])},
+                                           {"key": "maxResponseMs", "value": "500"}]
+
+    project_name_snake = to_snake_case(project_name)
+    tasks = [
+        RenderTask('spring', 'pom.xml', 'pom.xml.j2', {'project_name': to_camel_case(project_name), 'flyway': flyway}),
+        RenderTask('spring', 'src/main/resources/application.properties', 'application.properties.j2', {'production': production, 'flyway': flyway}),
+        # DDL equivalente al mapeo JPA (sql_ddl.py): Spring no lo ejecuta salvo con spring.sql.init.mode=always
+        RenderTask('spring', 'src/main/resources/schema.sql', 'schema.sql.j2', {'production': production}, with_entities=True),
+        RenderTask('spring', f'src/main/java/{base_package_path}/{project_name}Application.java', 'MainApplication.java.j2', {'base_package': base_package, 'project_name': project_name, 'production': production}),
+        RenderTask('flutter', 'pubspec.yaml', 'flutter_pubspec.yaml.j2', {'project_name_snake': project_name_snake, 'production': production}),
+        # 2. main.dart (Nuevo - solo rutas)
+        RenderTask('flutter', 'lib/main.dart', 'flutter_main.dart.j2', {'project_name': project_name}, with_entities=True),
+        # 3. Pantalla de inicio (Nuevo - un menú)
+        RenderTask('flutter', 'lib/home_screen.dart', 'flutter_home_screen.dart.j2', {}, with_entities=True),
+    ]
+    if flyway:
+        # Una BD creada por Hibernate con la versión anterior se toma como V1 (baseline) y solo aplica V2
+        tasks.append(RenderTask('spring', f'{MIGRATION_DIR}/{migration_filename(1, "esquema_inicial")}', 'migration.sql.j2',
+                                {'sql': schema_sql(previous_entities, production)}))
+        tasks.append(RenderTask('spring', f'{MIGRATION_DIR}/{migration_filename(2)}', 'migration.sql.j2',
+                                {'sql': migration_sql(previous_entities, entities, production)}))
+    if production:
+        # Cliente HTTP compartido (keep-alive + caché con ETag) y listas con scroll infinito
+        tasks.append(RenderTask('flutter', 'lib/services/api_client.dart', 'flutter_api_client.dart.j2', {'production': production}))
+        tasks.append(RenderTask('flutter', 'lib/widgets/paged_list.dart', 'flutter_paged_list.dart.j2', {}))
+    flutter_service = 'flutter_service_paged.dart.j2' if production else 'flutter_service.dart.j2'
+    flutter_screen = 'flutter_screen_paged.dart.j2' if production else 'flutter_screen.dart.j2'
+
+    # 4. Genera los archivos PARA CADA ENTIDAD (backend, app y Postman en la misma pasada)
+    for index, entity in enumerate(entities):
+        class_name = entity["name"]
+        camel_case_name = entity["camel_case_name"]
+        entity_name_snake = entity['snake_case_name'] # ej: 'producto'
+        api_path = f"api/{camel_case_name}" 
+
+        tasks.append(RenderTask('spring', f'src/main/java/{base_package_path}/model/{class_name}.java', 'Entity.java.j2', {'base_package': base_package, 'production': production}, index))
+        tasks.append(RenderTask('spring', f'src/main/java/{base_package_path}/repository/{class_name}Repository.java', 'Repository.java.j2', {'base_package': base_package, 'production': production}, index))
+        tasks.append(RenderTask('spring', f'src/main/java/{base_package_path}/controller/{class_name}Controller.java', 'Controller.java.j2', {'base_package': base_package, 'camel_case_name': camel_case_name, 'production': production}, index))
+        # 4a. Modelo (producto.dart), 4b. Servicio (producto_service.dart), 4c. Pantalla (producto_screen.dart)
+        tasks.append(RenderTask('flutter', f'lib/models/{entity_name_snake}.dart', 'flutter_model.dart.j2', {}, index))
+        tasks.append(RenderTask('flutter', f'lib/services/{entity_name_snake}_service.dart', flutter_service, {}, index))
+        tasks.append(RenderTask('flutter', f'lib/screens/{entity_name_snake}_screen.dart', flutter_screen, {}, index, with_entities=True))
+
+        postman_collection["item"].append({"name": f"Get All {class_name}", "request": {"method": "GET", "header": [], "url": {"raw": f"{{{{host}}}}/{api_path}", "host": ["{{host}}"], "path": [api_path]}}})
+        postman_collection["item"].append({"name": f"Create New {class_name}", "request": {"method": "POST", "header": [{"key": "Content-Type", "value": "application/json"}], "body": {"mode": "raw", "raw": get_postman_body(entity)}, "url": {"raw": f"{{{{host}}}}/{api_path}", "host": ["{{host}}"], "path": [api_path]}}})
+        postman_collection["item"].append({"name": f"Get {class_name} By ID", "request": {"method": "GET", "header": [], "url": {"raw": f"{{{{host}}}}/{api_path}/1", "host": ["{{host}}"], "path": [api_path, "1"]}}})
+        if production:
+            load_tests.append(load_test_items(class_name, api_path, entity, production))
+
+    if load_tests:
+        postman_collection["item"].append({"name": "Load Tests", "item": load_tests})
+    return entities, tasks, postman_collection
+
+def _parse_previous(previous):
+    """Versión anterior del diagrama (JSON o dict, en cualquier forma de diagram_ir) como 'board'."""
+    if previous is None:
+        return None
+    return as_board(json.loads(previous) if isinstance(previous, (str, bytes)) else previous)
+
+def generate_project(diagram, output_zip_path, template_dir, env=None, workers=None, executor=None,
+                     fmt=CODEGEN_FORMAT, compression=CODEGEN_COMPRESSION, incremental_from=None,
+                     profile=CODEGEN_PROFILE, previous=None):
+    """
+    `diagram` puede ser el JSON como string o el dict ya parseado ({'elementos': [...]}).
+    `env` permite reutilizar un entorno Jinja2 ya compilado (ver codegen_service.py).
+    `workers`/`executor` controlan el render en paralelo (ver iter_rendered).
+    `fmt` ('zip' o 'tar.zst') y `compression` (stored/fast/default/best) eligen el formato de
+    los archivos; `output_zip_path` es la ruta del archivo de Spring con su extensión.
+    Con `incremental_from` (directorio de una generación anterior con manifiesto, formato zip)
+    solo se renderizan los ficheros cuyas entradas cambiaron; el resto se copia comprimido.
+    `profile` ('default' o 'production') elige el perfil del backend generado (ver PROFILES).
+    `previous` (versión anterior del diagrama) añade las migraciones Flyway (ver build_plan).
+    Los dos archivos se escriben a la vez, fichero a fichero, según se van renderizando.
+    Lanza una excepción si el diagrama no se puede generar.
+    """
+    check_output_options(fmt, compression)
+    started = time.perf_counter()
+    data = json.loads(diagram) if isinstance(diagram, (str, bytes)) else diagram
+    entities, tasks, postman_collection = build_plan(data, profile, _parse_previous(previous))
+    if env is None:
+        env = create_environment(template_dir)
+
+    extension = archive_extension(fmt, compression)
+    stem = output_zip_path[:-len(extension)] if output_zip_path.endswith(extension) else output_zip_path
+    postman_path = stem + '_postman.json'
+    flutter_zip_path = os.path.join(os.path.dirname(output_zip_path), 'flutter_project' + extension)
+    paths = {'spring': output_zip_path, 'flutter': flutter_zip_path}
+
+    manifest = None
+    prior_generation = None
+    source_zips = {}
+    reused = set()
+    if fmt == 'zip':
+        manifest = build_manifest(tasks, task_hashes(tasks, entities, env), fmt, compression)
+        prior_generation = load_previous_generation(incremental_from, manifest)
+    if prior_generation is not None:
+        previous_files, source_zips = prior_generation
+        reused = {(task.artifact, task.path) for task in tasks
+                  if previous_files.get(task.artifact, {}).get(task.path) == manifest['files'][task.artifact][task.path]
+                  and task.path in source_zips[task.artifact].NameToInfo}
+    pending = [task for task in tasks if (task.artifact, task.path) not in reused]
+
+    # Se escribe en '.partial' y se renombra al final: la generación anterior (que puede ser
+    # este mismo directorio) sigue intacta mientras se copian sus entradas
+    partial = {artifact: path + '.partial' for artifact, path in paths.items()}
+    try:
+        with open(partial['spring'], 'wb') as spring_file, open(partial['flutter'], 'wb') as flutter_file:
+            archives = {'spring': open_archive(spring_file, fmt, compression),
+                        'flutter': open_archive(flutter_file, fmt, compression)}
+            rendered = iter_rendered(pending, entities, template_dir, env=env, workers=workers, executor=executor)
+            for task in tasks:
+                if (task.artifact, task.path) in reused:
+                    source = source_zips[task.artifact]
+                    archives[task.artifact].copy_raw(source, source.getinfo(task.path))
+                else:
+                    _, content = next(rendered)
+                    archives[task.artifact].add(task.path, content)
+            for archive in archives.values():
+                archive.close()
+        for artifact, path in paths.items():
+            os.replace(partial[artifact], path)
+    finally:
+        for source in source_zips.values():
+            source.close()
+        for path in partial.values():
+            if os.path.exists(path):
+                os.remove(path)
+    
+    # json.dumps + write en lugar de json.dump: dump codifica por trozos en Python puro
+    with open(postman_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(postman_collection, indent=4))
+
+    manifest_path = os.path.join(os.path.dirname(output_zip_path), MANIFEST_NAME)
+    if manifest is not None:
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(manifest))
+    elif os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    return json.dumps({
+        "zipPath": output_zip_path,
+        "postmanPath": postman_path,
+        "flutterZipPath": flutter_zip_path,
+        "format": fmt,
+        "compression": compression,
+        "profile": profile,
+        "migrations": any(task.path.startswith(MIGRATION_DIR + '/') for task in tasks),
+        "sizes": {os.path.basename(p): os.path.getsize(p) for p in (output_zip_path, postman_path, flutter_zip_path)},
+        "incremental": {"rendered": len(pending), "reused": len(reused)},
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    })
+
+def stream_bundle(diagram, out, template_dir, env=None, workers=None, executor=None,
+                  fmt=CODEGEN_FORMAT, compression=CODEGEN_COMPRESSION, profile=CODEGEN_PROFILE, previous=None):
+    """
+    Escribe un único archivo con los tres artefactos (spring_boot_project/, flutter_project/ y
+    la colección de Postman) directamente en `out` (p. ej. stdout hacia la respuesta HTTP),
+    sin pasar por disco. Devuelve el nº de ficheros escritos.
+    """
+    check_output_options(fmt, compression)
+    data = json.loads(diagram) if isinstance(diagram, (str, bytes)) else diagram
+    entities, tasks, postman_collection = build_plan(data, profile, _parse_previous(previous))
+    prefixes = {'spring': 'spring_boot_project/', 'flutter': 'flutter_project/'}
+
+    archive = open_archive(out, fmt, compression)
+    count = 0
+    for task, content in iter_rendered(tasks, entities, template_dir, env=env, workers=workers, executor=executor):
+        archive.add(prefixes[task.artifact] + task.path, content)
+        count += 1
+    archive.add('postman_collection.json', json.dumps(postman_collection, indent=4))
+    archive.close()
+    return count + 1
+
+
+# --- Caché de artefactos por hash de contenido ---
+
+def artifact_names(fmt='zip', compression='default'):
+    extension = archive_extension(fmt, compression)
+    return ('spring_boot_project' + extension, 'spring_boot_project_postman.json', 'flutter_project' + extension)
+
+ARTIFACT_NAMES = artifact_names()
+GENERATED_MAX_BYTES = int(os.getenv('GENERATED_MAX_MB', '500')) * 1024 * 1024
+GENERATED_MAX_AGE_SECONDS = int(os.getenv('GENERATED_MAX_AGE_DAYS', '7')) * 24 * 3600
+STALE_TMP_SECONDS = 3600
+
+# Campos del diagrama que influyen en el código generado (las coordenadas no)
+CODEGEN_KEYS = ('tipo', 'name', 'attributes', 'methods', 'from', 'to', 'multOrigen', 'multDestino', 'label')
+
+_templates_version_cache = {}
+
+def templates_version(template_dir):
+    """Hash de las plantillas y del generador: si cambian, cambia la ruta de los artefactos."""
+    # Se recalcula solo si cambia el mtime/tamaño de algún archivo (útil en el servicio residente)
+    files = generator_sources() + [os.path.join(template_dir, n) for n in sorted(os.listdir(template_dir))]
+    signature = tuple((f, os.stat(f).st_mtime_ns, os.stat(f).st_size) for f in files)
+    if signature in _templates_version_cache:
+        return _templates_version_cache[signature]
+
+    digest = hashlib.sha256()
+    for path in generator_sources():
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    for name in sorted(os.listdir(template_dir)):
+        digest.update(name.encode('utf-8'))
+        with open(os.path.join(template_dir, name), 'rb') as f:
+            digest.update(f.read())
+    _templates_version_cache.clear()
+    _templates_version_cache[signature] = digest.hexdigest()
+    return _templates_version_cache[signature]
+
+def diagram_hash(data, template_dir, variant=''):
+    """
+    Hash del diagrama normalizado (solo campos relevantes, en orden) + versión de plantillas
+    + `variant` (formato, compresión y perfil de los archivos).
+    """
+    normalized = []
+    for el in data.get('elementos', []):
+        item = {k: el[k] for k in CODEGEN_KEYS if k in el}
+        if el.get('tipo', 'Class') == 'Class' and 'id' in el:
+            item['id'] = el['id']  # las relaciones apuntan a las clases por id
+        normalized.append(item)
+    payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    digest = hashlib.sha256(payload.encode('utf-8'))
+    digest.update(templates_version(template_dir).encode('utf-8'))
+    digest.update(variant.encode('utf-8'))
+    return digest.hexdigest()[:20]
+
+def artifact_paths(project_dir, fmt='zip', compression='default'):
+    spring, postman, flutter = artifact_names(fmt, compression)
+    return {'spring': os.path.join(project_dir, spring), 'postman': os.path.join(project_dir, postman),
+            'flutter': os.path.join(project_dir, flutter)}
+
+# codegen_service.py atiende peticiones en varios hilos: la limpieza se serializa y no toca
+# los proyectos que otra petición de este proceso está generando o devolviendo
+_cleanup_lock = threading.Lock()
+_active_keys = Counter()
+
+
+def _dir_size(path):
+    total = 0
+    for name in os.listdir(path):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except FileNotFoundError:
+            pass
+    return total
+
+
+def cleanup_generated(output_dir, max_bytes=GENERATED_MAX_BYTES, max_age=GENERATED_MAX_AGE_SECONDS, keep=None):
+    """
+    Limpia 'generated/': borra temporales abandonados, proyectos sin uso desde hace más de
+    `max_age` y, si aún se supera `max_bytes`, los menos usados recientemente (LRU por mtime).
+    Las entradas que desaparecen mientras se recorren (otro proceso) se ignoran.
+    """
+    with _cleanup_lock:
+        now = time.time()
+        entries = []
+        for name in os.listdir(output_dir):
+            path = os.path.join(output_dir, name)
+            if name == keep or _active_keys[name]:
+                continue
+            try:
+                if not os.path.isdir(path):
+                    continue
+                mtime = os.path.getmtime(path)
+                if '.tmp-' in name:
+                    if now - mtime > STALE_TMP_SECONDS:
+                        shutil.rmtree(path, ignore_errors=True)
+                    continue
+                if now - mtime > max_age:
+                    shutil.rmtree(path, ignore_errors=True)
+                    continue
+                entries.append((mtime, _dir_size(path), path))
+            except FileNotFoundError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+def generate_cached(diagram, output_dir, template_dir, env=None, workers=None, executor=None,
+                    fmt=CODEGEN_FORMAT, compression=CODEGEN_COMPRESSION, incremental=CODEGEN_INCREMENTAL,
+                    profile=CODEGEN_PROFILE, previous=None):
+    """
+    Genera los artefactos en output_dir/<hash>/. Si ya existen para el mismo diagrama y
+    las mismas plantillas se reutilizan sin regenerar. La generación se hace en un
+    directorio temporal que se renombra al final, así dos peticiones simultáneas no se pisan.
+    Con `incremental`, el proyecto generado más recientemente sirve de base: sus ficheros
+    cuyas entradas no cambiaron se copian en lugar de renderizarse.
+    """
+    check_output_options(fmt, compression)
+    check_profile(profile)
+    started = time.perf_counter()
+    data = as_board(json.loads(diagram) if isinstance(diagram, (str, bytes)) else diagram)
+    previous = _parse_previous(previous)
+    variant = f"{fmt}:{compression}:{profile}"
+    if previous is not None:
+        variant += ':' + diagram_hash(previous, template_dir)  # la migración depende de la versión anterior
+    key = diagram_hash(data, template_dir, variant=variant)
+    with _cleanup_lock:
+        _active_keys[key] += 1
+    try:
+        return _generate_cached(data, key, output_dir, template_dir, started, env=env, workers=workers,
+                                executor=executor, fmt=fmt, compression=compression, incremental=incremental,
+                                profile=profile, previous=previous)
+    finally:
+        with _cleanup_lock:
+            _active_keys[key] -= 1
+            if not _active_keys[key]:
+                del _active_keys[key]
+
+
+def _generate_cached(data, key, output_dir, template_dir, started, env, workers, executor, fmt, compression,
+                     incremental, profile, previous):
+    project_dir = os.path.join(output_dir, key)
+    paths = artifact_paths(project_dir, fmt, compression)
+    cached = all(os.path.exists(p) for p in paths.values())
+
+    incremental_stats = None
+    if cached:
+        os.utime(project_dir)  # marcar como usado recientemente (LRU)
+    else:
+        tmp_dir = tempfile.mkdtemp(prefix=f"{key}.tmp-", dir=output_dir)
+        try:
+            base = latest_generation(output_dir) if incremental else None
+            result = generate_project(data, os.path.join(tmp_dir, os.path.basename(paths['spring'])), template_dir,
+                                      env=env, workers=workers, executor=executor, fmt=fmt, compression=compression,
+                                      incremental_from=base, profile=profile, previous=previous)
+            incremental_stats = json.loads(result)['incremental']
+            try:
+                os.rename(tmp_dir, project_dir)
+            except OSError:
+                # Otro proceso generó el mismo diagrama a la vez: su resultado es idéntico
+                pass
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    cleanup_generated(output_dir, keep=key)
+    return json.dumps({
+        "zipPath": paths['spring'],
+        "postmanPath": paths['postman'],
+        "flutterZipPath": paths['flutter'],
+        "cached": cached,
+        "incremental": incremental_stats,
+        "format": fmt,
+        "compression": compression,
+        "profile": profile,
+        "migrations": previous is not None,
+        "sizes": {os.path.basename(p): os.path.getsize(p) for p in paths.values()},
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    })
 
 if __name__ == "__main__":
-    input_json_str = sys.argv[1]
     script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Genera proyectos Spring Boot y Flutter desde un diagrama UML')
+    parser.add_argument('diagram_json', nargs='?', help='JSON del diagrama como argumento (modo antiguo, limitado por ARG_MAX)')
+    parser.add_argument('--input', help="Archivo con el JSON del diagrama, o '-' para leerlo de stdin")
+    parser.add_argument('--output-dir', default=os.path.join(script_dir, 'generated'), help='Directorio de salida de los artefactos')
+    parser.add_argument('--no-cache', action='store_true', help='Regenerar siempre en output-dir sin usar la caché por hash')
+    parser.add_argument('--workers', type=int, default=None, help='Procesos para el render de plantillas (por defecto CODEGEN_WORKERS o nº de CPUs)')
+    parser.add_argument('--format', choices=ARCHIVE_FORMATS, default=CODEGEN_FORMAT, help='Formato de los archivos generados')
+    parser.add_argument('--compression', choices=COMPRESSION_MODES, default=CODEGEN_COMPRESSION, help='Nivel de compresión')
+    parser.add_argument('--profile', choices=PROFILES, default=CODEGEN_PROFILE,
+                        help="Perfil del backend: 'production' añade paginación, pool, lotes JDBC e índices FK")
+    parser.add_argument('--previous', help="Archivo con la versión anterior del diagrama: añade migraciones Flyway (V1 + V2)")
+    parser.add_argument('--stream', action='store_true', help='Escribir un único archivo con todos los artefactos en stdout')
+    parser.add_argument('--full', action='store_true', help='Renderizar todo, sin reutilizar la generación anterior')
+    args = parser.parse_args()
+
+    if args.input:
+        diagram = load_diagram(args.input)
+    elif args.diagram_json:
+        diagram = args.diagram_json
+    else:
+        parser.error("Se requiere el JSON del diagrama (argumento) o --input")
+
     template_folder = os.path.join(script_dir, 'templates')
-    output_dir = os.path.join(script_dir, 'generated')
+    options = {'workers': args.workers, 'fmt': args.format, 'compression': args.compression, 'profile': args.profile,
+               'previous': load_diagram(args.previous) if args.previous else None}
+
+    if args.stream:
+        # stdout lleva el archivo binario: los mensajes van a stderr
+        try:
+            started = time.perf_counter()
+            files = stream_bundle(diagram, sys.stdout.buffer, template_folder, **options)
+            sys.stdout.buffer.flush()
+        except Exception as e:
+            print(f"Error en generate_springboot.py: {str(e)}", file=sys.stderr)
+            sys.exit(1)
+        print(f"{files} ficheros en {(time.perf_counter() - started) * 1000:.1f} ms, "
+              f"memoria pico: {peak_memory_kb()} KB", file=sys.stderr)
+        sys.exit(0)
+
+    output_dir = args.output_dir
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
         
-    zip_path = os.path.join(output_dir, 'spring_boot_project.zip')
-    result_json = generate_project(input_json_str, zip_path, template_folder)
+    try:
+        if args.no_cache:
+            zip_path = os.path.join(output_dir, artifact_names(args.format, args.compression)[0])
+            result_json = generate_project(diagram, zip_path, template_folder,
+                                           incremental_from=None if args.full else output_dir, **options)
+        else:
+            result_json = generate_cached(diagram, output_dir, template_folder, incremental=not args.full, **options)
+    except Exception as e:
+        print(f"Error en generate_springboot.py: {str(e)}", file=sys.stderr)
+        sys.exit(1)
     
+    print(f"Memoria pico: {peak_memory_kb()} KB", file=sys.stderr)
     print(result_json)
\ No newline at end of file
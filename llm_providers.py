@@ -0,0 +1,460 @@
+# llm_providers.py
+"""
+Abstracción de proveedores LLM compartida por model_gemini.py y detect_uml.py.
+
+- GeminiProvider: google.generativeai (texto e imágenes).
+- OpenAICompatibleProvider: Groq u otro endpoint /chat/completions compatible con OpenAI.
+- run_stub_server: servidor local compatible con OpenAI para pruebas sin red.
+
+LLMRouter elige el proveedor según el p95 de latencia y la tasa de error de una ventana
+móvil, respeta un límite de concurrencia por proveedor y hace failover automático.
+
+Uso del servidor stub:
+    python llm_providers.py --stub --port 8765 --delay 0.2 --fail-rate 0.1
+"""
+import base64
+import json
+import mimetypes
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+import requests
+
+
+class LLMError(RuntimeError):
+    """Ningún proveedor pudo completar la petición."""
+
+
+class LLMResult:
+    """Respuesta completa de un proveedor."""
+
+    __slots__ = ("text", "usage", "provider")
+
+    def __init__(self, text: str, usage: dict | None = None, provider: str = ""):
+        self.text = text
+        self.usage = usage or {}
+        self.provider = provider
+
+
+def load_image(image_path: str) -> tuple[str, bytes]:
+    """Devuelve (mime_type, bytes) de una imagen en disco."""
+    mime_type = mimetypes.guess_type(image_path)[0] or "image/jpeg"
+    with open(image_path, "rb") as f:
+        return mime_type, f.read()
+
+
+# --- Proveedores ---
+
+class LLMProvider:
+    """Interfaz común. `images` es una lista de (mime_type, bytes)."""
+
+    name = "base"
+
+    def __init__(self, max_concurrency: int = 4, timeout: float = 120):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+    def generate(self, prompt: str, images: list | None = None, json_mode: bool = False) -> LLMResult:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, images: list | None = None, json_mode: bool = False):
+        """Por defecto no hay streaming real: devuelve la respuesta completa en un único fragmento."""
+        yield self.generate(prompt, images=images, json_mode=json_mode).text
+
+
+class GeminiProvider(LLMProvider):
+    def __init__(self, model_name: str, api_key: str | None = None, **kwargs):
+        super().__init__(**kwargs)
+        import google.generativeai as genai
+        if api_key:
+            genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.name = f"gemini:{model_name}"
+        self._model = genai.GenerativeModel(model_name)
+
+    def _contents(self, prompt, images):
+        if not images:
+            return prompt
+        return [prompt] + [{"mime_type": mime, "data": data} for mime, data in images]
+
+    def generate(self, prompt, images=None, json_mode=False):
+        response = self._model.generate_content(self._contents(prompt, images),
+                                                request_options={"timeout": self.timeout})
+        usage = getattr(response, "usage_metadata", None)
+        return LLMResult(response.text, {
+            "prompt_tokens": getattr(usage, "prompt_token_count", None),
+            "output_tokens": getattr(usage, "candidates_token_count", None),
+        }, self.name)
+
+    def stream(self, prompt, images=None, json_mode=False):
+        response = self._model.generate_content(self._contents(prompt, images), stream=True,
+                                                request_options={"timeout": self.timeout})
+        for chunk in response:
+            yield chunk.text or ""
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Groq, OpenAI o el servidor stub local: cualquier API /chat/completions."""
+
+    def __init__(self, model_name: str, base_url: str, api_key: str | None = None,
+                 label: str = "openai", temperature: float = 0.3, max_tokens: int = 4096, **kwargs):
+        super().__init__(**kwargs)
+        self.model_name = model_name
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.name = f"{label}:{model_name}"
+        self._session = requests.Session()  # conexiones keep-alive
+
+    def _payload(self, prompt, images, json_mode, stream):
+        if images:
+            content = [{"type": "text", "text": prompt}] + [
+                {"type": "image_url",
+                 "image_url": {"url": f"data:{mime};base64,{base64.b64encode(data).decode('utf-8')}"}}
+                for mime, data in images
+            ]
+        else:
+            content = prompt
+        payload = {
+            "model": self.model_name,
+            "messages": [{"role": "user", "content": content}],
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "stream": stream,
+        }
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
+        return payload
+
+    def _headers(self):
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def generate(self, prompt, images=None, json_mode=False):
+        response = self._session.post(f"{self.base_url}/chat/completions", headers=self._headers(),
+                                      json=self._payload(prompt, images, json_mode, False), timeout=self.timeout)
+        response.raise_for_status()
+        body = response.json()
+        usage = body.get("usage") or {}
+        return LLMResult(body["choices"][0]["message"]["content"], {
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "output_tokens": usage.get("completion_tokens"),
+        }, self.name)
+
+    def stream(self, prompt, images=None, json_mode=False):
+        with self._session.post(f"{self.base_url}/chat/completions", headers=self._headers(),
+                                json=self._payload(prompt, images, json_mode, True),
+                                timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {})
+                if delta.get("content"):
+                    yield delta["content"]
+
+
+# --- Estadísticas y router ---
+
+class ProviderStats:
+    """Ventana móvil de (latencia, ok) por proveedor."""
+
+    def __init__(self, window: int = 50):
+        self.samples = deque(maxlen=window)
+        self.in_flight = 0
+        self.last_used = 0.0
+
+    def record(self, latency: float, ok: bool):
+        self.samples.append((latency, ok))
+        self.last_used = time.time()
+
+    def p95(self) -> float | None:
+        latencies = sorted(lat for lat, ok in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))]
+
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+
+class LLMRouter:
+    """
+    Enruta cada llamada al proveedor con mejor puntuación (p95 penalizado por la tasa de error).
+    Los proveedores sin muestras se prueban primero; si uno falla se pasa al siguiente.
+    Un proveedor que no se usa desde hace `probe_after` segundos conserva su puntuación, pero con
+    probabilidad `probe_rate` (y como mucho una vez por intervalo) pasa delante como prueba:
+    así uno degradado puede volver a entrar en rotación sin que el tráfico bajo lo ponga primero.
+    Si `state_path` está definido, la ventana de estadísticas se persiste entre procesos
+    (útil para scripts de corta vida como detect_uml.py).
+    """
+
+    def __init__(self, providers: list, window: int = 50, state_path: str | None = None,
+                 error_penalty: float = 4.0, acquire_timeout: float = 30, probe_after: float = 60,
+                 probe_rate: float = 0.1):
+        if not providers:
+            raise ValueError("LLMRouter necesita al menos un proveedor")
+        self.providers = providers
+        self.error_penalty = error_penalty
+        self.acquire_timeout = acquire_timeout
+        self.probe_after = probe_after
+        self.probe_rate = probe_rate
+        self._last_probe = 0.0
+        self.state_path = state_path
+        self.stats = {p.name: ProviderStats(window) for p in providers}
+        self._slots = {p.name: threading.BoundedSemaphore(p.max_concurrency) for p in providers}
+        self._lock = threading.Lock()
+        self._load_state()
+
+    @property
+    def signature(self) -> str:
+        return "|".join(p.name for p in self.providers)
+
+    # --- persistencia opcional de la ventana ---
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            for name, state in saved.items():
+                if name in self.stats:
+                    stats = self.stats[name]
+                    stats.samples.extend((latency, ok) for latency, ok in state["samples"])
+                    stats.last_used = state["last_used"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({name: {"samples": list(s.samples), "last_used": s.last_used}
+                           for name, s in self.stats.items()}, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError:
+            pass
+
+    # --- selección ---
+
+    def score(self, provider) -> float:
+        stats = self.stats[provider.name]
+        if not stats.samples:
+            return 0.0
+        p95 = stats.p95()
+        if p95 is None:
+            return float("inf")
+        return p95 * (1 + self.error_penalty * stats.error_rate())
+
+    def ranked(self) -> list:
+        # sorted es estable: a igual puntuación se respeta el orden configurado
+        ranked = sorted(self.providers, key=self.score)
+        now = time.time()
+        stale = [p for p in ranked[1:] if now - self.stats[p.name].last_used >= self.probe_after]
+        if stale and now - self._last_probe >= self.probe_after and random.random() < self.probe_rate:
+            self._last_probe = now
+            ranked.remove(stale[0])
+            ranked.insert(0, stale[0])
+        return ranked
+
+    def snapshot(self) -> dict:
+        """Estado actual del router (para logs o un endpoint de diagnóstico)."""
+        return {
+            p.name: {"p95_s": self.stats[p.name].p95(), "error_rate": round(self.stats[p.name].error_rate(), 3),
+                     "in_flight": self.stats[p.name].in_flight, "samples": len(self.stats[p.name].samples)}
+            for p in self.providers
+        }
+
+    def _acquire(self, ranked: list):
+        """Reserva un hueco en el mejor proveedor libre; si todos están llenos espera al mejor."""
+        for provider in ranked:
+            if self._slots[provider.name].acquire(blocking=False):
+                return provider
+        best = ranked[0]
+        if self._slots[best.name].acquire(timeout=self.acquire_timeout):
+            return best
+        raise LLMError("Todos los proveedores LLM están saturados")
+
+    def _finish(self, provider, started: float, ok: bool | None):
+        """Libera el hueco; con ok=None (el consumidor abandonó el stream) no se registra muestra."""
+        with self._lock:
+            self.stats[provider.name].in_flight -= 1
+            if ok is not None:
+                self.stats[provider.name].record(time.perf_counter() - started, ok)
+                self._save_state()
+        self._slots[provider.name].release()
+
+    def _attempts(self):
+        remaining = self.ranked()
+        while remaining:
+            provider = self._acquire(remaining)
+            remaining = [p for p in remaining if p is not provider]
+            with self._lock:
+                self.stats[provider.name].in_flight += 1
+            yield provider
+
+    def generate(self, prompt: str, images: list | None = None, json_mode: bool = False) -> LLMResult:
+        errors = []
+        for provider in self._attempts():
+            started = time.perf_counter()
+            try:
+                result = provider.generate(prompt, images=images, json_mode=json_mode)
+            except Exception as e:
+                self._finish(provider, started, ok=False)
+                print(f"⚠️ Proveedor {provider.name} falló: {e}", file=sys.stderr)
+                errors.append(f"{provider.name}: {e}")
+                continue
+            self._finish(provider, started, ok=True)
+            return result
+        raise LLMError("; ".join(errors))
+
+    def stream(self, prompt: str, images: list | None = None, json_mode: bool = False, on_provider=None):
+        """
+        Streaming con failover solo antes del primer fragmento: una vez que un proveedor empezó
+        a emitir texto, un error posterior se propaga al llamador.
+        """
+        errors = []
+        for provider in self._attempts():
+            started = time.perf_counter()
+            emitted = False
+            ok = None  # sigue en None si el consumidor cierra el generador (GeneratorExit)
+            try:
+                for chunk in provider.stream(prompt, images=images, json_mode=json_mode):
+                    if not emitted:
+                        emitted = True
+                        if on_provider:
+                            on_provider(provider.name)
+                    yield chunk
+                ok = True
+            except Exception as e:
+                ok = False
+                if emitted:
+                    raise
+                print(f"⚠️ Proveedor {provider.name} falló: {e}", file=sys.stderr)
+                errors.append(f"{provider.name}: {e}")
+                continue
+            finally:
+                self._finish(provider, started, ok)
+            return
+        raise LLMError("; ".join(errors))
+
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+
+def router_from_env(gemini_model: str, groq_model: str, default: str = "gemini,groq",
+                    state_path: str | None = None, gemini_api_key: str | None = None) -> LLMRouter:
+    """
+    Construye un router a partir de LLM_PROVIDERS (lista separada por comas: gemini, groq, stub).
+    Los proveedores sin credenciales se omiten. El stub usa LLM_STUB_URL (por defecto el puerto 8765).
+    """
+    gemini_api_key = gemini_api_key or os.getenv("GOOGLE_API_KEY")
+    providers = []
+    for name in [n.strip() for n in os.getenv("LLM_PROVIDERS", default).split(",") if n.strip()]:
+        concurrency = int(os.getenv(f"LLM_{name.upper()}_CONCURRENCY", "4"))
+        if name == "gemini" and gemini_api_key:
+            try:
+                providers.append(GeminiProvider(gemini_model, api_key=gemini_api_key,
+                                                max_concurrency=concurrency))
+            except ImportError as e:
+                print(f"⚠️ Proveedor gemini no disponible: {e}", file=sys.stderr)
+        elif name == "groq" and os.getenv("GROQ_API_KEY"):
+            providers.append(OpenAICompatibleProvider(groq_model, GROQ_BASE_URL, os.getenv("GROQ_API_KEY"),
+                                                      label="groq", max_concurrency=concurrency))
+        elif name == "stub":
+            providers.append(OpenAICompatibleProvider("stub", os.getenv("LLM_STUB_URL", "http://127.0.0.1:8765"),
+                                                      label="stub", max_concurrency=concurrency))
+    return LLMRouter(providers, state_path=state_path)
+
+
+# --- Servidor stub compatible con OpenAI (pruebas locales) ---
+
+STUB_DEFAULT_RESPONSE = json.dumps({"elementos": [
+    {"tipo": "Class", "id": 1, "name": "Stub", "x": 100, "y": 100, "w": 170, "h": 150,
+     "attributes": ["+ nombre: String"], "methods": []}
+]})
+
+
+def run_stub_server(port: int = 8765, delay: float = 0.0, fail_rate: float = 0.0,
+                    response_text: str = STUB_DEFAULT_RESPONSE, block: bool = True):
+    """
+    Levanta un servidor /chat/completions que responde siempre `response_text` tras `delay`
+    segundos y devuelve 503 con probabilidad `fail_rate`. Con block=False devuelve el servidor
+    (hilo en segundo plano) para usarlo desde otros scripts.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request_body = json.loads(self.rfile.read(length) or b"{}")
+            time.sleep(delay)
+            if random.random() < fail_rate:
+                self.send_response(503)
+                self.end_headers()
+                return
+            if request_body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                for i in range(0, len(response_text), 16):
+                    chunk = {"choices": [{"delta": {"content": response_text[i:i + 16]}}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                return
+            body = json.dumps({
+                "choices": [{"message": {"role": "assistant", "content": response_text}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(response_text) // 4},
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    if not block:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    print(f"Servidor LLM stub en http://127.0.0.1:{port} (delay={delay}s, fail_rate={fail_rate})")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Utilidades del router LLM")
+    parser.add_argument("--stub", action="store_true", help="Levanta el servidor stub compatible con OpenAI")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Latencia simulada en segundos")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Probabilidad de responder 503")
+    parser.add_argument("--response-file", type=str, help="Archivo con el texto que devolverá el stub")
+    args = parser.parse_args()
+
+    if args.stub:
+        text = STUB_DEFAULT_RESPONSE
+        if args.response_file:
+            with open(args.response_file, "r", encoding="utf-8") as f:
+                text = f.read()
+        run_stub_server(args.port, args.delay, args.fail_rate, text)
+    else:
+        parser.print_help()
@@ -0,0 +1,206 @@
+# photo_preprocess.py
+"""
+Preprocesado de fotos de diagramas (móvil, en ángulo) antes del modelo de visión o de YOLO.
+
+Las subidas de uploads/ suelen ser fotos de una hoja o pizarra en perspectiva, con fondo
+alrededor y luz desigual. Enviarlas tal cual gasta resolución en el fondo y empeora la
+lectura (y con ella los reintentos). Etapas, todas en CPU con OpenCV:
+
+1. cuadrilatero: en una copia reducida (PHOTO_DETECT_SIZE), un cierre morfológico borra el
+   trazo y Otsu separa la hoja (clara) del fondo; el contorno mayor se aproxima a 4 vértices.
+   Si no hay cuadrilátero (o es la imagen entera: captura de pantalla) no se corrige.
+2. perspectiva: warpPerspective directamente al tamaño final (lado mayor <= PHOTO_MAX_SIZE).
+3. umbral: umbral adaptativo por media local (la luz desigual no importa).
+4. recorte: se quitan los márgenes sin tinta (y el marco que deja la corrección).
+5. codificacion (solo prepare_upload): PNG de 1 bit si la imagen está binarizada.
+
+Los tiempos de cada etapa se devuelven en `info` y se escriben en stderr (la salida estándar
+de detect_uml.py es el JSON). `info["matrix"]` es la homografía original -> resultado (escala,
+perspectiva y recorte): box_to_original lleva a la imagen original las cajas detectadas sobre
+el resultado, que es donde las esperan uml_relation_tracer.py y class_ocr.py.
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Configuración (se puede sobreescribir con variables de entorno)
+PHOTO_PREPROCESS = os.getenv("PHOTO_PREPROCESS", "1") == "1"
+PHOTO_BINARIZE = os.getenv("PHOTO_BINARIZE", "1") == "1"
+PHOTO_DETECT_SIZE = int(os.getenv("PHOTO_DETECT_SIZE", "640"))
+PHOTO_MAX_SIZE = int(os.getenv("PHOTO_MAX_SIZE", "1600"))
+PHOTO_MIN_PAGE_AREA = float(os.getenv("PHOTO_MIN_PAGE_AREA", "0.2"))
+PHOTO_THRESHOLD_C = int(os.getenv("PHOTO_THRESHOLD_C", "12"))
+PHOTO_MARGIN = int(os.getenv("PHOTO_MARGIN", "12"))
+
+_FULL_FRAME = 0.97   # un cuadrilátero que ocupa más que esto es la imagen entera
+_MIN_INK = 3         # píxeles de tinta para que una fila o columna no sea margen
+
+
+def _scale_to(image, max_size):
+    """Factor (<= 1) para que el lado mayor de `image` no pase de `max_size`."""
+    return min(1.0, max_size / max(image.shape[:2]))
+
+
+def _gray(image):
+    return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def _is_frame(quad, shape, tolerance: float = 0.03) -> bool:
+    """Si las esquinas son las de la propia imagen (captura de pantalla con fondo claro)."""
+    height, width = shape[:2]
+    frame = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+    return bool(np.all(np.abs(quad - frame) <= tolerance * max(width, height)))
+
+
+def order_corners(points) -> np.ndarray:
+    """4 puntos en orden: arriba-izquierda, arriba-derecha, abajo-derecha, abajo-izquierda."""
+    points = np.asarray(points, dtype=np.float32).reshape(4, 2)
+    sums = points.sum(axis=1)
+    diffs = points[:, 1] - points[:, 0]
+    return np.array([points[sums.argmin()], points[diffs.argmin()],
+                     points[sums.argmax()], points[diffs.argmax()]], dtype=np.float32)
+
+
+def find_page_quad(image, detect_size: int = PHOTO_DETECT_SIZE, min_area: float = PHOTO_MIN_PAGE_AREA):
+    """Esquinas (4x2, en coordenadas de `image`) de la hoja o pizarra, o None si no hay."""
+    scale = _scale_to(image, detect_size)
+    small = image
+    if scale < 1:
+        small = cv2.resize(small, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+    small = _gray(small)
+    # El cierre (máximo y luego mínimo) borra el trazo oscuro: queda la hoja clara y uniforme
+    size = max(5, round(max(small.shape) * 0.02)) | 1
+    page = cv2.morphologyEx(small, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (size, size)))
+    page = cv2.GaussianBlur(page, (5, 5), 0)
+    mask = cv2.threshold(page, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
+    contours = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[0]
+    if not contours:
+        return None
+    contour = max(contours, key=cv2.contourArea)
+    total = small.shape[0] * small.shape[1]
+    area = cv2.contourArea(contour)
+    if area < min_area * total or area > _FULL_FRAME * total:
+        return None
+    hull = cv2.convexHull(contour)
+    perimeter = cv2.arcLength(hull, True)
+    for epsilon in (0.02, 0.04, 0.06, 0.08):
+        quad = cv2.approxPolyDP(hull, epsilon * perimeter, True)
+        if len(quad) == 4:
+            quad = order_corners(quad.reshape(4, 2))
+            if _is_frame(quad, small.shape):
+                return None
+            return quad / scale
+        if len(quad) < 4:
+            break
+    return None
+
+
+def warp_page(image, quad, max_size: int = PHOTO_MAX_SIZE):
+    """La hoja vista de frente (lado mayor como mucho `max_size`) y la homografía aplicada."""
+    tl, tr, br, bl = quad
+    width = max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))
+    height = max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))
+    scale = min(1.0, max_size / max(width, height))
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    target = np.array([[0, 0], [size[0] - 1, 0], [size[0] - 1, size[1] - 1], [0, size[1] - 1]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(quad.astype(np.float32), target)
+    warped = cv2.warpPerspective(image, matrix, size, flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+    return warped, matrix
+
+
+def binarize(gray, c: int = PHOTO_THRESHOLD_C):
+    """Tinta negra sobre blanco con umbral adaptativo (ventana ~1/40 del lado mayor)."""
+    block = max(15, max(gray.shape) // 40) | 1
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, block, c)
+
+
+def ink_bounds(binary, margin: int = PHOTO_MARGIN):
+    """(x0, y0, x1, y1) de la tinta más `margin`, sin el marco exterior (bordes de la hoja)."""
+    height, width = binary.shape
+    trim = max(2, min(height, width) // 100)
+    ink = binary[trim:height - trim, trim:width - trim] == 0
+    rows = np.flatnonzero(np.count_nonzero(ink, axis=1) >= _MIN_INK)
+    columns = np.flatnonzero(np.count_nonzero(ink, axis=0) >= _MIN_INK)
+    if not len(rows) or not len(columns):
+        return 0, 0, width, height
+    return (max(0, trim + columns[0] - margin), max(0, trim + rows[0] - margin),
+            min(width, trim + columns[-1] + 1 + margin), min(height, trim + rows[-1] + 1 + margin))
+
+
+def preprocess_photo(image, binarize_output: bool = PHOTO_BINARIZE):
+    """
+    Imagen corregida (en gris binarizado o en color recortado) e info
+    {"page": bool, "quad": esquinas o None, "size": (ancho, alto), "matrix": homografía 3x3
+    original -> resultado, "timings": {etapa: ms}}.
+    """
+    timings = {}
+    started = time.perf_counter()
+
+    def lap(stage):
+        nonlocal started
+        now = time.perf_counter()
+        timings[stage] = (now - started) * 1000
+        started = now
+
+    quad = find_page_quad(image)
+    lap("cuadrilatero")
+    matrix = np.eye(3)
+    if quad is not None:
+        image, matrix = warp_page(image, quad)
+    else:
+        scale = _scale_to(image, PHOTO_MAX_SIZE)
+        if scale < 1:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            matrix = np.diag([scale, scale, 1.0])
+    lap("perspectiva")
+    binary = binarize(_gray(image))
+    lap("umbral")
+    x0, y0, x1, y1 = ink_bounds(binary)
+    result = (binary if binarize_output else image)[y0:y1, x0:x1]
+    matrix = np.array([[1, 0, -x0], [0, 1, -y0], [0, 0, 1]], dtype=np.float64) @ matrix
+    lap("recorte")
+    info = {"page": quad is not None, "quad": None if quad is None else quad.round(1).tolist(),
+            "size": (result.shape[1], result.shape[0]), "matrix": matrix.tolist(), "timings": timings}
+    return result, info
+
+
+def box_to_original(info: dict, x1: float, y1: float, x2: float, y2: float) -> tuple:
+    """Caja (x1, y1, x2, y2) del resultado de preprocess_photo en coordenadas de la imagen original."""
+    corners = np.array([[[x1, y1], [x2, y1], [x2, y2], [x1, y2]]], dtype=np.float64)
+    mapped = cv2.perspectiveTransform(corners, np.linalg.inv(np.array(info["matrix"])))[0]
+    (left, top), (right, bottom) = mapped.min(axis=0), mapped.max(axis=0)
+    return float(left), float(top), float(right), float(bottom)
+
+
+def log_timings(info: dict, label: str = "Preprocesado"):
+    stages = ", ".join(f"{stage} {ms:.1f} ms" for stage, ms in info["timings"].items())
+    page = "hoja corregida" if info["page"] else "sin hoja"
+    print(f"⏱️ {label} ({page}, {info['size'][0]}x{info['size'][1]}): {stages}", file=sys.stderr)
+
+
+def encode_png(image) -> bytes:
+    """PNG; de 1 bit si la imagen es binaria (un diagrama binarizado ocupa muy poco)."""
+    params = [cv2.IMWRITE_PNG_COMPRESSION, 6]
+    if image.ndim == 2 and hasattr(cv2, "IMWRITE_PNG_BILEVEL"):
+        params += [cv2.IMWRITE_PNG_BILEVEL, 1]
+    ok, data = cv2.imencode(".png", image, params)
+    if not ok:
+        raise ValueError("No se pudo codificar la imagen")
+    return data.tobytes()
+
+
+def prepare_upload(image_path: str, binarize_output: bool = PHOTO_BINARIZE) -> tuple[str, bytes]:
+    """(mime_type, bytes) de la imagen preprocesada, como llm_providers.load_image."""
+    image = cv2.imread(image_path)
+    if image is None:
+        raise ValueError(f"No se pudo cargar la imagen: {image_path}")
+    result, info = preprocess_photo(image, binarize_output)
+    started = time.perf_counter()
+    data = encode_png(result)
+    info["timings"]["codificacion"] = (time.perf_counter() - started) * 1000
+    log_timings(info)
+    print(f"📦 {os.path.getsize(image_path) / 1024:.0f} KB -> {len(data) / 1024:.0f} KB", file=sys.stderr)
+    return "image/png", data
@@ -2360,6 +2360,71 @@ async function enviarComandoIA(event) {
 }
 
 
+// Consume /generate_uml_diagram/stream (Server-Sent Events sobre fetch POST).
+// Los eventos "elemento" se previsualizan en la pizarra; "done" trae el estado final.
+async function enviarPromptGeminiStream(requestBody, currentElements, resultado) {
+    const response = await fetch('http://127.0.0.1:5000/generate_uml_diagram/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: requestBody
+    });
+    if (!response.ok || !response.body) {
+        throw new Error('HTTP ' + response.status);
+    }
+
+    const preview = currentElements.slice();
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let recibidos = 0;
+
+    // Tras el primer dato la petición al LLM ya está hecha: el llamador no debe repetirla
+    let datosRecibidos = false;
+    try {
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            datosRecibidos = true;
+            buffer += decoder.decode(value, { stream: true });
+
+            let sep;
+            while ((sep = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, sep);
+                buffer = buffer.slice(sep + 2);
+
+                let eventName = 'message';
+                let dataStr = '';
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                    else if (line.startsWith('data:')) dataStr += line.slice(5).trim();
+                });
+                const data = dataStr ? JSON.parse(dataStr) : {};
+
+                if (eventName === 'elemento') {
+                    const idx = preview.findIndex(el => el.id !== undefined && el.id === data.id);
+                    if (idx !== -1) preview[idx] = { ...preview[idx], ...data };
+                    else preview.push(data);
+                    recibidos++;
+                    elementosPorPizarra[pizarraActual] = preview;
+                    resultado.textContent = `Generando... (${recibidos} elementos recibidos)`;
+                    render();
+                } else if (eventName === 'done') {
+                    elementosPorPizarra[pizarraActual] = data.elementos || preview;
+                    resultado.textContent = 'Pizarra actualizada correctamente.';
+                    render();
+                } else if (eventName === 'error') {
+                    elementosPorPizarra[pizarraActual] = currentElements;
+                    render();
+                    resultado.textContent = 'Error: ' + (data.error || 'desconocido') + '\n' + (data.details || '');
+                }
+            }
+        }
+    } catch (err) {
+        err.streamStarted = datosRecibidos;
+        throw err;
+    }
+}
+
 async function enviarPromptGemini(event) {
     event.preventDefault();
     const prompt = document.getElementById('prompt-gemini').value;
@@ -2377,15 +2442,34 @@ async function enviarPromptGemini(event) {
         const currentElements = elementosPorPizarra[pizarraActual] ? elementosPorPizarra[pizarraActual] : [];
         const board = currentElements.length ? { elementos: currentElements } : null;
 
+        const requestBody = JSON.stringify({
+            prompt,
+            board_id: boardId,
+            board: board,
+            mode: 'update' // usar 'update' para modificar elementos existentes
+        });
+
+        // Preferir la variante en streaming (SSE): dibuja cada clase en cuanto llega
+        if (window.ReadableStream && window.TextDecoder) {
+            try {
+                await enviarPromptGeminiStream(requestBody, currentElements, resultado);
+                return;
+            } catch (streamErr) {
+                if (streamErr.streamStarted) {
+                    elementosPorPizarra[pizarraActual] = currentElements;
+                    render();
+                    console.error(streamErr);
+                    resultado.textContent = 'Error al procesar la respuesta de Gemini: ' + streamErr.message;
+                    return;
+                }
+                console.warn('Streaming no disponible, usando endpoint bloqueante:', streamErr);
+            }
+        }
+
         const response = await fetch('http://127.0.0.1:5000/generate_uml_diagram', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                prompt,
-                board_id: boardId,
-                board: board,
-                mode: 'update' // usar 'update' para modificar elementos existentes
-            })
+            body: requestBody
         });
         const text = await response.text();
 
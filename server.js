@@ -890,10 +890,91 @@ app.post('/procesar-imagen', upload.single('imagen'), async (req, res) => {
     }
 });
 
+// --- Servicio residente de generación de código (codegen_service.py) ---
+// Se arranca una sola vez: las plantillas quedan compiladas en memoria entre peticiones.
+// Protocolo JSON-lines: una petición por línea en stdin, una respuesta por línea en stdout.
+// Cada petición caduca a los CODEGEN_TIMEOUT_MS; si el servicio no ha respondido nada en ese
+// tiempo se da por colgado y se reinicia (las peticiones pendientes se rechazan).
+const CODEGEN_TIMEOUT_MS = parseInt(process.env.CODEGEN_TIMEOUT_MS || '120000', 10);
+
+const codegenService = {
+    process: null,
+    nextId: 1,
+    pending: new Map(),
+    buffer: '',
+    lastOutputAt: 0,
+
+    start() {
+        const scriptPath = path.join(__dirname, 'codegen_service.py');
+        const pythonCommand = process.platform === 'win32' ? 'python' : 'python3';
+        const child = spawn(pythonCommand, [scriptPath]);
+        this.process = child;
+        this.buffer = '';
+
+        child.stdout.on('data', (data) => {
+            this.lastOutputAt = Date.now();
+            this.buffer += data.toString();
+            let newline;
+            while ((newline = this.buffer.indexOf('\n')) !== -1) {
+                const line = this.buffer.slice(0, newline).trim();
+                this.buffer = this.buffer.slice(newline + 1);
+                if (!line) continue;
+                try {
+                    const response = JSON.parse(line);
+                    const pending = this.pending.get(response.id);
+                    if (!pending) continue;
+                    this.pending.delete(response.id);
+                    clearTimeout(pending.timer);
+                    if (response.ok) pending.resolve(response.result);
+                    else pending.reject(new Error(response.error));
+                } catch (e) {
+                    console.error('Respuesta inválida del servicio de generación:', line);
+                }
+            }
+        });
+        child.stderr.on('data', (data) => console.error('[codegen]', data.toString().trim()));
+
+        const failAll = (err) => {
+            if (this.process === child) this.process = null;
+            for (const pending of this.pending.values()) {
+                clearTimeout(pending.timer);
+                pending.reject(err);
+            }
+            this.pending.clear();
+        };
+        child.on('error', (err) => failAll(err));
+        child.on('exit', (code) => failAll(new Error(`El servicio de generación terminó (código ${code})`)));
+        child.stdin.on('error', (err) => console.error('Error escribiendo al servicio de generación:', err));
+    },
+
+    request(payload) {
+        if (!this.process) this.start();
+        const id = this.nextId++;
+        const child = this.process;
+        return new Promise((resolve, reject) => {
+            const sentAt = Date.now();
+            const timer = setTimeout(() => {
+                this.pending.delete(id);
+                reject(new Error(`El servicio de generación no respondió en ${CODEGEN_TIMEOUT_MS} ms`));
+                // Sin ninguna respuesta desde que se envió la petición: el proceso está bloqueado
+                if (this.process === child && this.lastOutputAt < sentAt) {
+                    console.error('Reiniciando el servicio de generación (sin respuesta)');
+                    child.kill();
+                }
+            }, CODEGEN_TIMEOUT_MS);
+            this.pending.set(id, { resolve, reject, timer });
+            child.stdin.write(JSON.stringify({ id, ...payload }) + '\n');
+        });
+    }
+};
+
 // --- NUEVA RUTA PARA GENERAR EL BACKEND (CORREGIDA PARA POSTMAN) ---
 app.post('/generar-springboot', async (req, res) => {
     // Recibe los datos de la pizarra actual del cliente
-    const { elementos } = req.body;
+    // (formato: 'zip' | 'tar.zst'; compresion: 'stored' | 'fast' | 'default' | 'best';
+    //  perfil: 'default' | 'production' -> paginación, pool Hikari, lotes JDBC e índices FK;
+    //  elementosAnteriores: versión ya desplegada del diagrama -> migraciones Flyway en lugar de recrear la BD)
+    const { elementos, formato, compresion, perfil, elementosAnteriores } = req.body;
     
     if (!elementos || elementos.length === 0) {
         return res.status(400).json({ error: 'No hay elementos en el diagrama.' });
@@ -904,77 +985,108 @@ app.post('/generar-springboot', async (req, res) => {
     if (!fs.existsSync(generatedDir)) {
         fs.mkdirSync(generatedDir, { recursive: true });
     }
-    
-    // El script de Python espera el JSON como un string
-    const diagramJsonString = JSON.stringify({ elementos: elementos });
-const scriptPath = path.join(__dirname, 'generate_springboot.py');
-    const pythonCommand = process.platform === 'win32' ? 'python' : 'python3';
 
+    let paths;
     try {
-        const pythonProcess = spawn(pythonCommand, [scriptPath, diagramJsonString]);
-        let outputData = '';
-        let errorData = '';
+        // El resultado contiene TRES rutas (Spring, Postman y Flutter)
+        paths = await codegenService.request({
+            diagram: { elementos: elementos },
+            output_dir: generatedDir,
+            format: formato,
+            compression: compresion,
+            profile: perfil,
+            previous: elementosAnteriores ? { elementos: elementosAnteriores } : undefined
+        });
+    } catch (error) {
+        console.error('Error en el servicio de generación:', error);
+        return res.status(500).json({ error: 'Error al generar el proyecto', details: error.message });
+    }
 
-        pythonProcess.stdout.on('data', (data) => { outputData += data.toString(); });
-        pythonProcess.stderr.on('data', (data) => { errorData += data.toString(); });
+    // Verificar los 3 archivos
+    if (!paths.zipPath || !fs.existsSync(paths.zipPath)) {
+        return res.status(500).json({ error: 'Error: No se pudo generar el ZIP de Spring'});
+    }
+    if (!paths.postmanPath || !fs.existsSync(paths.postmanPath)) {
+        return res.status(500).json({ error: 'Error: No se pudo generar el JSON de Postman'});
+    }
+    if (!paths.flutterZipPath || !fs.existsSync(paths.flutterZipPath)) {
+        return res.status(500).json({ error: 'Error: No se pudo generar el ZIP de Flutter'});
+    }
 
-        pythonProcess.on('close', (code) => {
-            if (code !== 0) {
-                console.error('Error en generate_springboot.py:', errorData);
-                return res.status(500).json({ error: 'Error al generar el proyecto', details: errorData });
-            }
+    // Convertir las 3 rutas a rutas web
+    const webZipPath = path.relative(__dirname, paths.zipPath).replace(/\\/g, '/');
+    const webPostmanPath = path.relative(__dirname, paths.postmanPath).replace(/\\/g, '/');
+    const webFlutterPath = path.relative(__dirname, paths.flutterZipPath).replace(/\\/g, '/');
 
-            try {
-                // Parsear el JSON que ahora contiene TRES rutas
-                const paths = JSON.parse(outputData.trim());
+    // Enviar las 3 URLs al cliente
+    res.json({
+        success: true,
+        message: 'Proyecto y colección Postman generados.',
+        downloadUrl: webZipPath,
+        postmanUrl: webPostmanPath,
+        flutterUrl: webFlutterPath,
+        sizes: paths.sizes,
+        elapsedMs: paths.elapsed_ms
+    });
+});
 
-                // Verificar los 3 archivos
-                if (!paths.zipPath || !fs.existsSync(paths.zipPath)) {
-                    return res.status(500).json({ error: 'Error: No se pudo generar el ZIP de Spring'});
-                }
-                if (!paths.postmanPath || !fs.existsSync(paths.postmanPath)) {
-                    return res.status(500).json({ error: 'Error: No se pudo generar el JSON de Postman'});
-                }
-                // --- INICIO DE LA CORRECCIÓN ---
-                if (!paths.flutterZipPath || !fs.existsSync(paths.flutterZipPath)) {
-                    return res.status(500).json({ error: 'Error: No se pudo generar el ZIP de Flutter'});
-                }
-                // --- FIN DE LA CORRECCIÓN ---
-
-                // Convertir las 3 rutas a rutas web
-                const webZipPath = path.relative(__dirname, paths.zipPath).replace(/\\/g, '/');
-                const webPostmanPath = path.relative(__dirname, paths.postmanPath).replace(/\\/g, '/');
-                // --- INICIO DE LA CORRECCIÓN ---
-                const webFlutterPath = path.relative(__dirname, paths.flutterZipPath).replace(/\\/g, '/');
-                // --- FIN DE LA CORRECCIÓN ---
-                
-                // Enviar las 3 URLs al cliente
-                res.json({
-                    success: true,
-                    message: 'Proyecto y colección Postman generados.',
-                    downloadUrl: webZipPath,
-                    postmanUrl: webPostmanPath,
-                    flutterUrl: webFlutterPath // <-- URL de Flutter añadida
-                });
-
-            } catch (parseError) {
-                console.error('Error al parsear la salida de Python:', parseError, outputData);
-                return res.status(500).json({ error: 'Error al leer la respuesta del generador.' });
-            }
-        });
+// Descarga directa: un único archivo con Spring, Flutter y Postman, generado en streaming
+// desde stdout de Python hacia la respuesta HTTP (sin escribir nada en 'generated').
+app.post('/generar-springboot/stream', (req, res) => {
+    const { elementos, formato = 'zip', compresion = 'default', perfil = 'default' } = req.body;
 
-    } catch (error) {
-        console.error('Error al ejecutar spawn:', error);
-        res.status(500).json({ error: 'Error interno del servidor' });
+    if (!elementos || elementos.length === 0) {
+        return res.status(400).json({ error: 'No hay elementos en el diagrama.' });
     }
+
+    const scriptPath = path.join(__dirname, 'generate_springboot.py');
+    const pythonCommand = process.platform === 'win32' ? 'python' : 'python3';
+    const child = spawn(pythonCommand, [
+        scriptPath, '--input', '-', '--stream', '--format', String(formato), '--compression', String(compresion),
+        '--profile', String(perfil)
+    ]);
+
+    let stderr = '';
+    child.stderr.on('data', (data) => { stderr += data.toString(); });
+
+    // Las cabeceras se envían con el primer bloque: si Python falla antes, aún se puede responder 500
+    child.stdout.once('data', (chunk) => {
+        const extension = formato === 'zip' ? 'zip' : (compresion === 'stored' ? 'tar' : 'tar.zst');
+        res.set('Content-Type', formato === 'zip' ? 'application/zip' : 'application/octet-stream');
+        res.set('Content-Disposition', `attachment; filename="proyecto_generado.${extension}"`);
+        res.write(chunk);
+        child.stdout.pipe(res);
+    });
+
+    child.on('error', (err) => {
+        if (!res.headersSent) res.status(500).json({ error: 'Error al generar el proyecto', details: err.message });
+    });
+    child.on('close', (code) => {
+        if (code === 0) {
+            if (!res.headersSent) res.status(500).json({ error: 'La generación no produjo ningún archivo' });
+            return;
+        }
+        console.error('Error en generate_springboot.py (stream):', stderr);
+        if (!res.headersSent) {
+            res.status(500).json({ error: 'Error al generar el proyecto', details: stderr.trim() });
+        } else {
+            res.destroy();
+        }
+    });
+
+    child.stdin.on('error', (err) => console.error('Error escribiendo a generate_springboot.py:', err));
+    child.stdin.end(JSON.stringify({ elementos: elementos }));
 });
 
 // Serve static files from the 'generated' directory at the root level
 app.use('/generated', express.static(path.join(__dirname, 'generated'), {
-    setHeaders: (res, path) => {
-        if (path.endsWith('.zip')) {
+    setHeaders: (res, filePath) => {
+        if (filePath.endsWith('.zip')) {
             res.set('Content-Type', 'application/zip');
             res.set('Content-Disposition', 'attachment; filename="spring_boot_project.zip"');
+        } else if (filePath.endsWith('.tar.zst') || filePath.endsWith('.tar')) {
+            res.set('Content-Type', 'application/octet-stream');
+            res.set('Content-Disposition', `attachment; filename="${path.basename(filePath)}"`);
         }
     }
 }));
@@ -1086,6 +1198,8 @@ io.on('connection', (socket) => {
 
         // Eliminar elementos existentes de esta pizarra
         await db.query('DELETE FROM elementos WHERE pizarra_id = $1', [pizarraId]);
+        // Nueva versión de la pizarra (control optimista de las escrituras de la IA)
+        await db.query('UPDATE pizarras SET version = version + 1 WHERE id = $1', [pizarraId]);
 
         // Insertar nuevos elementos
         for (const el of elementos[i]) {
@@ -0,0 +1,275 @@
+# sql_ddl.py
+"""
+DDL de PostgreSQL para el proyecto generado, a partir de las mismas entidades que usa
+generate_springboot.py (build_entities): tablas, claves primarias, FKs, tablas intermedias
+e índices coinciden con el mapeo JPA de las entidades Java generadas, así que el script crea
+el mismo esquema que Hibernate.
+
+A diferencia de gen_sql_from_elements.js (que busca las relaciones con filter() por cada
+relación), las relaciones ya vienen resueltas por uml_relations.py y las claves primarias se
+buscan en diccionarios: la generación es lineal en clases + relaciones. build_schema() deja
+el esquema en un modelo (también lo usa schema_diff.py para las migraciones) y las sentencias
+se generan una a una (iter_schema) y se pueden escribir según se producen (write_schema).
+
+Orden: secuencias, tablas (con sus columnas FK), tablas intermedias, FKs e índices. Las FKs
+van al final con ALTER TABLE, así los ciclos entre tablas no necesitan un orden especial.
+
+Uso:
+    python sql_ddl.py diagrama.json [-o schema.sql] [--profile production]
+"""
+import argparse
+import os
+import sys
+
+# Tipo Java del atributo (get_java_type) -> tipo de columna que crea Hibernate en PostgreSQL
+SQL_TYPES = {
+    'Integer': 'integer',
+    'Long': 'bigint',
+    'String': 'varchar(255)',
+    'Double': 'float(53)',
+    'Boolean': 'boolean',
+    'LocalDate': 'date',
+}
+DEFAULT_SQL_TYPE = 'text'
+FK_SQL_TYPE = 'bigint'       # columna FK hacia una entidad sin clave primaria
+IDENTIFIER_MAX = 63          # longitud máxima de un identificador en PostgreSQL
+IDENTITY_TYPES = ('Integer', 'Long')
+
+
+def identifier(name):
+    return name[:IDENTIFIER_MAX]
+
+
+# Nombres de las restricciones: las entidades JPA los fijan con @ForeignKey y @UniqueConstraint
+# (generate_springboot.build_entities), así Hibernate y este DDL crean las mismas y las
+# migraciones de schema_diff.py pueden renombrarlas o quitarlas por nombre
+def foreign_key_name(table_name, column):
+    return identifier(f"fk_{table_name}_{column}")
+
+
+def unique_name(table_name, column):
+    return identifier(f"{table_name}_{column}_key")
+
+
+def _primary_key(entity):
+    """Atributo @Id de la entidad (el primero marcado con (PK)), o None."""
+    for attr in entity['attributes']:
+        if attr['is_id'] and not attr['relation_field']:
+            return attr
+    return None
+
+
+def entity_key(entity):
+    """Identidad de la tabla de una entidad entre versiones del diagrama: el id del elemento."""
+    if entity.get('element_id') is not None:
+        return ('class', str(entity['element_id']))
+    return ('name', entity['name'])
+
+
+def _column(sql_type, not_null=False, identity=False, unique=False):
+    return {'type': sql_type, 'not_null': not_null, 'identity': identity, 'unique': unique}
+
+
+def column_sql(table_name, name, column):
+    sql = f"{name} {column['type']}"
+    if column['identity']:
+        sql += " generated by default as identity"
+    if column['not_null']:
+        sql += " not null"
+    if column['unique']:
+        sql += f" constraint {unique_name(table_name, name)} unique"
+    return sql
+
+
+def _table(name, key):
+    """
+    Tabla del modelo. `foreign_keys` e `indexes` van por columna; cada FK guarda la identidad
+    de la tabla a la que apunta (`target`), así un renombrado del destino no cuenta como cambio.
+    En las tablas intermedias `roles` da el papel de cada columna ('join' o 'inverse');
+    `origins` da el id del elemento relación del que sale cada columna FK (si lo tiene).
+    """
+    return {'name': name, 'key': key, 'columns': {}, 'primary_key': None, 'sequence': None,
+            'foreign_keys': {}, 'indexes': {}, 'roles': {}, 'origins': {}}
+
+
+def _foreign_key(table_name, column, target, target_key, reference):
+    return {'name': foreign_key_name(table_name, column), 'target': target_key,
+            'target_table': target, 'reference': reference}
+
+
+def build_schema(entities, production=None):
+    """
+    Modelo del esquema de las entidades de generate_springboot.build_entities:
+    {'tables': {identidad: tabla}, 'ignored': [entidades con nombre o tabla repetidos]}.
+    Las tablas de las entidades van primero y después las intermedias, en orden del diagrama.
+    Con `production` (PRODUCTION_SETTINGS) los IDs usan secuencias con incremento
+    jdbc_batch_size y se indexan las columnas FK, igual que las anotaciones de ese perfil.
+    """
+    by_name = {}
+    table_names = set()
+    kept, ignored = [], []
+    for entity in entities:
+        if entity['name'] in by_name or entity['table_name'] in table_names:
+            ignored.append(entity)
+            continue
+        by_name[entity['name']] = entity
+        table_names.add(entity['table_name'])
+        kept.append(entity)
+
+    keys = {name: _primary_key(entity) for name, entity in by_name.items()}
+    # Un lookup por tipo Java distinto, no por columna
+    java_types = {attr['type'] for entity in kept for attr in entity['attributes']}
+    sql_types = {java_type: SQL_TYPES.get(java_type, DEFAULT_SQL_TYPE) for java_type in java_types}
+
+    def key_type(entity_name):
+        key = keys.get(entity_name)
+        return sql_types[key['type']] if key else FK_SQL_TYPE
+
+    def reference(entity_name):
+        key = keys.get(entity_name)
+        return (by_name[entity_name]['table_name'], key['column_name']) if key else None
+
+    tables = {}
+    join_tables = []
+    for entity in kept:
+        table = _table(entity['table_name'], entity_key(entity))
+        key = keys[entity['name']]
+        for attr in entity['attributes']:
+            if attr['relation_field']:
+                continue
+            identity = attr is key and attr['type'] in IDENTITY_TYPES
+            table['columns'][attr['column_name']] = _column(
+                sql_types[attr['type']], not_null=attr is key, identity=identity and not production)
+        for rel in entity['relations']:
+            if rel['target'] not in by_name:
+                continue
+            target_key = entity_key(by_name[rel['target']])
+            if rel['join_column']:
+                column = rel['join_column']
+                table['columns'][column] = _column(key_type(rel['target']),
+                                                   unique=rel['kind'] == 'OneToOne')
+                table['foreign_keys'][column] = _foreign_key(table['name'], column, rel['target'], target_key,
+                                                             reference(rel['target']))
+                if rel['element_id'] is not None:
+                    table['origins'][column] = rel['element_id']
+            elif rel['join_table'] and rel['owner']:
+                join_tables.append((entity, target_key, rel['join_table']))
+        if key is not None:
+            table['primary_key'] = key['column_name']
+            if production and key['type'] in IDENTITY_TYPES:
+                table['sequence'] = {'name': identifier(entity['table_name'] + '_seq'),
+                                     'increment': production['jdbc_batch_size']}
+        if production:
+            for index in entity['fk_indexes']:
+                table['indexes'][index['column']] = index['name']
+        tables[table['key']] = table
+
+    # Tablas intermedias: identidad = (dueño, destino, nº de orden entre ese par de clases)
+    per_pair = {}
+    for entity, target_key, join in join_tables:
+        owner_key = entity_key(entity)
+        number = per_pair[owner_key, target_key] = per_pair.get((owner_key, target_key), 0) + 1
+        table = _table(join['name'], ('join', owner_key, target_key, number))
+        for role, column, target, target_table_key in (
+                ('join', join['join_column'], join['owner'], owner_key),
+                ('inverse', join['inverse_join_column'], join['target'], target_key)):
+            table['roles'][column] = role
+            table['columns'][column] = _column(key_type(target), not_null=True)
+            table['foreign_keys'][column] = _foreign_key(table['name'], column, target, target_table_key,
+                                                         reference(target))
+        if production:
+            column = join['inverse_join_column']
+            table['indexes'][column] = identifier(f"idx_{join['name']}_{column}")
+        tables[table['key']] = table
+    return {'tables': tables, 'ignored': ignored}
+
+
+def create_table_sql(table):
+    columns = [f"    {column_sql(table['name'], name, column)}" for name, column in table['columns'].items()]
+    if table['primary_key'] is not None:
+        columns.append(f"    primary key ({table['primary_key']})")
+    return f"CREATE TABLE {table['name']} (\n" + ",\n".join(columns) + "\n);\n\n"
+
+
+def create_sequence_sql(sequence):
+    return f"CREATE SEQUENCE {sequence['name']} START WITH 1 INCREMENT BY {sequence['increment']};\n\n"
+
+
+def add_foreign_key_sql(table, column, fk):
+    if fk['reference'] is None:
+        return f"-- Sin FK {table['name']}.{column}: {fk['target_table']} no tiene clave primaria\n\n"
+    ref_table, ref_column = fk['reference']
+    return (f"ALTER TABLE {table['name']} ADD CONSTRAINT {fk['name']} FOREIGN KEY ({column}) "
+            f"REFERENCES {ref_table}({ref_column});\n\n")
+
+
+def create_index_sql(table, column, name):
+    return f"CREATE INDEX {name} ON {table['name']} ({column});\n\n"
+
+
+def iter_schema(entities, production=None):
+    """
+    Sentencias DDL (strings terminados en línea en blanco) para las entidades de
+    generate_springboot.build_entities (ver build_schema para el perfil `production`).
+    """
+    schema = build_schema(entities, production)
+    tables = schema['tables'].values()
+    yield "-- Generado por sql_ddl.py a partir del diagrama (mismo esquema que el mapeo JPA)\n\n"
+    for entity in schema['ignored']:
+        yield f"-- Ignorada la clase {entity['name']}: nombre o tabla repetidos\n\n"
+    for table in tables:
+        if table['sequence']:
+            yield create_sequence_sql(table['sequence'])
+    for table in tables:
+        yield create_table_sql(table)
+    for table in tables:
+        for column, fk in table['foreign_keys'].items():
+            yield add_foreign_key_sql(table, column, fk)
+    for table in tables:
+        for column, name in table['indexes'].items():
+            yield create_index_sql(table, column, name)
+
+
+def schema_sql(entities, production=None):
+    """El DDL completo como string (filtro 'schema_sql' de las plantillas)."""
+    return ''.join(iter_schema(entities, production))
+
+
+def write_schema(entities, out, production=None):
+    """Escribe el DDL en `out` sentencia a sentencia. Devuelve el nº de sentencias."""
+    count = 0
+    for statement in iter_schema(entities, production):
+        out.write(statement)
+        count += 1
+    return count
+
+
+def main():
+    import generate_springboot
+    from diagram_ir import as_board
+
+    parser = argparse.ArgumentParser(description='Genera el DDL PostgreSQL del proyecto desde un diagrama UML')
+    parser.add_argument('input', help="Archivo con el JSON del diagrama, o '-' para leerlo de stdin")
+    parser.add_argument('-o', '--output', help='Archivo de salida (por defecto stdout)')
+    parser.add_argument('--profile', choices=generate_springboot.PROFILES, default=generate_springboot.CODEGEN_PROFILE,
+                        help="Perfil del backend: 'production' usa secuencias e índices en las FKs")
+    args = parser.parse_args()
+
+    data = as_board(generate_springboot.load_diagram(args.input))
+    production = generate_springboot.PRODUCTION_SETTINGS if args.profile == 'production' else None
+    try:
+        entities = generate_springboot.build_entities(data.get('elementos', []))
+    except Exception as e:
+        print(f"Error en sql_ddl.py: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            count = write_schema(entities, f, production)
+        print(f"{count} sentencias en {os.path.abspath(args.output)}", file=sys.stderr)
+    else:
+        write_schema(entities, sys.stdout, production)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ import os
 from PIL import Image
 import torch
 
+from photo_preprocess import PHOTO_PREPROCESS, box_to_original, log_timings, preprocess_photo
+
 class UIDetector:
     def __init__(self, model_path=None):
         """
@@ -27,6 +29,7 @@ class UIDetector:
             11: 'Image',
             12: 'Text'
         }
+        self.photo_info = None  # transformación de photo_preprocess de la última imagen
         
         if model_path and os.path.exists(model_path):
             self.model = YOLO('best.pt')
@@ -56,14 +59,22 @@ class UIDetector:
     
     def preprocess_image(self, image_path):
         """
-        Preprocesa la imagen para la detección
+        Preprocesa la imagen para la detección.
+        Con PHOTO_PREPROCESS las fotos se enderezan y recortan (en color) antes de reducirlas;
+        el tamaño devuelto es entonces el de la imagen corregida y self.photo_info guarda la
+        transformación para devolver las cajas en coordenadas de la imagen original.
         """
+        self.photo_info = None
         try:
             # Leer imagen
             image = cv2.imread(image_path)
             if image is None:
                 raise ValueError(f"No se pudo cargar la imagen: {image_path}")
             
+            if PHOTO_PREPROCESS:
+                image, self.photo_info = preprocess_photo(image, binarize_output=False)
+                log_timings(self.photo_info)
+            
             # Convertir BGR a RGB
             image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
             
@@ -118,6 +129,8 @@ class UIDetector:
                             x2 *= scale_x
                             y1 *= scale_y
                             y2 *= scale_y
+                        if self.photo_info is not None:
+                            x1, y1, x2, y2 = box_to_original(self.photo_info, x1, y1, x2, y2)
                         
                         # Crear detección
                         detection = {
@@ -0,0 +1,177 @@
+# uml_cache.py
+"""
+Caché de respuestas del modelo para /generate_uml_diagram.
+
+Dos niveles:
+- Memoria: LRU (OrderedDict) por proceso, con TTL.
+- Disco: SQLite compartido entre procesos/workers, con TTL y límite de entradas.
+
+La clave se calcula con el prompt normalizado (minúsculas, sin tildes, espacios
+colapsados), el modo, el nombre del modelo y un hash del estado compacto de la pizarra.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Configuración (se puede sobreescribir con variables de entorno)
+CACHE_DB_PATH = os.getenv("UML_CACHE_DB", os.path.join(SCRIPT_DIR, "cache", "uml_responses.sqlite3"))
+CACHE_TTL_SECONDS = int(os.getenv("UML_CACHE_TTL", "86400"))
+CACHE_MEMORY_ITEMS = int(os.getenv("UML_CACHE_MEMORY_ITEMS", "256"))
+CACHE_DISK_ITEMS = int(os.getenv("UML_CACHE_DISK_ITEMS", "5000"))
+
+# Campos de estado del canvas que no cambian el significado del diagrama
+TRANSIENT_KEYS = {"seleccionado", "arrastrando", "ultimoX", "ultimoY", "_ultimoX", "_ultimoY"}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normaliza el prompt: minúsculas, sin tildes y con espacios colapsados."""
+    if not prompt:
+        return ""
+    text = unicodedata.normalize("NFKD", prompt)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _WHITESPACE_RE.sub(" ", text.lower()).strip()
+
+
+def compact_board(board: dict | None) -> list:
+    """Devuelve los elementos de la pizarra sin los campos transitorios del canvas."""
+    if not board or not isinstance(board.get("elementos"), list):
+        return []
+    return [
+        {k: v for k, v in el.items() if k not in TRANSIENT_KEYS}
+        for el in board["elementos"] if isinstance(el, dict)
+    ]
+
+
+def board_fingerprint(board: dict | None) -> str:
+    """Hash estable (sha256) del estado compacto de la pizarra."""
+    payload = json.dumps(compact_board(board), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_cache_key(prompt: str, mode: str, model_name: str, board: dict | None) -> str:
+    """Clave de caché: prompt normalizado + modo + modelo + hash de la pizarra."""
+    parts = [normalize_prompt(prompt), mode or "create", model_name or "", board_fingerprint(board)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Caché LRU en memoria respaldada por una tabla SQLite en disco."""
+
+    def __init__(self, db_path: str | None = CACHE_DB_PATH, ttl: int = CACHE_TTL_SECONDS,
+                 memory_items: int = CACHE_MEMORY_ITEMS, disk_items: int = CACHE_DISK_ITEMS):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.memory_items = memory_items
+        self.disk_items = disk_items
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        if self.db_path:
+            try:
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+                with self._connect() as conn:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS uml_cache ("
+                        " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                        " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+                    )
+            except sqlite3.Error as e:
+                print(f"⚠️ Caché en disco deshabilitada ({self.db_path}): {e}")
+                self.db_path = None
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    # --- Nivel memoria ---
+
+    def _memory_get(self, key: str, now: float):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < now:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_set(self, key: str, value: str, expires_at: float):
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    # --- Nivel disco ---
+
+    def _disk_get(self, key: str, now: float):
+        if not self.db_path:
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value, expires_at FROM uml_cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                value, expires_at = row
+                if expires_at < now:
+                    conn.execute("DELETE FROM uml_cache WHERE key = ?", (key,))
+                    return None
+                conn.execute("UPDATE uml_cache SET last_access = ? WHERE key = ?", (now, key))
+                return value, expires_at
+        except sqlite3.Error as e:
+            print(f"⚠️ Error leyendo caché en disco: {e}")
+            return None
+
+    def _disk_set(self, key: str, value: str, expires_at: float, now: float):
+        if not self.db_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO uml_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, value, expires_at, now),
+                )
+                conn.execute("DELETE FROM uml_cache WHERE expires_at < ?", (now,))
+                conn.execute(
+                    "DELETE FROM uml_cache WHERE key IN ("
+                    " SELECT key FROM uml_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.disk_items,),
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️ Error escribiendo caché en disco: {e}")
+
+    # --- API pública ---
+
+    def get(self, key: str):
+        """Devuelve (valor, nivel) donde nivel es 'memory' o 'disk'; (None, None) si no hay entrada."""
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            self.stats["memory_hits"] += 1
+            return value, "memory"
+        disk_entry = self._disk_get(key, now)
+        if disk_entry is not None:
+            value, expires_at = disk_entry
+            self._memory_set(key, value, expires_at)  # promocionar a memoria
+            self.stats["disk_hits"] += 1
+            return value, "disk"
+        self.stats["misses"] += 1
+        return None, None
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        expires_at = now + self.ttl
+        self._memory_set(key, value, expires_at)
+        self._disk_set(key, value, expires_at, now)
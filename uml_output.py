@@ -0,0 +1,263 @@
+# uml_output.py
+"""
+Reparación y validación local de la salida JSON de los modelos.
+
+Antes de volver a llamar al modelo se intenta arreglar localmente lo más habitual:
+- delimitadores ```json y texto alrededor del JSON,
+- comas finales antes de } o ],
+- claves sin comillas y literales True/False/None,
+- respuestas truncadas (se corta en el último valor completo y se cierran los corchetes).
+
+Después se valida la forma {"elementos": [...]} con un validador compilado
+(fastjsonschema si está instalado; si no, una comprobación equivalente en Python).
+"""
+import json
+import re
+import threading
+
+from diagram_ir import RELATION_KINDS
+
+try:
+    import fastjsonschema
+except ImportError:  # dependencia opcional
+    fastjsonschema = None
+
+# Relaciones (from/to obligatorios) con sus alias; solo las clases (o sin tipo) requieren nombre
+RELATION_TIPOS = list(RELATION_KINDS)
+
+ELEMENTOS_SCHEMA = {
+    "type": "object",
+    "required": ["elementos"],
+    "properties": {
+        "elementos": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "tipo": {"type": "string"},
+                    "name": {"type": "string"},
+                    "attributes": {"type": "array", "items": {"type": "string"}},
+                    "methods": {"type": "array", "items": {"type": "string"}},
+                    "x": {"type": "number"},
+                    "y": {"type": "number"},
+                    "w": {"type": "number"},
+                    "h": {"type": "number"},
+                },
+                "if": {"properties": {"tipo": {"enum": RELATION_TIPOS}}, "required": ["tipo"]},
+                "then": {"required": ["from", "to"]},
+                "else": {
+                    "if": {"properties": {"tipo": {"const": "Class"}}},
+                    "then": {"required": ["name"]},
+                },
+            },
+        }
+    },
+}
+
+
+class OutputError(ValueError):
+    """La salida del modelo no se pudo reparar o no cumple el esquema."""
+
+    def __init__(self, message: str, errors: list | None = None):
+        super().__init__(message)
+        self.errors = errors or [message]
+
+
+# --- Métricas ---
+
+_stats_lock = threading.Lock()
+OUTPUT_STATS = {"responses": 0, "clean": 0, "repaired": 0, "requeried": 0, "failed": 0}
+
+
+def count(key: str, amount: int = 1):
+    with _stats_lock:
+        OUTPUT_STATS[key] += amount
+
+
+def stats_snapshot() -> dict:
+    """Contadores y tasas: repair_rate = reparadas / respuestas; saved_round_trips = reparadas."""
+    with _stats_lock:
+        snapshot = dict(OUTPUT_STATS)
+    total = snapshot["responses"] or 1
+    snapshot["repair_rate"] = round(snapshot["repaired"] / total, 3)
+    snapshot["saved_round_trips"] = snapshot["repaired"]
+    return snapshot
+
+
+# --- Reparación tolerante ---
+
+_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+_UNQUOTED_KEY_RE = re.compile(r'([{,]\s*)([A-Za-z_][A-Za-z0-9_]*)(\s*:)')
+_PY_LITERALS_RE = re.compile(r"(?<=[\s:\[,])(True|False|None)(?=\s*[,}\]])")
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def extract_json_block(text: str) -> str:
+    """Quita delimitadores de código y cualquier texto antes del primer '{' o '['."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else text.strip("`")
+    if text.endswith("```"):
+        text = text[:-3]
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    return text[min(starts):].strip() if starts else text.strip()
+
+
+def _outside_strings(text: str, fn) -> str:
+    """Aplica fn solo a los tramos que no están dentro de un string JSON."""
+    out, chunk, in_str, esc = [], [], False, False
+    for ch in text:
+        if in_str:
+            out.append(ch)
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+            continue
+        if ch == '"':
+            out.append(fn("".join(chunk)))
+            chunk = []
+            out.append(ch)
+            in_str = True
+        else:
+            chunk.append(ch)
+    out.append(fn("".join(chunk)))
+    return "".join(out)
+
+
+def _fix_tokens(segment: str) -> str:
+    segment = _TRAILING_COMMA_RE.sub(r"\1", segment)
+    segment = _UNQUOTED_KEY_RE.sub(r'\1"\2"\3', segment)
+    return _PY_LITERALS_RE.sub(lambda m: _PY_LITERALS[m.group(1)], segment)
+
+
+def close_truncated(text: str) -> str:
+    """
+    Si el JSON quedó cortado, recorta hasta el último miembro completo y cierra
+    los objetos/arrays abiertos. Devuelve el texto sin cambios si ya está balanceado.
+    """
+    stack, in_str, esc = [], False, False
+    safe_cut = None  # (posición, pila en ese punto)
+    for i, ch in enumerate(text):
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            safe_cut = (i + 1, list(stack))
+        elif ch == ",":
+            safe_cut = (i, list(stack))
+    if not stack and not in_str:
+        return text
+    if safe_cut is None:
+        raise OutputError("JSON truncado sin ningún valor completo")
+    cut, open_stack = safe_cut
+    closers = "".join("}" if opener == "{" else "]" for opener in reversed(open_stack))
+    return text[:cut] + closers
+
+
+def load_json_tolerant(text: str):
+    """
+    Devuelve (valor, reparado). Intenta primero json.loads directo y solo si falla aplica
+    las reparaciones locales. Lanza OutputError si ni así es JSON válido.
+    """
+    block = extract_json_block(text)
+    try:
+        return json.loads(block), False
+    except json.JSONDecodeError:
+        pass
+    try:
+        repaired = _outside_strings(close_truncated(block), _fix_tokens)
+        # las comas finales pueden aparecer justo al cerrar un truncado
+        repaired = _outside_strings(repaired, lambda seg: _TRAILING_COMMA_RE.sub(r"\1", seg))
+        return json.loads(repaired), True
+    except (json.JSONDecodeError, OutputError) as e:
+        raise OutputError(f"JSON inválido tras la reparación local: {e}") from e
+
+
+# --- Validación ---
+
+def _python_validator(data):
+    """Equivalente en Python de ELEMENTOS_SCHEMA (si fastjsonschema no está instalado)."""
+    if not isinstance(data, dict) or not isinstance(data.get("elementos"), list):
+        raise OutputError("data must contain 'elementos' as array")
+    for i, el in enumerate(data["elementos"]):
+        prefix = f"data.elementos[{i}]"
+        if not isinstance(el, dict):
+            raise OutputError(f"{prefix} must be object")
+        for key in ("tipo", "name"):
+            if key in el and not isinstance(el[key], str):
+                raise OutputError(f"{prefix}.{key} must be string")
+        for key in ("attributes", "methods"):
+            if key in el and (not isinstance(el[key], list) or not all(isinstance(v, str) for v in el[key])):
+                raise OutputError(f"{prefix}.{key} must be array of strings")
+        for key in ("x", "y", "w", "h"):
+            if key in el and (isinstance(el[key], bool) or not isinstance(el[key], (int, float))):
+                raise OutputError(f"{prefix}.{key} must be number")
+        if el.get("tipo") in RELATION_TIPOS:
+            missing = [k for k in ("from", "to") if k not in el]
+            if missing:
+                raise OutputError(f"{prefix} must contain {missing} properties")
+        elif el.get("tipo", "Class") == "Class" and "name" not in el:
+            raise OutputError(f"{prefix} must contain ['name'] properties")
+    return data
+
+
+if fastjsonschema is not None:
+    _compiled_validator = fastjsonschema.compile(ELEMENTOS_SCHEMA)
+else:
+    _compiled_validator = _python_validator
+
+
+def validate_elementos(data):
+    """Valida la forma {"elementos": [...]}; lanza OutputError con el mensaje del validador."""
+    try:
+        return _compiled_validator(data)
+    except OutputError:
+        raise
+    except Exception as e:  # fastjsonschema.JsonSchemaException
+        raise OutputError(getattr(e, "message", str(e))) from e
+
+
+def parse_elementos_output(text: str) -> tuple[dict, bool]:
+    """
+    Parsea y valida la salida de generación de diagramas.
+    Devuelve ({"elementos": [...]}, reparado) y actualiza las métricas; lanza OutputError si falla.
+    """
+    count("responses")
+    try:
+        parsed, repaired = load_json_tolerant(text)
+        # Aceptar también si el modelo devolvió directamente la lista (convertir a dict)
+        if isinstance(parsed, list):
+            parsed = {"elementos": parsed}
+        validate_elementos(parsed)
+    except OutputError:
+        count("failed")
+        raise
+    count("repaired" if repaired else "clean")
+    return parsed, repaired
+
+
+def build_repair_prompt(original_prompt: str, bad_output: str, errors: list, max_chars: int = 4000) -> str:
+    """Prompt de re-consulta: la petición original más el error concreto de la respuesta anterior."""
+    return f"""{original_prompt}
+
+    Tu respuesta anterior NO es válida y no se pudo reparar automáticamente.
+    Errores: {"; ".join(errors)}
+    Respuesta anterior (posiblemente recortada):
+    {bad_output[:max_chars]}
+
+    Devuelve SOLO el JSON corregido completo, sin texto adicional.
+    """
@@ -0,0 +1,322 @@
+# uml_relation_tracer.py
+"""
+Relaciones de un diagrama a partir de las cajas del detector YOLO (trazado de líneas).
+
+El detector (UIDetector / el modelo entrenado con uml_dataset_generator.py) solo devuelve
+cajas: las relaciones se anotan como la caja de la línea ±10 px, así que no dice qué clases
+une cada una ni en qué sentido. Esta etapa lo resuelve en local con OpenCV, sin LLM:
+
+1. Máscara de tinta de la imagen una sola vez (píxeles más oscuros que RELATION_INK_THRESHOLD
+   en algún canal: las líneas de color también cuentan) con las cajas de clase borradas, así
+   el texto y los bordes de las clases no se confunden con la línea.
+2. HoughLinesP dentro de cada caja de relación; el segmento más largo y los colineales con él
+   (líneas discontinuas, líneas que cruzan otra clase) dan los dos extremos.
+3. Cada extremo se ajusta a la clase más cercana (como mucho RELATION_SNAP_DISTANCE px) con
+   una rejilla espacial: cada clase se registra en las celdas que toca su caja ampliada y la
+   consulta mira una sola celda.
+4. Se muestrea una franja alineada con la línea en cada extremo: la punta está en el que tiene
+   más tinta fuera del grosor de la línea, y su forma (flecha abierta, triángulo, rombo hueco
+   o relleno) sale del perfil de anchura y de lo que llena su contorno convexo. El tipo del
+   detector dice si ese extremo es 'hacia' (flecha, triángulo) o 'desde' (el rombo está en el
+   todo, como en model_gemini.py); el relleno del rombo distingue composición y agregación.
+
+Las detecciones son las de UIDetector: {tipo, x, y, w, h, confidence} en coordenadas de la
+imagen original, con los nombres de clase de uml_dataset_generator.py. El resultado se vuelca
+en la forma 'detector' de diagram_ir (la misma salida que detect_uml.py).
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import uuid
+
+import cv2
+import numpy as np
+
+from diagram_ir import Diagram, Relation, UmlClass, dump as dump_diagram, parse_attribute_text, parse_method_text
+
+# Configuración (se puede sobreescribir con variables de entorno)
+RELATION_INK_THRESHOLD = int(os.getenv("RELATION_INK_THRESHOLD", "170"))
+RELATION_SNAP_DISTANCE = int(os.getenv("RELATION_SNAP_DISTANCE", "40"))
+RELATION_HEAD_LENGTH = int(os.getenv("RELATION_HEAD_LENGTH", "24"))
+RELATION_HEAD_WIDTH = int(os.getenv("RELATION_HEAD_WIDTH", "12"))
+RELATION_MAX_GAP = int(os.getenv("RELATION_MAX_GAP", "8"))
+
+# Tipo canónico de cada clase de relación del detector (uml_dataset_generator.py)
+DETECTION_KINDS = {
+    'Association': 'Association',
+    'Dependency': 'Association',
+    'Aggregation': 'Aggregation',
+    'Composition': 'Composition',
+    'Generalization': 'Generalization',
+    'RecursiveRelation': 'Association',
+    'ManyToManyRelation': 'Association',
+}
+# Tipo que implica cada punta
+HEAD_KINDS = {'triangle': 'Generalization', 'diamond': 'Aggregation', 'filled_diamond': 'Composition'}
+# En estas relaciones la punta (el rombo) está en el todo, que es 'desde' (como en model_gemini.py)
+_WHOLE_PART = ('Aggregation', 'Composition')
+_WHOLE_PART_HEADS = ('diamond', 'filled_diamond')
+
+_BOX_MARGIN = 3         # px que se borran alrededor de cada clase (bordes antialias)
+_MIN_HEAD_ROWS = 4      # filas de la franja más anchas que la línea para que haya punta
+_MIN_HEAD_INK = 8       # píxeles fuera de la línea para que un extremo tenga punta
+_COLLINEAR_PX = 4.0     # distancia máxima de un segmento a la recta del más largo
+_COLLINEAR_COS = math.cos(math.radians(4))  # y diferencia máxima de ángulo
+
+
+def load_image(image):
+    """Ruta o array (BGR o escala de grises) -> array."""
+    if isinstance(image, np.ndarray):
+        return image
+    array = cv2.imread(str(image))
+    if array is None:
+        raise ValueError(f"No se pudo cargar la imagen: {image}")
+    return array
+
+
+def ink_mask(image, threshold=RELATION_INK_THRESHOLD):
+    """uint8 0/255: píxeles con algún canal más oscuro que `threshold`."""
+    # cv2.min canal a canal: numpy.min(axis=2) recorre la imagen con saltos y es ~20x más lento
+    darkest = image if image.ndim == 2 else cv2.min(cv2.min(image[:, :, 0], image[:, :, 1]), image[:, :, 2])
+    return cv2.threshold(darkest, threshold - 1, 255, cv2.THRESH_BINARY_INV)[1]
+
+
+def _box(det):
+    return int(det['x']), int(det['y']), int(det['x']) + int(det['w']), int(det['y']) + int(det['h'])
+
+
+def _rect_distance(box, px, py):
+    x1, y1, x2, y2 = box
+    dx = max(x1 - px, 0, px - x2)
+    dy = max(y1 - py, 0, py - y2)
+    return math.hypot(dx, dy)
+
+
+class ClassGrid:
+    """Rejilla de cajas de clase: celdas de `snap` px, cada caja en las celdas de su caja ampliada."""
+
+    def __init__(self, boxes, snap=RELATION_SNAP_DISTANCE):
+        self.boxes = boxes
+        self.snap = snap
+        self.cell = max(1, snap)
+        self.cells = {}
+        for index, (x1, y1, x2, y2) in enumerate(boxes):
+            for cx in range((x1 - snap) // self.cell, (x2 + snap) // self.cell + 1):
+                for cy in range((y1 - snap) // self.cell, (y2 + snap) // self.cell + 1):
+                    self.cells.setdefault((cx, cy), []).append(index)
+
+    def nearest(self, px, py, exclude=None):
+        """Índice de la caja más cercana a (px, py) dentro de `snap` px, o None."""
+        best, best_distance = None, self.snap + 1e-6
+        for index in self.cells.get((int(px) // self.cell, int(py) // self.cell), ()):
+            if index == exclude:
+                continue
+            distance = _rect_distance(self.boxes[index], px, py)
+            if distance < best_distance:
+                best, best_distance = index, distance
+        return best
+
+
+def _trace_line(mask, box):
+    """
+    Extremos ((x, y), (x, y)) de la línea dentro de `box` (coordenadas de la imagen), o None.
+    Se toma el segmento más largo de HoughLinesP y los que siguen su misma recta (una línea
+    casi horizontal sale en trozos por la resolución del ángulo, una discontinua también) y se
+    reajusta la recta con todos ellos.
+    """
+    x1, y1, x2, y2 = box
+    crop = mask[y1:y2, x1:x2]
+    if crop.size == 0 or not crop.any():
+        return None
+    lines = cv2.HoughLinesP(crop, 1, np.pi / 360, threshold=15, minLineLength=10, maxLineGap=RELATION_MAX_GAP)
+    if lines is None:
+        return None
+    segments = lines.reshape(-1, 4).astype(np.float32)
+    vectors = segments[:, 2:] - segments[:, :2]
+    lengths = np.hypot(vectors[:, 0], vectors[:, 1])
+    longest = int(lengths.argmax())
+    dx, dy = vectors[longest] / lengths[longest]
+    ax, ay = segments[longest, :2]
+    # Segmentos con casi el mismo ángulo y cuyos dos extremos están cerca de la recta
+    ends = segments.reshape(-1, 2) - (ax, ay)
+    offsets = np.abs(ends[:, 0] * dy - ends[:, 1] * dx).reshape(-1, 2).max(axis=1)
+    cosines = np.abs(vectors[:, 0] * dx + vectors[:, 1] * dy) / np.maximum(lengths, 1e-6)
+    points = segments[(offsets <= _COLLINEAR_PX) & (cosines >= _COLLINEAR_COS)].reshape(-1, 2)
+    vx, vy, cx, cy = cv2.fitLine(points, cv2.DIST_L2, 0, 0.01, 0.01).ravel()
+    along = (points[:, 0] - cx) * vx + (points[:, 1] - cy) * vy
+    t_min, t_max = float(along.min()), float(along.max())
+    return ((x1 + cx + vx * t_min, y1 + cy + vy * t_min),
+            (x1 + cx + vx * t_max, y1 + cy + vy * t_max))
+
+
+class _Strip:
+    """Rejilla de muestreo de una franja alineada con la línea (filas = a lo largo, columnas = de lado)."""
+
+    def __init__(self, length=RELATION_HEAD_LENGTH, width=RELATION_HEAD_WIDTH):
+        self.t, self.s = np.meshgrid(np.arange(-length, length + 1, dtype=np.float32),
+                                     np.arange(-width, width + 1, dtype=np.float32), indexing='ij')
+        self.width = width
+        self.offsets = np.abs(np.arange(-width, width + 1))
+
+    def sample(self, mask, px, py, dx, dy):
+        map_x = px + self.t * dx - self.s * dy
+        map_y = py + self.t * dy + self.s * dx
+        return cv2.remap(mask, map_x, map_y, cv2.INTER_NEAREST, borderMode=cv2.BORDER_CONSTANT, borderValue=0) > 0
+
+    def extents(self, strip):
+        """Por fila, la distancia máxima a la línea con tinta (-1 si la fila está vacía)."""
+        return np.where(strip.any(axis=1), (strip * self.offsets).max(axis=1), -1)
+
+
+_STRIP = _Strip()
+
+
+def _head_ink(sample, baseline, strip=_STRIP):
+    """Píxeles de tinta de la franja fuera del grosor de la línea (lo que aporta la punta)."""
+    return int((sample & (np.abs(strip.s) > baseline + 1)).sum())
+
+
+def classify_head(sample, baseline, strip=_STRIP):
+    """
+    Forma de la punta en una franja ya muestreada en un extremo: 'arrow', 'triangle',
+    'diamond', 'filled_diamond' o None. `baseline` es la media anchura de la línea sin punta.
+    """
+    extents = strip.extents(sample)
+    rows = np.flatnonzero(extents > baseline + 2)
+    if len(rows) < _MIN_HEAD_ROWS:
+        return None
+    head = extents[rows[0]:rows[-1] + 1]
+    points = np.argwhere(sample[rows[0]:rows[-1] + 1])[:, ::-1].astype(np.float32)
+    solidity = len(points) / max(1.0, cv2.contourArea(cv2.convexHull(points)))
+    # El rombo vuelve a estrecharse antes de seguir la línea (su mitad junto a la clase puede
+    # quedar tapada por la caja); la flecha y el triángulo acaban en su parte más ancha
+    if head[-1] <= 0.75 * head.max():
+        return 'filled_diamond' if solidity >= 0.9 else 'diamond'
+    # El triángulo está cerrado (su tinta llena casi todo su contorno convexo); la flecha
+    # abierta son dos trazos
+    return 'triangle' if solidity >= 0.9 else 'arrow'
+
+
+def _baseline(mask, a, b, strip=_STRIP):
+    """Media anchura de la línea sin punta: mediana a 1/4, 1/2 y 3/4 (un cruce no la altera)."""
+    length = math.hypot(b[0] - a[0], b[1] - a[1])
+    if length < 1:
+        return 1.0
+    dx, dy = (b[0] - a[0]) / length, (b[1] - a[1]) / length
+    extents = np.concatenate([strip.extents(strip.sample(mask, a[0] + (b[0] - a[0]) * f, a[1] + (b[1] - a[1]) * f, dx, dy))
+                              for f in (0.25, 0.5, 0.75)])
+    extents = extents[extents >= 0]
+    return float(np.median(extents)) if len(extents) else 1.0
+
+
+def trace_relations(image, detections, class_ids=None):
+    """
+    Relaciones de las detecciones: lista de {tipo, desde, hacia, punta, confidence} con los
+    ids de clase de `class_ids` (por defecto el índice de la clase en las detecciones). Las
+    relaciones cuyos extremos no se pueden ajustar a dos clases (o a una, si es recursiva) se
+    omiten.
+    """
+    image = load_image(image)
+    classes = [det for det in detections if det.get('tipo') == 'Class']
+    class_ids = class_ids if class_ids is not None else list(range(len(classes)))
+    boxes = [_box(det) for det in classes]
+    height, width = image.shape[:2]
+
+    mask = ink_mask(image)
+    for x1, y1, x2, y2 in boxes:
+        mask[max(0, y1 - _BOX_MARGIN):max(0, y2 + _BOX_MARGIN + 1),
+             max(0, x1 - _BOX_MARGIN):max(0, x2 + _BOX_MARGIN + 1)] = 0
+    grid = ClassGrid(boxes)
+
+    relations = []
+    for det in detections:
+        label = det.get('tipo')
+        if label not in DETECTION_KINDS:
+            continue
+        x1, y1, x2, y2 = _box(det)
+        line = _trace_line(mask, (max(0, x1), max(0, y1), min(width, x2), min(height, y2)))
+        if line is None:
+            continue
+        a, b = line
+        length = math.hypot(b[0] - a[0], b[1] - a[1])
+        if length < 1:
+            continue
+        dx, dy = (b[0] - a[0]) / length, (b[1] - a[1]) / length
+        # Se busca la clase un poco más allá de cada extremo, hacia fuera de la línea
+        source = grid.nearest(a[0] - dx * _BOX_MARGIN, a[1] - dy * _BOX_MARGIN)
+        recursive = label == 'RecursiveRelation'
+        target = grid.nearest(b[0] + dx * _BOX_MARGIN, b[1] + dy * _BOX_MARGIN,
+                              exclude=None if recursive else source)
+        if source is None or target is None:
+            continue
+
+        # La punta está en el extremo con más tinta fuera de la línea; el tipo dice si ese
+        # extremo es 'hacia' (flecha, triángulo) o 'desde' (rombo: el todo)
+        baseline = _baseline(mask, a, b)
+        sample_a = _STRIP.sample(mask, a[0], a[1], dx, dy)
+        sample_b = _STRIP.sample(mask, b[0], b[1], -dx, -dy)
+        ink_a, ink_b = _head_ink(sample_a, baseline), _head_ink(sample_b, baseline)
+        kind = DETECTION_KINDS[label]
+        head = None
+        if max(ink_a, ink_b) >= _MIN_HEAD_INK and ink_a != ink_b:
+            head = classify_head(sample_a if ink_a > ink_b else sample_b, baseline)
+            if kind in _WHOLE_PART and head in _WHOLE_PART_HEADS:
+                kind = HEAD_KINDS[head]  # el relleno del rombo distingue composición y agregación
+            if (ink_a > ink_b) != (kind in _WHOLE_PART):
+                source, target = target, source
+        relations.append({'tipo': kind, 'desde': class_ids[source], 'hacia': class_ids[target],
+                          'punta': head, 'confidence': det.get('confidence')})
+    return relations
+
+
+def detections_to_diagram(image, detections, texts=None):
+    """
+    Pizarra en forma 'detector' (como detect_uml.py) con las clases detectadas y sus
+    relaciones. `texts` es la lista opcional {tipo, name, attributes, methods} de cada clase,
+    en el orden de las detecciones (class_ocr.read_classes); sin ella las clases se numeran.
+    """
+    image = load_image(image)
+    classes = [det for det in detections if det.get('tipo') == 'Class']
+    ids = [det.get('id') or str(uuid.uuid4()) for det in classes]
+    diagram = Diagram()
+    for index, (det, class_id) in enumerate(zip(classes, ids)):
+        text = texts[index] if texts and index < len(texts) else {}
+        diagram.add(UmlClass(id=class_id, name=text.get('name') or f"Clase{index + 1}",
+                             attributes=[parse_attribute_text(a) for a in text.get('attributes', ())],
+                             methods=[parse_method_text(m) for m in text.get('methods', ())],
+                             tipo=text.get('tipo') or 'Class',
+                             x=int(det['x']), y=int(det['y']), width=int(det['w']), height=int(det['h'])))
+    for rel in trace_relations(image, detections, ids):
+        diagram.add(Relation(id=str(uuid.uuid4()), tipo=rel['tipo'], source=rel['desde'], target=rel['hacia']))
+    return dump_diagram(diagram, 'detector')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Relaciones UML a partir de las cajas del detector')
+    parser.add_argument('--image', required=True, help='Imagen del diagrama')
+    parser.add_argument('--detections', required=True,
+                        help='JSON con la lista de detecciones {tipo, x, y, w, h, confidence}')
+    parser.add_argument('--ocr', action='store_true',
+                        help='Leer nombre, atributos y métodos de las clases con OCR local (class_ocr.py)')
+    args = parser.parse_args()
+
+    with open(args.detections, encoding='utf-8') as f:
+        detections = json.load(f)
+    try:
+        image = load_image(args.image)
+        texts = None
+        if args.ocr:
+            import class_ocr
+
+            texts = class_ocr.read_classes(image, detections)
+        result = detections_to_diagram(image, detections, texts)
+    except (ValueError, RuntimeError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,428 @@
+# uml_relations.py
+"""
+Grafo de relaciones del diagrama para la generación de código.
+
+Se construye una sola vez por generación a partir de los elementos Association /
+Composition / Aggregation (from/to/multOrigen/multDestino) y de los atributos cuyo tipo
+es otra clase, y resuelve:
+- los campos de relación de cada entidad: lado dueño (con la FK o la tabla intermedia)
+  y lado inverso (mappedBy),
+- las tablas intermedias de las relaciones muchos-a-muchos,
+- los ciclos entre FKs (componentes fuertemente conexas) y un orden topológico de las
+  entidades (primero las referenciadas), útil para crear tablas o insertar datos.
+
+Dónde va la FK sigue las mismas reglas que gen_sql_from_elements.js:
+- ambos lados muchos              -> tabla intermedia <from>_<to>_rel
+- from '1' y to muchos o vacío    -> FK <from>_id en la tabla 'to'
+- to '1' y from muchos o vacío    -> FK <to>_id en la tabla 'from'
+- relación recursiva (from == to) -> parent_id en la propia tabla
+- resto                           -> FK <from>_id en la tabla 'to'
+"""
+import re
+
+RELATION_TIPOS = ('Association', 'Composition', 'Aggregation')
+MANY_TOKENS = {'*', 'n', 'N', 'm', 'M'}
+COLLECTION_BATCH_SIZE = 50
+
+ONE_TO_ONE = 'OneToOne'
+ONE_TO_MANY = 'OneToMany'
+MANY_TO_ONE = 'ManyToOne'
+MANY_TO_MANY = 'ManyToMany'
+
+# Imports Java que necesita cada campo según sus anotaciones
+_JPA = 'jakarta.persistence.'
+_BASE_IMPORTS = (_JPA + 'FetchType', 'lombok.ToString', 'lombok.EqualsAndHashCode')
+
+
+def parse_multiplicity(text):
+    """'1' -> (1, 1), '0..1' -> (0, 1), '*' -> (0, None), '1..*' -> (1, None); vacío -> None."""
+    text = (text or '').strip().replace(' ', '')
+    if not text:
+        return None
+    low, _, high = text.partition('..')
+    high = high or low
+    lower = int(low) if low.isdigit() else 0
+    upper = int(high) if high.isdigit() else None
+    if upper is None and high not in MANY_TOKENS:
+        return None
+    return lower, upper
+
+
+def is_many(multiplicity):
+    return multiplicity is not None and (multiplicity[1] is None or multiplicity[1] > 1)
+
+
+def is_one(multiplicity):
+    return multiplicity is not None and not is_many(multiplicity)
+
+
+def camel(name):
+    return name[:1].lower() + name[1:]
+
+
+def pluralize(name):
+    """Plural sencillo en español: producto -> productos, autor -> autores."""
+    if not name:
+        return name
+    if name[-1] in 'aeiouAEIOU':
+        return name + 's'
+    if name[-1] == 'z':
+        return name[:-1] + 'ces'
+    return name + 'es'
+
+
+class RelationGraph:
+    """
+    Resultado del análisis de relaciones. Todas las estructuras usan el nombre de la
+    entidad (PascalCase) y conservan el orden del diagrama.
+
+    - relations[entidad]: campos de relación (dicts listos para las plantillas)
+    - claimed[entidad]: nombres de atributos que pasan a ser campos de relación
+    - adjacency[entidad]: entidades con las que se relaciona (en cualquier sentido)
+    - dependencies[entidad]: entidades a las que apunta con una FK propia
+    - join_tables: tablas intermedias de las relaciones muchos-a-muchos
+    - cycles: grupos de entidades cuyas FKs forman un ciclo
+    - order: entidades ordenadas de forma que las referenciadas van antes
+    - skipped: relaciones ignoradas (extremos que no son clases del diagrama)
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.relations = {name: [] for name in self.names}
+        self.claimed = {name: set() for name in self.names}
+        self.adjacency = {name: [] for name in self.names}
+        self.dependencies = {name: [] for name in self.names}
+        self.join_tables = []
+        self.cycles = []
+        self.order = []
+        self.skipped = []
+
+    def link(self, a, b):
+        if b not in self.adjacency[a]:
+            self.adjacency[a].append(b)
+        if a not in self.adjacency[b]:
+            self.adjacency[b].append(a)
+
+    def entity_graph_paths(self, name):
+        """Campos a uno que conviene traer con JOIN al listar la entidad (evita N+1)."""
+        return [f['name'] for f in self.relations[name] if f['owner'] and not f['collection']]
+
+    def imports(self, name):
+        imports = set()
+        for field in self.relations[name]:
+            imports.update(_BASE_IMPORTS)
+            imports.add(_JPA + field['kind'])
+            if field['join_column']:
+                imports.update((_JPA + 'JoinColumn', _JPA + 'ForeignKey'))
+                if field['kind'] == ONE_TO_ONE:
+                    imports.add(_JPA + 'UniqueConstraint')
+            if field['join_table']:
+                imports.update((_JPA + 'JoinTable', _JPA + 'JoinColumn', _JPA + 'ForeignKey'))
+            if field['cascade']:
+                imports.add(_JPA + 'CascadeType')
+            if field['collection']:
+                imports.update(('java.util.List', 'java.util.ArrayList'))
+            if field['batch_size']:
+                imports.add('org.hibernate.annotations.BatchSize')
+            if field['json_ignore']:
+                imports.add('com.fasterxml.jackson.annotation.JsonIgnore')
+        # JsonIgnoreProperties lo importa siempre la plantilla (proxies perezosos de Hibernate)
+        return imports
+
+
+def _field(kind, name, target, owner, tipo, source, label=''):
+    return {
+        'kind': kind,                  # anotación JPA
+        'name': name,                  # nombre del campo Java
+        'pascal_name': name[:1].upper() + name[1:],  # para getters/setters
+        'target': target,              # entidad relacionada
+        'target_camel': camel(target),
+        'owner': owner,                # True si este lado tiene la FK / la tabla intermedia
+        'collection': kind in (ONE_TO_MANY, MANY_TO_MANY),
+        'fetch': 'LAZY',               # nunca EAGER: los JOIN se piden explícitamente (EntityGraph)
+        'mapped_by': None,
+        'inverse': None,               # nombre del campo en el otro lado (si existe)
+        'join_column': None,
+        'join_table': None,
+        'cascade': None,
+        'orphan_removal': False,
+        'batch_size': None,
+        'in_cycle': False,
+        'json_ignore': False,
+        'json_ignore_properties': [],
+        'tipo': tipo,
+        'label': label,
+        'source': source,              # 'relation' (elemento del diagrama) o 'attribute'
+        'element_id': None,            # id del elemento relación del diagrama (dueño de la FK)
+    }
+
+
+class _Builder:
+    def __init__(self, entities):
+        self.entities = entities
+        self.by_name = {}
+        for entity in entities:
+            self.by_name.setdefault(entity['name'], entity)
+        self.graph = RelationGraph(self.by_name)
+        self.taken = {name: {attr['name'] for attr in entity['attributes']} for name, entity in self.by_name.items()}
+
+    def claim_attribute(self, entity_name, target, collection):
+        """Atributo existente que ya representa esta relación (p. ej. '+ categoria: Categoria')."""
+        for attr in self.by_name[entity_name]['attributes']:
+            if (attr['is_relationship'] and attr['type'] == target and attr['is_array'] == collection
+                    and attr['name'] not in self.graph.claimed[entity_name]):
+                self.graph.claimed[entity_name].add(attr['name'])
+                return attr['name']
+        return None
+
+    def field_name(self, entity_name, base, label=''):
+        taken = self.taken[entity_name]
+        name = base
+        if name in taken and label:
+            name = base + ''.join(w[:1].upper() + w[1:] for w in re.findall(r'[A-Za-z0-9]+', label))
+        suffix = 2
+        while name in taken:
+            name = f"{base}{suffix}"
+            suffix += 1
+        taken.add(name)
+        return name
+
+    def name_for(self, entity_name, target, collection, label=''):
+        claimed = self.claim_attribute(entity_name, target, collection)
+        if claimed:
+            return claimed
+        base = pluralize(camel(target)) if collection else camel(target)
+        return self.field_name(entity_name, base, label)
+
+    def add(self, entity_name, field):
+        # True si el campo sustituye a un atributo del diagrama (p. ej. '+ categoria: Categoria')
+        field['from_attribute'] = field['name'] in self.graph.claimed[entity_name]
+        self.graph.relations[entity_name].append(field)
+
+    def add_to_one(self, child, parent, tipo, source, child_mult, label='',
+                   name=None, join_column=None, inverse=True):
+        """
+        FK en `child` hacia `parent` (ManyToOne, u OneToOne si el lado hijo es a uno).
+        El OneToOne se deja unidireccional: el lado inverso (mappedBy) no se puede cargar
+        de forma perezosa en Hibernate y provocaría una consulta extra por fila.
+        """
+        one_to_one = is_one(child_mult) and child != parent
+        owner_kind = ONE_TO_ONE if one_to_one else MANY_TO_ONE
+        name = name or self.name_for(child, parent, False, label)
+        owner = _field(owner_kind, name, parent, True, tipo, source, label)
+        owner['join_column'] = join_column or self.by_name[parent]['table_name'] + '_id'
+        # La FK se deja admitiendo NULL aunque la multiplicidad sea 1 o sea una composición:
+        # no forma parte del cuerpo de Postman ni de los formularios de Flutter, y con NOT NULL
+        # cualquier alta desde ellos fallaría
+        self.add(child, owner)
+        self.graph.dependencies[child].append(parent)
+        self.graph.link(child, parent)
+        if not inverse or one_to_one:
+            return owner
+
+        if child == parent:
+            inverse_name = self.field_name(parent, 'children')
+        else:
+            inverse_name = self.name_for(parent, child, True, label)
+        back = _field(ONE_TO_MANY, inverse_name, child, False, tipo, source, label)
+        back['mapped_by'] = owner['name']
+        back['json_ignore'] = True  # el lado inverso no se serializa: evita recursión y cargas perezosas
+        if tipo == 'Composition' and child != parent:
+            # El todo gestiona el ciclo de vida de sus partes
+            back['cascade'] = 'ALL'
+            back['orphan_removal'] = True
+        back['batch_size'] = COLLECTION_BATCH_SIZE
+        owner['inverse'] = back['name']
+        back['inverse'] = owner['name']
+        self.add(parent, back)
+        return owner
+
+    def add_many_to_many(self, owner_name, target, tipo, source, label='', name=None,
+                         table=None, columns=None, inverse=True):
+        owner_table = self.by_name[owner_name]['table_name']
+        target_table = self.by_name[target]['table_name']
+        name = name or self.name_for(owner_name, target, True, label)
+        if owner_name == target:
+            default_columns = (f"{owner_table}_id1", f"{owner_table}_id2")
+        else:
+            default_columns = (f"{owner_table}_id", f"{target_table}_id")
+        join_table = {
+            'name': table or f"{owner_table}_{target_table}_rel",
+            'join_column': (columns or default_columns)[0],
+            'inverse_join_column': (columns or default_columns)[1],
+            'owner': owner_name,
+            'owner_table': owner_table,
+            'target': target,
+            'target_table': target_table,
+        }
+        owner = _field(MANY_TO_MANY, name, target, True, tipo, source, label)
+        owner['join_table'] = join_table
+        owner['batch_size'] = COLLECTION_BATCH_SIZE
+        self.add(owner_name, owner)
+        self.graph.join_tables.append(join_table)
+        self.graph.link(owner_name, target)
+        if inverse and owner_name != target:
+            back = _field(MANY_TO_MANY, self.name_for(target, owner_name, True, label), owner_name, False,
+                          tipo, source, label)
+            back['mapped_by'] = owner['name']
+            back['json_ignore'] = True
+            back['batch_size'] = COLLECTION_BATCH_SIZE
+            owner['inverse'] = back['name']
+            back['inverse'] = owner['name']
+            owner['json_ignore_properties'] = [back['name']]
+            self.add(target, back)
+        return owner
+
+    def add_relation(self, rel, from_name, to_name):
+        tipo = rel.get('tipo', 'Association')
+        label = (rel.get('label') or '').strip()
+        mult_from = parse_multiplicity(rel.get('multOrigen'))
+        mult_to = parse_multiplicity(rel.get('multDestino'))
+
+        if is_many(mult_from) and is_many(mult_to):
+            if from_name == to_name:
+                table = self.by_name[from_name]['table_name']
+                owner = self.add_many_to_many(from_name, to_name, tipo, 'relation', label,
+                                              name=self.name_for(from_name, to_name, True, label),
+                                              table=f"{table}_recursiva_rel")
+            else:
+                owner = self.add_many_to_many(from_name, to_name, tipo, 'relation', label)
+        elif from_name == to_name:
+            owner = self.add_to_one(from_name, from_name, tipo, 'relation', None, label,
+                                    name=self.field_name(from_name, 'parent'), join_column='parent_id')
+        elif is_one(mult_from) and (is_many(mult_to) or mult_to is None):
+            owner = self.add_to_one(to_name, from_name, tipo, 'relation', mult_to, label)
+        elif is_one(mult_to) and (is_many(mult_from) or mult_from is None):
+            owner = self.add_to_one(from_name, to_name, tipo, 'relation', mult_from, label)
+        else:
+            # Sin multiplicidades útiles: FK en la tabla 'to' (mismo criterio que el generador SQL)
+            owner = self.add_to_one(to_name, from_name, tipo, 'relation', mult_to, label)
+        if rel.get('id') is not None:
+            # Identidad de la columna FK entre versiones: schema_diff.py la renombra en vez de recrearla
+            owner['element_id'] = str(rel['id'])
+
+    def add_attribute_relations(self):
+        """Atributos con tipo de otra clase que no corresponden a ninguna relación del diagrama."""
+        for entity in self.entities:
+            name = entity['name']
+            if self.by_name[name] is not entity:
+                continue
+            for attr in entity['attributes']:
+                if not attr['is_relationship'] or attr['name'] in self.graph.claimed[name]:
+                    continue
+                if attr['type'] not in self.by_name:
+                    continue
+                self.graph.claimed[name].add(attr['name'])
+                if attr['is_array']:
+                    table = entity['table_name']
+                    target_table = self.by_name[attr['type']]['table_name']
+                    columns = (f"{table}_id", f"{attr['column_name']}_id" if attr['type'] == name else f"{target_table}_id")
+                    self.add_many_to_many(name, attr['type'], 'Association', 'attribute', name=attr['name'],
+                                          table=f"{table}_{attr['column_name']}_rel", columns=columns, inverse=False)
+                else:
+                    self.add_to_one(name, attr['type'], 'Association', 'attribute', None,
+                                    name=attr['name'], join_column=f"{attr['column_name']}_id", inverse=False)
+
+    def find_cycles(self):
+        """Tarjan iterativo sobre las FKs: componentes con más de una entidad o con auto-referencia."""
+        deps = self.graph.dependencies
+        index, low, on_stack, stack, components = {}, {}, set(), [], []
+        counter = 0
+        for root in self.graph.names:
+            if root in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, i = work.pop()
+                if i == 0:
+                    index[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                recurse = False
+                targets = deps[node]
+                while i < len(targets):
+                    target = targets[i]
+                    i += 1
+                    if target not in index:
+                        work.append((node, i))
+                        work.append((target, 0))
+                        recurse = True
+                        break
+                    if target in on_stack:
+                        low[node] = min(low[node], index[target])
+                if recurse:
+                    continue
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+        return components
+
+    def resolve_cycles_and_order(self):
+        graph = self.graph
+        components = self.find_cycles()
+        component_of = {}
+        for number, component in enumerate(components):
+            for name in component:
+                component_of[name] = number
+            if len(component) > 1 or component[0] in graph.dependencies[component[0]]:
+                position = {name: i for i, name in enumerate(graph.names)}
+                graph.cycles.append(sorted(component, key=position.get))
+
+        # Campos a uno dentro de un ciclo: serialización superficial del destino para no
+        # recorrer el ciclo en el JSON
+        in_cycles = {name for cycle in graph.cycles for name in cycle}
+        for name in graph.names:
+            for field in graph.relations[name]:
+                if (field['owner'] and not field['collection'] and name in in_cycles
+                        and component_of[field['target']] == component_of[name]):
+                    field['in_cycle'] = True
+        for name in graph.names:
+            for field in graph.relations[name]:
+                if field['in_cycle']:
+                    field['json_ignore_properties'] = [
+                        f['name'] for f in graph.relations[field['target']] if f['in_cycle']]
+
+        # Tarjan devuelve las componentes en orden topológico inverso de la condensación:
+        # las entidades referenciadas salen antes que las que las referencian
+        position = {name: i for i, name in enumerate(graph.names)}
+        for component in components:
+            graph.order.extend(sorted(component, key=position.get))
+
+    def build(self, relation_elements, id_to_name):
+        for rel in relation_elements:
+            from_name = id_to_name.get(rel.get('from'))
+            to_name = id_to_name.get(rel.get('to'))
+            if from_name is None or to_name is None:
+                self.graph.skipped.append({'tipo': rel.get('tipo'), 'from': rel.get('from'), 'to': rel.get('to')})
+                continue
+            self.add_relation(rel, from_name, to_name)
+        self.add_attribute_relations()
+        self.resolve_cycles_and_order()
+        return self.graph
+
+
+def build_relation_graph(elements, entities, class_elements=None):
+    """
+    `elements`: elementos del diagrama (clases y relaciones).
+    `entities`: entidades ya preparadas por el generador (name, table_name, attributes...).
+    `class_elements`: elementos Class en el mismo orden que `entities` (para mapear ids);
+    por defecto, los elementos de tipo Class de `elements`.
+    """
+    if class_elements is None:
+        class_elements = [el for el in elements if el.get('tipo', 'Class') == 'Class']
+    id_to_name = {}
+    for el, entity in zip(class_elements, entities):
+        if 'id' in el:
+            id_to_name.setdefault(el['id'], entity['name'])
+    relation_elements = [el for el in elements if el.get('tipo') in RELATION_TIPOS]
+    return _Builder(entities).build(relation_elements, id_to_name)